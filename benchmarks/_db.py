@@ -0,0 +1,45 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import prisma.enums
+import prisma.models
+from prisma import Prisma
+
+BENCH_EMAIL_PREFIX = "bench-user-"
+
+
+@asynccontextmanager
+async def connected() -> AsyncIterator[Prisma]:
+    """
+    Connects a registered Prisma client to DATABASE_URL for the duration of a benchmark. Point it at a disposable local database (`docker-compose up -d db`).
+    """
+    client = Prisma(auto_register=True)
+    await client.connect()
+    try:
+        yield client
+    finally:
+        await client.disconnect()
+
+
+async def seed_users(count: int, chunk: int = 5000, password: str = "x") -> None:
+    """
+    Inserts `count` synthetic users with create_many, `chunk` rows per statement.
+    """
+    for start in range(0, count, chunk):
+        await prisma.models.User.prisma().create_many(
+            data=[
+                {
+                    "email": f"{BENCH_EMAIL_PREFIX}{i}@example.com",
+                    "password": password,
+                    "role": prisma.enums.Role.User,
+                }
+                for i in range(start, min(start + chunk, count))
+            ],
+            skip_duplicates=True,
+        )
+
+
+async def drop_bench_users() -> None:
+    users = {"email": {"startswith": BENCH_EMAIL_PREFIX}}
+    await prisma.models.Auth.prisma().delete_many(where={"user": {"is": users}})
+    await prisma.models.User.prisma().delete_many(where=users)
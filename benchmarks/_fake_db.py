@@ -0,0 +1,427 @@
+"""
+An in-memory stand-in for the Postgres database behind the app's Prisma client, so route benchmarks measure the application rather than the database.
+
+`FakeDatabase.install(client)` overrides the client's `_execute`, the single method every Prisma action and raw query goes through (the hook `project.db_hooks` uses too), and re-instruments it so query metrics and budgets keep working. Model actions are answered from dict tables. Raw SQL is only understood for the statements the services actually run, matched by their exact text. Anything else raises NotImplementedError rather than returning a plausible wrong answer.
+"""
+
+import asyncio
+import bisect
+import itertools
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import prisma.errors
+import project.auth_service
+import project.db_hooks
+import project.maintenance
+import project.registerUsersBulk_service
+import project.updateUserProfile_service
+from prisma import Prisma
+
+# Columns filled in by the database when a create does not set them.
+_DEFAULTS: Dict[str, Dict[str, Callable[[], Any]]] = {
+    "User": {"version": lambda: 0},
+    "Auth": {"token": lambda: str(uuid.uuid4()), "createdAt": lambda: _now()},
+    "HelloWorld": {"message": lambda: "Hello, World!", "createdAt": lambda: _now()},
+    "HealthCheck": {"status": lambda: "ok", "checkedAt": lambda: _now()},
+    "HealthCheckRollup": {},
+    "Version": {"releasedAt": lambda: _now()},
+    "Documentation": {},
+}
+
+_UNIQUE: Dict[str, Tuple[str, ...]] = {"User": ("email",), "Auth": ("token",)}
+
+_INDEXED: Dict[str, Tuple[str, ...]] = {"Auth": ("userId",)}
+
+_ORDER_ASC = ({}, {"id": "asc"}, None)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _matches(row: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    for field, condition in (where or {}).items():
+        value = row.get(field)
+        if not isinstance(condition, dict):
+            if value != _plain(condition):
+                return False
+            continue
+        for op, arg in condition.items():
+            arg = _plain(arg)
+            if op == "equals":
+                ok = value == arg
+            elif op == "in":
+                ok = value in {_plain(a) for a in arg}
+            elif op == "not_in":
+                ok = value not in {_plain(a) for a in arg}
+            elif op == "gt":
+                ok = arg is None or value > arg
+            elif op == "gte":
+                ok = value >= arg
+            elif op == "lt":
+                ok = value < arg
+            elif op == "lte":
+                ok = value <= arg
+            elif op == "startswith":
+                ok = value.startswith(arg)
+            else:
+                raise NotImplementedError(f"FakeDatabase: unsupported filter {op!r}")
+            if not ok:
+                return False
+    return True
+
+
+class _Table:
+    """
+    Rows by id, a sorted id list for id-ordered range scans, a dict per unique column, and a set of ids per value of each other indexed column.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.rows: Dict[int, Dict[str, Any]] = {}
+        self.ids: List[int] = []
+        self.unique: Dict[str, Dict[Any, int]] = {
+            column: {} for column in _UNIQUE.get(name, ())
+        }
+        self.indexed: Dict[str, Dict[Any, Set[int]]] = {
+            column: {} for column in _INDEXED.get(name, ())
+        }
+        self._next_id = itertools.count(1)
+
+    def insert(
+        self, data: Dict[str, Any], skip_duplicates: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        row = {key: _plain(value) for key, value in data.items()}
+        for column, default in _DEFAULTS[self.name].items():
+            row.setdefault(column, default())
+        if self.name == "Documentation":
+            row["updatedAt"] = _now()
+        for column, index in self.unique.items():
+            if row[column] in index:
+                if skip_duplicates:
+                    return None
+                raise ValueError(
+                    f"FakeDatabase: unique constraint failed on {self.name}.{column}"
+                )
+        row["id"] = row.get("id") or next(self._next_id)
+        self.rows[row["id"]] = row
+        self.ids.append(row["id"])
+        for column, index in self.unique.items():
+            index[row[column]] = row["id"]
+        for column, index in self.indexed.items():
+            index.setdefault(row[column], set()).add(row["id"])
+        return row
+
+    def update(self, row: Dict[str, Any], data: Dict[str, Any]) -> None:
+        for column, index in self.unique.items():
+            if column in data and data[column] != row[column]:
+                if data[column] in index:
+                    raise ValueError(
+                        f"FakeDatabase: unique constraint failed on {self.name}.{column}"
+                    )
+                del index[row[column]]
+                index[data[column]] = row["id"]
+        row.update({key: _plain(value) for key, value in data.items()})
+        if self.name == "Documentation":
+            row["updatedAt"] = _now()
+
+    def delete(self, row: Dict[str, Any]) -> None:
+        del self.rows[row["id"]]
+        del self.ids[bisect.bisect_left(self.ids, row["id"])]
+        for column, index in self.unique.items():
+            index.pop(row[column], None)
+        for column, index in self.indexed.items():
+            index.get(row[column], set()).discard(row["id"])
+
+    def lookup(self, column: str, value: Any) -> List[Dict[str, Any]]:
+        return [self.rows[i] for i in self.indexed[column].get(value, ())]
+
+    def unique_lookup(self, where: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if len(where) == 1:
+            ((column, value),) = where.items()
+            if column == "id" and not isinstance(value, dict):
+                return self.rows.get(value)
+            if column in self.unique and not isinstance(value, dict):
+                row_id = self.unique[column].get(value)
+                return self.rows.get(row_id) if row_id is not None else None
+        return next(iter(self.select(where, None, 1)), None)
+
+    def select(
+        self,
+        where: Optional[Dict[str, Any]],
+        order: Any,
+        take: Optional[int],
+        skip: int = 0,
+    ) -> List[Dict[str, Any]]:
+        where = where or {}
+        if order in _ORDER_ASC and set(where) <= {"id"}:
+            # Primary key range scan, as Postgres would do for keyset pagination.
+            condition = where.get("id") or {}
+            if isinstance(condition, dict) and set(condition) <= {"gt"}:
+                after = condition.get("gt")
+                start = 0 if after is None else bisect.bisect_right(self.ids, after)
+                stop = None if take is None else start + skip + take
+                return [self.rows[i] for i in self.ids[start + skip : stop]]
+            if isinstance(condition, dict) and set(condition) == {"in"}:
+                rows = [
+                    self.rows[i] for i in sorted(set(condition["in"])) if i in self.rows
+                ]
+                return rows[skip : None if take is None else skip + take]
+        rows = [row for row in self.rows.values() if _matches(row, where)]
+        for column, direction in reversed(list((order or {}).items())):
+            rows.sort(key=lambda row: row[column], reverse=direction == "desc")
+        return rows[skip : None if take is None else skip + take]
+
+
+class FakeDatabase:
+    """
+    Holds the tables and answers the client's queries, sleeping `latency` seconds per query to stand in for a network round-trip (0 still yields to the event loop, as a real query would).
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.tables = {name: _Table(name) for name in _DEFAULTS}
+        self.queries = 0
+        self._raw: Dict[str, Callable[..., Tuple[List[str], List[str], List[list]]]] = {
+            "SELECT 1": lambda: (["?column?"], ["int"], [[1]]),
+            project.auth_service._RESOLVE_TOKEN_SQL: self._resolve_token,
+            project.updateUserProfile_service._UPDATE_USER_SQL: self._update_user,
+            project.registerUsersBulk_service._INSERT_USERS_SQL: self._insert_users,
+            project.maintenance._PURGE_TOKENS_SQL: self._purge_tokens,
+            project.maintenance._ROLLUP_RAW_SQL: self._rollup_health_checks,
+            project.maintenance._ROLLUP_MINUTES_SQL: self._compact_minute_rollups,
+        }
+        self._connected = False
+
+    def install(self, client: Prisma) -> None:
+        """
+        Routes every query made through `client` to this database, and makes `connect`/`disconnect` no-ops. The generated client is slotted, so like `project.db_hooks.instrument` this swaps the client's class for a subclass: one of the generated class, beneath any earlier fake or instrumentation, which is then applied again.
+        """
+        base = type(client)
+        while "__instrumented__" in vars(base) or "__fake_database__" in vars(base):
+            base = base.__bases__[0]
+        database = self
+
+        class FakeClient(base):
+            __slots__ = ()
+            __fake_database__ = database
+
+            async def connect(self, *args: Any, **kwargs: Any) -> None:
+                database._connected = True
+
+            async def disconnect(self, *args: Any, **kwargs: Any) -> None:
+                database._connected = False
+
+            def is_connected(self) -> bool:
+                return database._connected
+
+            async def _execute(self, **kwargs: Any) -> Dict[str, Any]:
+                return await database.execute(**kwargs)
+
+        client.__class__ = FakeClient
+        project.db_hooks.instrument(client)
+
+    async def execute(
+        self,
+        *,
+        method: str,
+        arguments: Dict[str, Any],
+        model: Any = None,
+        root_selection: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        await asyncio.sleep(self.latency)
+        self.queries += 1
+        if method in ("query_raw", "execute_raw"):
+            handler = self._raw.get(arguments["query"])
+            if handler is None:
+                raise NotImplementedError(
+                    f"FakeDatabase has no handler for: {arguments['query'][:80]}"
+                )
+            columns, types, rows = handler(*arguments["parameters"])
+            if method == "execute_raw":
+                return {"data": {"result": len(rows)}}
+            return {
+                "data": {"result": {"columns": columns, "types": types, "rows": rows}}
+            }
+        table = self.tables[model.__prisma_model__]
+        return {"data": {"result": getattr(self, f"_{method}")(table, arguments)}}
+
+    def _copy(self, row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        return dict(row) if row is not None else None
+
+    def _find_unique(self, table: _Table, arguments: Dict[str, Any]) -> Any:
+        return self._copy(table.unique_lookup(arguments["where"]))
+
+    def _find_first(self, table: _Table, arguments: Dict[str, Any]) -> Any:
+        rows = table.select(
+            arguments.get("where"),
+            arguments.get("order_by"),
+            1,
+            arguments.get("skip") or 0,
+        )
+        return self._copy(rows[0]) if rows else None
+
+    def _find_many(self, table: _Table, arguments: Dict[str, Any]) -> Any:
+        rows = table.select(
+            arguments.get("where"),
+            arguments.get("order_by"),
+            arguments.get("take"),
+            arguments.get("skip") or 0,
+        )
+        return [dict(row) for row in rows]
+
+    def _create(self, table: _Table, arguments: Dict[str, Any]) -> Any:
+        return self._copy(table.insert(arguments["data"]))
+
+    def _create_many(self, table: _Table, arguments: Dict[str, Any]) -> Any:
+        skip = bool(arguments.get("skipDuplicates"))
+        created = sum(1 for data in arguments["data"] if table.insert(data, skip))
+        return {"count": created}
+
+    def _update(self, table: _Table, arguments: Dict[str, Any]) -> Any:
+        row = table.unique_lookup(arguments["where"])
+        if row is None:
+            raise LookupError(f"FakeDatabase: no {table.name} matches the update")
+        table.update(row, arguments["data"])
+        return dict(row)
+
+    def _delete_many(self, table: _Table, arguments: Dict[str, Any]) -> Any:
+        rows = table.select(arguments.get("where"), None, None)
+        for row in list(rows):
+            table.delete(row)
+            if table.name == "User":
+                self._cascade_auth(row["id"])
+        return {"count": len(rows)}
+
+    def _cascade_auth(self, user_id: int) -> None:
+        auth = self.tables["Auth"]
+        for row in auth.lookup("userId", user_id):
+            auth.delete(row)
+
+    def _resolve_token(
+        self, token: str, ttl: float
+    ) -> Tuple[List[str], List[str], List[list]]:
+        columns, types = ["id", "role"], ["int", "string"]
+        auth = self.tables["Auth"].unique_lookup({"token": token})
+        if auth is None or (
+            ttl > 0 and auth["createdAt"] <= _now() - timedelta(seconds=ttl)
+        ):
+            return columns, types, []
+        user = self.tables["User"].rows.get(auth["userId"])
+        if user is None:
+            return columns, types, []
+        return columns, types, [[user["id"], user["role"]]]
+
+    def _update_user(
+        self, user_id: int, email: str, expected_version: Optional[int]
+    ) -> Tuple[List[str], List[str], List[list]]:
+        columns = ["id", "email", "role", "version"]
+        types = ["int", "string", "string", "int"]
+        users = self.tables["User"]
+        user = users.rows.get(user_id)
+        if user is None or (
+            expected_version is not None and user["version"] != expected_version
+        ):
+            return columns, types, []
+        try:
+            users.update(user, {"email": email, "version": user["version"] + 1})
+        except ValueError as e:
+            # What the engine reports for a unique violation in a raw statement.
+            raise prisma.errors.RawQueryError(
+                {
+                    "user_facing_error": {
+                        "error_code": "P2010",
+                        "meta": {"code": "23505", "message": str(e)},
+                    }
+                }
+            ) from e
+        return (
+            columns,
+            types,
+            [[user["id"], user["email"], user["role"], user["version"]]],
+        )
+
+    def _insert_users(self, rows: str) -> Tuple[List[str], List[str], List[list]]:
+        users = self.tables["User"]
+        inserted = []
+        for data in json.loads(rows):
+            row = users.insert({**data, "role": "User"}, skip_duplicates=True)
+            if row is not None:
+                inserted.append([row["id"], row["email"]])
+        return ["id", "email"], ["int", "string"], inserted
+
+    def _expired(
+        self, table: _Table, column: str, age: float, limit: int, **where: Any
+    ) -> List[Dict[str, Any]]:
+        cutoff = _now() - timedelta(seconds=age)
+        rows = [
+            table.rows[row_id]
+            for row_id in table.ids
+            if table.rows[row_id][column] < cutoff
+            and all(table.rows[row_id][k] == v for k, v in where.items())
+        ][:limit]
+        for row in rows:
+            table.delete(row)
+        return rows
+
+    def _add_to_rollup(
+        self, granularity: str, bucket_start: datetime, status: str, checks: int
+    ) -> None:
+        rollups = self.tables["HealthCheckRollup"]
+        for row in rollups.rows.values():
+            if (row["granularity"], row["bucketStart"], row["status"]) == (
+                granularity,
+                bucket_start,
+                status,
+            ):
+                row["checks"] += checks
+                return
+        rollups.insert(
+            {
+                "granularity": granularity,
+                "bucketStart": bucket_start,
+                "status": status,
+                "checks": checks,
+            }
+        )
+
+    def _purge_tokens(
+        self, ttl: float, limit: int
+    ) -> Tuple[List[str], List[str], List[list]]:
+        purged = self._expired(self.tables["Auth"], "createdAt", ttl, limit)
+        return [], [], [[] for _ in purged]
+
+    def _rollup_health_checks(
+        self, retention: float, limit: int
+    ) -> Tuple[List[str], List[str], List[list]]:
+        batch = self._expired(self.tables["HealthCheck"], "checkedAt", retention, limit)
+        for row in batch:
+            minute = row["checkedAt"].replace(second=0, microsecond=0)
+            self._add_to_rollup("minute", minute, row["status"], 1)
+        return ["rows"], ["int"], [[len(batch)]]
+
+    def _compact_minute_rollups(
+        self, retention: float, limit: int
+    ) -> Tuple[List[str], List[str], List[list]]:
+        batch = self._expired(
+            self.tables["HealthCheckRollup"],
+            "bucketStart",
+            retention,
+            limit,
+            granularity="minute",
+        )
+        for row in batch:
+            hour = row["bucketStart"].replace(minute=0)
+            self._add_to_rollup("hour", hour, row["status"], row["checks"])
+        return ["rows"], ["int"], [[len(batch)]]
+
+    def counts(self) -> Dict[str, int]:
+        return {name: len(table.rows) for name, table in self.tables.items()}
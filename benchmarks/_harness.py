@@ -0,0 +1,178 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+Headers = Iterable[Tuple[str, str]]
+
+
+def http_scope(method: str, path: str, headers: Headers = ()) -> dict:
+    raw_path, _, query = path.partition("?")
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": raw_path,
+        "raw_path": raw_path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+async def asgi_call(
+    app: Any,
+    method: str,
+    path: str,
+    headers: Headers = (),
+    body: bytes = b"",
+) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    """
+    Drives a single HTTP request through an ASGI app in-process and returns (status, headers, body).
+    """
+    scope = http_scope(method, path, headers)
+    sent = False
+
+    async def receive() -> dict:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    status = 0
+    response_headers: List[Tuple[bytes, bytes]] = []
+    chunks: List[bytes] = []
+
+    async def send(message: dict) -> None:
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
+
+
+async def asgi_first_chunk(
+    app: Any, path: str, headers: Headers = ()
+) -> Tuple[int, bytes]:
+    """
+    Opens a streaming GET (such as server-sent events) in-process, waits for the first non-empty body chunk, then disconnects. Returns (status, first chunk).
+    """
+    scope = http_scope("GET", path, headers)
+    first = asyncio.Event()
+    sent = False
+    status = 0
+    chunk = b""
+
+    async def receive() -> dict:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await first.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal status, chunk
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            if message.get("body") and not first.is_set():
+                chunk = message["body"]
+                first.set()
+            if not message.get("more_body", False):
+                first.set()
+
+    await app(scope, receive, send)
+    return status, chunk
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+class BenchResult:
+    def __init__(self, name: str, samples: List[float], elapsed: float, errors: int):
+        self.name = name
+        self.samples = sorted(samples)
+        self.elapsed = elapsed
+        self.errors = errors
+
+    @property
+    def throughput(self) -> float:
+        return len(self.samples) / self.elapsed if self.elapsed else 0.0
+
+    def p(self, q: float) -> float:
+        return percentile(self.samples, q)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": len(self.samples),
+            "errors": self.errors,
+            "rps": round(self.throughput, 1),
+            "p50_ms": round(self.p(0.50) * 1000, 3),
+            "p95_ms": round(self.p(0.95) * 1000, 3),
+            "p99_ms": round(self.p(0.99) * 1000, 3),
+        }
+
+    def __str__(self) -> str:
+        d = self.as_dict()
+        return (
+            f"{self.name:<40} {d['rps']:>10.1f} req/s  p50 {d['p50_ms']:>8.3f} ms"
+            f"  p95 {d['p95_ms']:>8.3f} ms  p99 {d['p99_ms']:>8.3f} ms"
+            f"  errors {d['errors']}"
+        )
+
+
+async def drive(
+    name: str,
+    op: Callable[[int], Awaitable[bool]],
+    requests: int,
+    concurrency: int,
+    warmup: Optional[int] = None,
+) -> BenchResult:
+    """
+    Runs `op` `requests` times across `concurrency` workers and records per-call latency. `op` receives the call index and returns False on an error response.
+    """
+    for i in range(warmup if warmup is not None else min(200, requests // 10)):
+        await op(i)
+    samples: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            ok = await op(i)
+            samples.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return BenchResult(name, samples, time.perf_counter() - start, errors)
+
+
+def route(app: Any, method: str, path: str, headers: Headers = (), body: bytes = b""):
+    """
+    Returns a `drive` operation that issues the same request against `app` and treats any status below 400 as success.
+    """
+    headers = list(headers)
+
+    async def op(_: int) -> bool:
+        status, _, _ = await asgi_call(app, method, path, headers, body)
+        return status < 400
+
+    return op
@@ -0,0 +1,50 @@
+"""
+Compares bearer-token verification latency with and without the token cache. Requires a local Postgres at DATABASE_URL.
+
+    python -m benchmarks.bench_auth [calls]
+"""
+
+import asyncio
+import sys
+import time
+
+import prisma.models
+import project.auth_service
+from benchmarks._db import connected, drop_bench_users, seed_users
+from benchmarks._harness import percentile
+
+
+async def measure(token: str, calls: int, cached: bool) -> list:
+    samples = []
+    for _ in range(calls):
+        if not cached:
+            project.auth_service.token_cache.clear()
+        start = time.perf_counter()
+        user = await project.auth_service.verifyToken(token)
+        samples.append(time.perf_counter() - start)
+        assert user is not None
+    return sorted(samples)
+
+
+async def main(calls: int) -> None:
+    async with connected():
+        await seed_users(1000)
+        try:
+            user = await prisma.models.User.prisma().find_first(
+                where={"email": {"startswith": "bench-user-"}}
+            )
+            token = await project.auth_service.issueToken(
+                project.auth_service.AuthenticatedUser(id=user.id, role=user.role)
+            )
+            for label, cached in (("uncached", False), ("cached", True)):
+                samples = await measure(token, calls, cached)
+                print(
+                    f"{label:<10} p50 {percentile(samples, 0.5) * 1e6:>9.1f} us"
+                    f"  p99 {percentile(samples, 0.99) * 1e6:>9.1f} us"
+                )
+        finally:
+            await drop_bench_users()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,70 @@
+"""
+Compares users/sec of the bulk registration service with one registerUser call per user (at the same concurrency an onboarding script would use). Password hashing costs the same in both, so set SCRYPT_N low (e.g. 1024) to isolate the write path. Requires a local Postgres at DATABASE_URL.
+
+    python -m benchmarks.bench_bulk_register [users] [single_concurrency]
+"""
+
+import asyncio
+import sys
+import time
+
+import project.password_service
+import project.registerUser_service
+import project.registerUsersBulk_service
+from benchmarks._db import BENCH_EMAIL_PREFIX, connected, drop_bench_users
+
+
+def rows(count: int, tag: str) -> list:
+    return [
+        {
+            "username": f"user{i}",
+            "password": "password",
+            "email": f"{BENCH_EMAIL_PREFIX}{tag}-{i}@example.com",
+        }
+        for i in range(count)
+    ]
+
+
+async def single(count: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def register(row: dict) -> None:
+        async with semaphore:
+            await project.registerUser_service.registerUser(
+                row["username"], row["password"], row["email"]
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(register(row) for row in rows(count, "single")))
+    return count / (time.perf_counter() - start)
+
+
+async def bulk(count: int) -> float:
+    body = rows(count, "bulk")
+
+    async def source():
+        for row in body:
+            yield row
+
+    start = time.perf_counter()
+    res = await project.registerUsersBulk_service.registerUsersBulk(source())
+    assert res.created == count, res.created
+    return count / (time.perf_counter() - start)
+
+
+async def main(count: int, concurrency: int) -> None:
+    project.password_service.password_hasher.start()
+    async with connected():
+        await drop_bench_users()
+        try:
+            print(f"single-row  {await single(count, concurrency):10.1f} users/s")
+            print(f"bulk        {await bulk(count):10.1f} users/s")
+        finally:
+            await drop_bench_users()
+    project.password_service.password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    count, concurrency = args + [10_000, 16][len(args) :]
+    asyncio.run(main(count, concurrency))
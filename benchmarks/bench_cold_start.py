@@ -0,0 +1,90 @@
+"""
+Measures cold start: the time from launching a fresh uvicorn process to its first successful response, for the DB-free liveness probe and for a DB-bound route (/health/ready reporting UP). Startup is run with the database connected before serving (the default) and in the background (DB_CONNECT_IN_BACKGROUND=1). Each mode is run several times and the median is reported. Requires a local Postgres at DATABASE_URL.
+
+    python -m benchmarks.bench_cold_start [runs]
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+PORT = int(os.getenv("BENCH_PORT", "8766"))
+
+
+async def get_status(path: str) -> Optional[int]:
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    except OSError:
+        return None
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n".encode()
+        )
+        status_line = await reader.readline()
+        return int(status_line.split()[1]) if status_line else None
+    except (OSError, ValueError, IndexError):
+        return None
+    finally:
+        writer.close()
+
+
+async def first_ok(path: str, launched: float, timeout: float = 60.0) -> float:
+    while time.perf_counter() - launched < timeout:
+        if await get_status(path) == 200:
+            return time.perf_counter() - launched
+        await asyncio.sleep(0.002)
+    raise RuntimeError(f"{path} did not answer 200 within {timeout:g}s")
+
+
+async def cold_start(background: bool) -> Dict[str, float]:
+    env = {
+        **os.environ,
+        "APP_ENV": os.environ.get("APP_ENV", "development"),
+        "DB_CONNECT_IN_BACKGROUND": "1" if background else "0",
+        "STARTUP_PROFILE": "0",
+    }
+    launched = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "project.server:app",
+            "--port",
+            str(PORT),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        live = await first_ok("/health/live", launched)
+        ready = await first_ok("/health/ready", launched)
+        return {"live": live, "ready": ready}
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+async def main(runs: int) -> None:
+    for background in (False, True):
+        results = [await cold_start(background) for _ in range(runs)]
+        live = statistics.median(r["live"] for r in results) * 1000
+        ready = statistics.median(r["ready"] for r in results) * 1000
+        mode = "background connect" if background else "connect before serving"
+        print(
+            f"{mode:<24} first /health/live {live:8.1f} ms"
+            f"  first /health/ready UP {ready:8.1f} ms  (median of {runs})"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    (runs,) = args + [5][len(args) :]
+    asyncio.run(main(runs))
@@ -0,0 +1,61 @@
+"""
+Compares the pre-encoded /hello fast path with a handler that builds and validates a HelloWorldResponse per request.
+
+    python -m benchmarks.bench_hello [requests] [concurrency]
+"""
+
+import asyncio
+import sys
+
+import project.getHelloWorld_service
+from benchmarks._harness import drive, route
+from fastapi import FastAPI
+from project.server import app
+
+
+def build_model_app() -> FastAPI:
+    model_app = FastAPI()
+
+    @model_app.get(
+        "/hello", response_model=project.getHelloWorld_service.HelloWorldResponse
+    )
+    async def hello() -> project.getHelloWorld_service.HelloWorldResponse:
+        return await project.getHelloWorld_service.getHelloWorld(
+            project.getHelloWorld_service.HelloWorldRequest()
+        )
+
+    return model_app
+
+
+async def main(requests: int, concurrency: int) -> None:
+    etag = project.getHelloWorld_service.hello_cache.json.etag
+    results = [
+        await drive(
+            "model + response_model",
+            route(build_model_app(), "GET", "/hello"),
+            requests,
+            concurrency,
+        ),
+        await drive(
+            "fast path json", route(app, "GET", "/hello"), requests, concurrency
+        ),
+        await drive(
+            "fast path text/plain",
+            route(app, "GET", "/hello", [("accept", "text/plain")]),
+            requests,
+            concurrency,
+        ),
+        await drive(
+            "fast path If-None-Match (304)",
+            route(app, "GET", "/hello", [("if-none-match", etag)]),
+            requests,
+            concurrency,
+        ),
+    ]
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args + [20000, 32][len(args) :])))
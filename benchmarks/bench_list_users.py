@@ -0,0 +1,60 @@
+"""
+Measures per-page latency of keyset pagination in listUsers over a large synthetic User table, with offset pagination shown alongside for contrast. Requires a local Postgres at DATABASE_URL.
+
+    python -m benchmarks.bench_list_users [users] [page_size]
+"""
+
+import asyncio
+import sys
+import time
+
+import prisma.partials
+import project.listUsers_service
+from benchmarks._db import connected, drop_bench_users, seed_users
+from benchmarks._harness import percentile
+
+ROUNDS = 50
+
+
+async def timed(fn) -> float:
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return percentile(sorted(samples), 0.5) * 1000
+
+
+async def main(users: int, page_size: int) -> None:
+    async with connected():
+        await seed_users(users)
+        try:
+            ids = [
+                user.id
+                for user in await prisma.partials.UserSummary.prisma().find_many(
+                    order={"id": "asc"}
+                )
+            ]
+            print(f"{'position':>10} {'keyset p50 ms':>15} {'offset p50 ms':>15}")
+            for fraction in (0.0, 0.25, 0.5, 0.75, 0.99):
+                offset = int(len(ids) * fraction)
+                after = ids[offset - 1] if offset else None
+                keyset = await timed(
+                    lambda: project.listUsers_service.listUsers(
+                        "admin", page_size, after
+                    )
+                )
+                skip = await timed(
+                    lambda: prisma.partials.UserSummary.prisma().find_many(
+                        take=page_size, skip=offset, order={"id": "asc"}
+                    )
+                )
+                print(f"{offset:>10} {keyset:>15.3f} {skip:>15.3f}")
+        finally:
+            await drop_bench_users()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    users, page_size = args + [100_000, 100][len(args) :]
+    asyncio.run(main(users, page_size))
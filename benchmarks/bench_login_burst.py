@@ -0,0 +1,67 @@
+"""
+Load test: /hello latency while a burst of logins is being verified. The burst runs once with hashing inline on the event loop and once in the configured pool (PASSWORD_HASH_EXECUTOR), and /hello p99 is reported for each. Requires a local Postgres at DATABASE_URL.
+
+    python -m benchmarks.bench_login_burst [logins] [login_concurrency]
+"""
+
+import asyncio
+import sys
+import time
+from urllib.parse import urlencode
+
+import project.password_service
+import project.registerUser_service
+from benchmarks._db import BENCH_EMAIL_PREFIX, drop_bench_users
+from benchmarks._harness import asgi_call, drive, percentile
+from project.server import app, lifespan
+
+EMAIL = f"{BENCH_EMAIL_PREFIX}login@example.com"
+PASSWORD = "correct horse battery staple"
+
+LOGIN_PATH = "/api/users/login?" + urlencode({"username": EMAIL, "password": PASSWORD})
+
+
+async def hello_while(busy: asyncio.Future) -> list:
+    samples = []
+    while not busy.done():
+        start = time.perf_counter()
+        await asgi_call(app, "GET", "/hello")
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.001)
+    return sorted(samples)
+
+
+async def login(_: int) -> bool:
+    status, _, _ = await asgi_call(app, "POST", LOGIN_PATH)
+    return status == 200
+
+
+async def main(logins: int, concurrency: int) -> None:
+    hasher = project.password_service.password_hasher
+    async with lifespan(app):
+        await drop_bench_users()
+        await project.registerUser_service.registerUser("bench", PASSWORD, EMAIL)
+        try:
+            idle = asyncio.ensure_future(asyncio.sleep(2))
+            samples = await hello_while(idle)
+            print(f"{'idle':<28} /hello p99 {percentile(samples, 0.99) * 1e3:8.2f} ms")
+            configured = hasher.executor_kind
+            for kind in ("inline", configured):
+                hasher.executor_kind = kind
+                burst = asyncio.ensure_future(
+                    drive(f"logins ({kind})", login, logins, concurrency, warmup=0)
+                )
+                samples = await hello_while(burst)
+                print(
+                    f"{'burst, hashing ' + kind:<28} /hello p99"
+                    f" {percentile(samples, 0.99) * 1e3:8.2f} ms   {burst.result()}"
+                )
+            hasher.executor_kind = configured
+        finally:
+            await drop_bench_users()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    logins, concurrency = args + [200, 50][len(args) :]
+    asyncio.run(main(logins, concurrency))
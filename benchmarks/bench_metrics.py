@@ -0,0 +1,62 @@
+"""
+Measures the overhead of the metrics layer: the same pre-encoded route served with and without MetricsMiddleware, and the cost of the Prisma query hook around a no-op query.
+
+    python -m benchmarks.bench_metrics [requests] [concurrency]
+"""
+
+import asyncio
+import sys
+import time
+
+import project.db_hooks
+import project.metrics
+from benchmarks._harness import drive, route
+from fastapi import FastAPI
+from project.preencoded import PreencodedBody
+
+BODY = PreencodedBody.from_json({"message": "Hello, World!"})
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return BODY.response()
+
+    if with_metrics:
+        bench_app.add_middleware(
+            project.metrics.MetricsMiddleware, routes=bench_app.router.routes
+        )
+    return bench_app
+
+
+class NoopClient:
+    async def _execute(self, *, method, model, arguments, root_selection=None):
+        return None
+
+
+async def query_hook_overhead(calls: int) -> None:
+    plain, timed = NoopClient(), NoopClient()
+    project.db_hooks.add_query_listener(project.metrics.observe_query)
+    project.db_hooks.instrument(timed)
+    for label, client in (("bare _execute", plain), ("instrumented _execute", timed)):
+        start = time.perf_counter()
+        for _ in range(calls):
+            await client._execute(method="find_many", model=None, arguments={})
+        per_call = (time.perf_counter() - start) / calls * 1e6
+        print(f"{label:<40} {per_call:8.2f} us/call")
+
+
+async def main(requests: int, concurrency: int) -> None:
+    for with_metrics in (False, True):
+        name = "route with metrics" if with_metrics else "route without metrics"
+        app = build_app(with_metrics)
+        print(await drive(name, route(app, "GET", "/items/1"), requests, concurrency))
+    await query_hook_overhead(requests)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    requests, concurrency = args + [20000, 32][len(args) :]
+    asyncio.run(main(requests, concurrency))
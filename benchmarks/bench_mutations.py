@@ -0,0 +1,112 @@
+"""
+Compares p50/p99 latency of the single-round-trip update and delete paths against the previous read-then-write implementations, under concurrent mutation. Requires a local Postgres at DATABASE_URL.
+
+    python -m benchmarks.bench_mutations [operations] [concurrency]
+"""
+
+import asyncio
+import sys
+
+import prisma.models
+import prisma.partials
+import project.deleteUserProfile_service
+import project.updateUserProfile_service
+from benchmarks._db import BENCH_EMAIL_PREFIX, connected, drop_bench_users, seed_users
+from benchmarks._harness import drive
+from project.auth_service import AuthenticatedUser
+
+
+async def legacy_update(user_id: int, email: str) -> None:
+    user = await prisma.models.User.prisma().find_unique(where={"id": user_id})
+    if not user:
+        raise ValueError(f"No user found with ID {user_id}")
+    await prisma.models.User.prisma().update(
+        where={"id": user_id}, data={"email": email}
+    )
+
+
+async def legacy_delete(user_id: int, token: str) -> None:
+    auth = await prisma.models.Auth.prisma().find_first(where={"token": token})
+    await prisma.models.User.prisma().find_unique(where={"id": auth.userId})
+    await prisma.models.Auth.prisma().delete_many(where={"userId": user_id})
+    await prisma.models.User.prisma().delete(where={"id": user_id})
+
+
+async def bench_users() -> list:
+    return await prisma.partials.UserSummary.prisma().find_many(
+        where={"email": {"startswith": BENCH_EMAIL_PREFIX}}, order={"id": "asc"}
+    )
+
+
+async def main(operations: int, concurrency: int) -> None:
+    async with connected():
+        await drop_bench_users()
+        await seed_users(operations * 2)
+        try:
+            users = await bench_users()
+            hot = users[: max(1, concurrency // 4)]
+
+            async def old_update(i: int) -> bool:
+                user = hot[i % len(hot)]
+                await legacy_update(user.id, f"{BENCH_EMAIL_PREFIX}old-{i}@example.com")
+                return True
+
+            async def new_update(i: int) -> bool:
+                user = hot[i % len(hot)]
+                await project.updateUserProfile_service.updateUserProfile(
+                    user.id,
+                    "bench",
+                    f"{BENCH_EMAIL_PREFIX}new-{i}@example.com",
+                    AuthenticatedUser(id=user.id, role=user.role),
+                )
+                return True
+
+            print(
+                await drive(
+                    "update, read-then-write", old_update, operations, concurrency, 0
+                )
+            )
+            print(
+                await drive(
+                    "update, single statement", new_update, operations, concurrency, 0
+                )
+            )
+
+            tokens = {}
+            for user in users:
+                auth = await prisma.models.Auth.prisma().create(
+                    data={"userId": user.id}
+                )
+                tokens[user.id] = auth.token
+            old_victims, new_victims = users[:operations], users[operations:]
+
+            async def old_delete(i: int) -> bool:
+                user = old_victims[i]
+                await legacy_delete(user.id, tokens[user.id])
+                return True
+
+            async def new_delete(i: int) -> bool:
+                user = new_victims[i]
+                res = await project.deleteUserProfile_service.deleteUserProfile(
+                    user.id, AuthenticatedUser(id=user.id, role=user.role)
+                )
+                return res.status == "success"
+
+            print(
+                await drive(
+                    "delete, four round-trips", old_delete, operations, concurrency, 0
+                )
+            )
+            print(
+                await drive(
+                    "delete, single statement", new_delete, operations, concurrency, 0
+                )
+            )
+        finally:
+            await drop_bench_users()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    operations, concurrency = args + [2000, 32][len(args) :]
+    asyncio.run(main(operations, concurrency))
@@ -0,0 +1,98 @@
+"""
+Load test for admission control: offers a DB-bound route 5x the load it can serve, open-loop (arrivals do not wait for responses), once without admission control and once behind AdmissionMiddleware. The "database" is a semaphore of `connections` slots held for `service_ms` each, standing in for the Prisma connection pool, so this runs without Postgres.
+
+Without admission control every request is eventually served and latency grows for as long as the overload lasts. With it, the excess is shed as 503s and the p99 of admitted requests stays near the queue timeout.
+
+    python -m benchmarks.bench_overload [seconds] [overload] [connections] [service_ms]
+"""
+
+import asyncio
+import sys
+import time
+from typing import List, Optional
+
+from benchmarks._harness import asgi_call, percentile
+from fastapi import FastAPI
+from project.admission import DB, AdmissionController, AdmissionMiddleware
+from project.query_tracking import query_budget
+
+
+def build_app(
+    connections: int, service: float, controller: Optional[AdmissionController]
+) -> FastAPI:
+    bench_app = FastAPI()
+    pool = asyncio.Semaphore(connections)
+
+    @bench_app.get("/db")
+    @query_budget(1)
+    async def db() -> dict:
+        async with pool:
+            await asyncio.sleep(service)
+        return {"ok": True}
+
+    if controller is not None:
+        bench_app.add_middleware(
+            AdmissionMiddleware, routes=bench_app.router.routes, controller=controller
+        )
+    return bench_app
+
+
+async def offer(bench_app: FastAPI, rate: float, seconds: float) -> None:
+    served: List[float] = []
+    shed: List[float] = []
+
+    async def one() -> None:
+        start = time.perf_counter()
+        status, _, _ = await asgi_call(bench_app, "GET", "/db")
+        (served if status == 200 else shed).append(time.perf_counter() - start)
+
+    tasks = []
+    tick = 0.005
+    start = time.perf_counter()
+    sent = 0
+    while time.perf_counter() - start < seconds:
+        due = int((time.perf_counter() - start) * rate)
+        for _ in range(due - sent):
+            tasks.append(asyncio.create_task(one()))
+        sent = due
+        await asyncio.sleep(tick)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    served.sort()
+    shed.sort()
+    print(
+        f"  offered {sent} ({rate:.0f}/s)  served {len(served)}"
+        f" ({len(served) / elapsed:.0f}/s)  shed {len(shed)}"
+    )
+    print(
+        f"  served p50 {percentile(served, 0.50) * 1000:9.1f} ms"
+        f"  p99 {percentile(served, 0.99) * 1000:9.1f} ms"
+        f"  max {(served[-1] if served else 0) * 1000:9.1f} ms"
+    )
+    if shed:
+        print(f"  shed   p99 {percentile(shed, 0.99) * 1000:9.1f} ms")
+
+
+async def main(
+    seconds: float, overload: float, connections: int, service_ms: float
+) -> None:
+    service = service_ms / 1000
+    capacity = connections / service
+    rate = capacity * overload
+    print(f"capacity {capacity:.0f} req/s, offering {overload:g}x for {seconds:g}s")
+    print("without admission control")
+    await offer(build_app(connections, service, None), rate, seconds)
+    controller = AdmissionController(
+        limits={DB: connections * 2},
+        max_queue=connections * 8,
+        queue_timeout=0.25,
+    )
+    print("with admission control")
+    await offer(build_app(connections, service, controller), rate, seconds)
+    print(f"  limiter stats {controller.stats()}")
+
+
+if __name__ == "__main__":
+    args = [float(a) for a in sys.argv[1:5]]
+    seconds, overload, connections, service_ms = args + [3, 5, 4, 10][len(args) :]
+    asyncio.run(main(seconds, overload, int(connections), service_ms))
@@ -0,0 +1,435 @@
+"""
+Load-tests every route in project.server in-process, through the full middleware stack and application lifespan, at a fixed concurrency, and reports throughput and p50/p95/p99 per route.
+
+By default the app's Prisma client is backed by an in-memory fake database (benchmarks/_fake_db.py), so results measure the application and are reproducible on any machine. With --postgres the real client talks to DATABASE_URL instead, which should be a disposable local database (`docker-compose up -d db`); everything seeded there is removed afterwards.
+
+Before the run the database is seeded with --users users (one of them an admin), --tokens bearer tokens spread over them, and --docs documentation revisions of realistic size. Heavy routes (password hashing, bulk writes, full exports) get a fixed fraction of --requests, shown in the report.
+
+Results are compared with the baseline file for the mode (benchmarks/baselines/bench_routes_<mode>.json), and a route whose throughput drops or whose p99 grows by more than --tolerance is reported as a regression, with exit status 1. Record a new baseline with --save-baseline. A baseline recorded with different settings is not compared.
+
+    python -m benchmarks.bench_routes [--postgres] [--requests N] [--concurrency C]
+        [--users U] [--tokens T] [--docs D] [--latency-ms L] [--only SUBSTRING]
+        [--baseline PATH] [--save-baseline] [--tolerance 0.15]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import secrets
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from benchmarks._db import BENCH_EMAIL_PREFIX
+from benchmarks._harness import (
+    BenchResult,
+    Headers,
+    asgi_call,
+    asgi_first_chunk,
+    drive,
+)
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+BENCH_PASSWORD = "bench-password"
+
+Op = Callable[[int], Awaitable[bool]]
+
+
+def load_app() -> Any:
+    """
+    Imports the app with the settings the suite relies on: no background maintenance, which is not a route, and a fixed token secret so seeded tokens verify. Anything set in the environment wins.
+    """
+    os.environ.setdefault("MAINTENANCE_ENABLED", "0")
+    os.environ.setdefault("AUTH_TOKEN_SECRET", "bench-secret")
+    import project.server
+
+    return project.server
+
+
+def docs_content(revision: int, size: int = 24_000) -> str:
+    section = (
+        "## Endpoint {n}\n\n"
+        "`GET /api/resource/{n}` returns the resource with the given id.\n\n"
+        "| Field | Type | Description |\n|---|---|---|\n"
+        "| id | int | The identifier. |\n| email | string | The address. |\n\n"
+    )
+    parts = [f"# hello worlld API, revision {revision}\n\n"]
+    n = 0
+    while sum(map(len, parts)) < size:
+        parts.append(section.format(n=n))
+        n += 1
+    return "".join(parts)
+
+
+async def seed(users: int, tokens: int, docs: int) -> Dict[str, Any]:
+    """
+    Seeds the registered client's database through the Prisma API, so the same code fills the fake and a real database. Returns what the scenarios need: the seeded user ids, an admin token and one user token per user it is issued to.
+    """
+    import prisma.enums
+    import prisma.models
+    import prisma.partials
+    import project.auth_service
+    import project.password_service
+
+    hashed = await project.password_service.password_hasher.hash(BENCH_PASSWORD)
+    for start in range(0, users, 5000):
+        await prisma.models.User.prisma().create_many(
+            data=[
+                {
+                    "email": f"{BENCH_EMAIL_PREFIX}{i}@example.com",
+                    "password": hashed,
+                    "role": (
+                        prisma.enums.Role.Admin if i == 0 else prisma.enums.Role.User
+                    ),
+                }
+                for i in range(start, min(start + 5000, users))
+            ],
+            skip_duplicates=True,
+        )
+    ids = [
+        user.id
+        for user in await prisma.partials.UserSummary.prisma().find_many(
+            where={"email": {"startswith": BENCH_EMAIL_PREFIX}}, order={"id": "asc"}
+        )
+    ]
+
+    def token() -> str:
+        nonce = secrets.token_urlsafe(24)
+        return f"{nonce}.{project.auth_service._sign(nonce)}"
+
+    issued: List[Tuple[int, str]] = [
+        (ids[i % len(ids)], token()) for i in range(tokens)
+    ]
+    for start in range(0, len(issued), 5000):
+        await prisma.models.Auth.prisma().create_many(
+            data=[
+                {"userId": user_id, "token": value}
+                for user_id, value in issued[start : start + 5000]
+            ]
+        )
+    doc_ids = [
+        (
+            await prisma.models.Documentation.prisma().create(
+                data={"content": docs_content(revision)}
+            )
+        ).id
+        for revision in range(docs)
+    ]
+    project.auth_service.token_cache.clear()
+    user_tokens = {}
+    for user_id, value in issued:
+        user_tokens.setdefault(user_id, value)
+    return {
+        "ids": ids,
+        "admin_token": user_tokens[ids[0]],
+        "user_tokens": user_tokens,
+        "doc_ids": doc_ids,
+    }
+
+
+async def drop_seeded(doc_ids: List[int]) -> None:
+    import prisma.models
+
+    users = {"email": {"startswith": BENCH_EMAIL_PREFIX}}
+    await prisma.models.Auth.prisma().delete_many(where={"user": {"is": users}})
+    await prisma.models.User.prisma().delete_many(where=users)
+    await prisma.models.Documentation.prisma().delete_many(
+        where={"id": {"in": doc_ids}}
+    )
+
+
+def request_op(
+    app: Any, build: Callable[[int], Tuple[str, str, List[Tuple[str, str]], bytes]]
+) -> Op:
+    """
+    Returns a `drive` operation that sends the request `build(n)` describes, where n counts calls across warm-up and measurement, so requests that must be unique (new emails, users to delete) never repeat. Any status below 400 is a success.
+    """
+    counter = itertools.count()
+
+    async def op(_: int) -> bool:
+        method, path, headers, body = build(next(counter))
+        status, _, _ = await asgi_call(app, method, path, headers, body)
+        return status < 400
+
+    return op
+
+
+def scenarios(app: Any, data: Dict[str, Any]) -> List[Tuple[str, float, Op]]:
+    """
+    One (name, share of --requests, operation) per route. Read-only routes come first and destructive ones last, so each scenario sees the seeded data intact.
+    """
+    ids: List[int] = data["ids"]
+    admin = [("authorization", f"Bearer {data['admin_token']}")]
+    self_id, self_token = next(
+        (user_id, value)
+        for user_id, value in data["user_tokens"].items()
+        if user_id != ids[0]
+    )
+    member = [("authorization", f"Bearer {self_token}")]
+    run = secrets.token_hex(3)
+    # The first 10% of users are kept for reads, deletions start after them.
+    deletable = ids[max(1, len(ids) // 10) :]
+
+    def pick(n: int) -> int:
+        return ids[(n * 7919) % len(ids)]
+
+    def bulk_body(n: int) -> bytes:
+        return json.dumps(
+            [
+                {
+                    "username": f"bulk{n}-{i}",
+                    "password": BENCH_PASSWORD,
+                    "email": f"{BENCH_EMAIL_PREFIX}bulk-{run}-{n}-{i}@example.com",
+                }
+                for i in range(20)
+            ]
+        ).encode()
+
+    async def events(_: int) -> bool:
+        status, chunk = await asgi_first_chunk(app, "/api/users/events", admin)
+        return status < 400 and bool(chunk)
+
+    def get(path: str, headers: Headers = ()) -> Op:
+        return request_op(app, lambda n: ("GET", path, list(headers), b""))
+
+    return [
+        ("GET /hello", 1.0, get("/hello")),
+        ("GET /version", 1.0, get("/version")),
+        ("GET /health/live", 1.0, get("/health/live")),
+        ("GET /health/ready", 1.0, get("/health/ready")),
+        (
+            "GET /health",
+            1.0,
+            request_op(
+                app,
+                lambda n: (
+                    "GET",
+                    "/health",
+                    [("content-type", "application/json")],
+                    b"{}",
+                ),
+            ),
+        ),
+        ("GET /metrics", 0.2, get("/metrics")),
+        ("GET /docs", 1.0, get("/docs", [("accept-encoding", "gzip, br")])),
+        (
+            "GET /api/users/{userId}",
+            1.0,
+            request_op(app, lambda n: ("GET", f"/api/users/{pick(n)}", [], b"")),
+        ),
+        (
+            "GET /api/users",
+            1.0,
+            request_op(
+                app,
+                lambda n: ("GET", f"/api/users?limit=100&after={pick(n)}", admin, b""),
+            ),
+        ),
+        ("GET /api/users/export", 0.01, get("/api/users/export", admin)),
+        ("GET /api/users/events", 0.2, events),
+        (
+            "POST /api/users/login",
+            0.05,
+            request_op(
+                app,
+                lambda n: (
+                    "POST",
+                    f"/api/users/login?username={BENCH_EMAIL_PREFIX}{n % len(ids)}"
+                    f"@example.com&password={BENCH_PASSWORD}",
+                    [],
+                    b"",
+                ),
+            ),
+        ),
+        (
+            "POST /api/users/register",
+            0.05,
+            request_op(
+                app,
+                lambda n: (
+                    "POST",
+                    f"/api/users/register?username=new{n}&password={BENCH_PASSWORD}"
+                    f"&email={BENCH_EMAIL_PREFIX}new-{run}-{n}@example.com",
+                    [],
+                    b"",
+                ),
+            ),
+        ),
+        (
+            "POST /api/users/register/bulk",
+            0.002,
+            request_op(
+                app,
+                lambda n: (
+                    "POST",
+                    "/api/users/register/bulk",
+                    admin + [("content-type", "application/json")],
+                    bulk_body(n),
+                ),
+            ),
+        ),
+        (
+            "PUT /api/users/{userId}",
+            0.5,
+            request_op(
+                app,
+                lambda n: (
+                    "PUT",
+                    f"/api/users/{self_id}?username=self"
+                    f"&email={BENCH_EMAIL_PREFIX}self-{run}-{n}@example.com",
+                    member,
+                    b"",
+                ),
+            ),
+        ),
+        (
+            "POST /admin/version/reload",
+            0.2,
+            request_op(app, lambda n: ("POST", "/admin/version/reload", admin, b"")),
+        ),
+        (
+            "DELETE /api/users/{userId}",
+            0.2,
+            request_op(
+                app,
+                lambda n: (
+                    "DELETE",
+                    f"/api/users/{deletable[n % len(deletable)]}",
+                    admin,
+                    b"",
+                ),
+            ),
+        ),
+    ]
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float,
+) -> List[str]:
+    """
+    Prints each route's change against the baseline and returns the routes that regressed: throughput down, or p99 up, by more than `tolerance`.
+    """
+    regressions = []
+    print(f"\n{'route':<34} {'req/s':>18} {'p99 ms':>22}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<34} {'(not in baseline)':>18}")
+            continue
+        rps = current["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        p99 = current["p99_ms"] / base["p99_ms"] - 1 if base["p99_ms"] else 0.0
+        regressed = rps < -tolerance or p99 > tolerance
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<34} {base['rps']:>8.0f} {rps:>+8.1%}"
+            f"  {base['p99_ms']:>10.2f} {p99:>+8.1%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    server = load_app()
+    fake = None
+    if not args.postgres:
+        from benchmarks._fake_db import FakeDatabase
+
+        fake = FakeDatabase(latency=args.latency_ms / 1000)
+        fake.install(server.db_client)
+    mode = "postgres" if args.postgres else "fake"
+    config = {
+        "mode": mode,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "tokens": args.tokens,
+        "docs": args.docs,
+        "latency_ms": args.latency_ms if fake else None,
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    async with server.app.router.lifespan_context(server.app):
+        data = await seed(args.users, args.tokens, args.docs)
+        try:
+            print(
+                f"{mode} database, {args.users} users, {args.tokens} tokens,"
+                f" {args.docs} docs revisions, concurrency {args.concurrency}"
+            )
+            for name, share, op in scenarios(server.app, data):
+                if args.only and args.only not in name:
+                    continue
+                requests = max(args.concurrency, int(args.requests * share))
+                result: BenchResult = await drive(name, op, requests, args.concurrency)
+                results[name] = result.as_dict()
+                print(f"{result}  ({requests} requests)")
+        finally:
+            if args.postgres:
+                await drop_seeded(data["doc_ids"])
+
+    baseline_path = Path(args.baseline or BASELINE_DIR / f"bench_routes_{mode}.json")
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(
+            json.dumps({"config": config, "results": results}, indent=2) + "\n"
+        )
+        print(f"\nSaved baseline to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"\nNo baseline at {baseline_path}; record one with --save-baseline.")
+        return 0
+    baseline = json.loads(baseline_path.read_text())
+    if baseline.get("config") != config:
+        print(
+            f"\nBaseline {baseline_path} was recorded with {baseline.get('config')},"
+            " not compared."
+        )
+        return 0
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(
+            f"\n{len(regressions)} route(s) regressed by more than {args.tolerance:.0%}."
+        )
+        return 1
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_routes",
+        description="Load-tests every route of project.server in-process.",
+    )
+    parser.add_argument(
+        "--postgres",
+        action="store_true",
+        help="use the database at DATABASE_URL instead of the in-memory fake",
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tokens", type=int, default=20_000)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="simulated round-trip per query of the fake database",
+    )
+    parser.add_argument("--only", help="run only routes whose name contains this")
+    parser.add_argument("--baseline", help="baseline file to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="relative throughput drop or p99 increase counted as a regression",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,94 @@
+"""
+Measures the cost of turning a GetUsersResponse with 10k users into a JSON body:
+
+- each serializer on its own (jsonable_encoder + json.dumps, which is FastAPI's default path, then model_dump_json, then orjson when it is installed),
+- end to end through a FastAPI route that returns the model under `response_model`, compared with one returning it through `project.responses.FastJSONResponse`.
+
+    python -m benchmarks.bench_serialization [users] [rounds]
+"""
+
+import asyncio
+import json
+import sys
+import time
+from typing import Callable
+
+import prisma.enums
+from benchmarks._harness import drive, route
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from project.listUsers_service import GetUsersResponse, UserDetail
+from project.responses import FastJSONResponse, orjson
+
+
+def build_response(users: int) -> GetUsersResponse:
+    return GetUsersResponse(
+        users=[
+            UserDetail(
+                id=i,
+                email=f"user{i}@example.com",
+                role=prisma.enums.Role.Admin if i % 10 == 0 else prisma.enums.Role.User,
+            )
+            for i in range(1, users + 1)
+        ],
+        next_cursor=users,
+    )
+
+
+def time_serializer(name: str, serialize: Callable[[], bytes], rounds: int) -> None:
+    size = len(serialize())
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        serialize()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    print(
+        f"{name:<40} median {samples[len(samples) // 2] * 1000:>8.2f} ms"
+        f"  min {samples[0] * 1000:>8.2f} ms  {size} bytes"
+    )
+
+
+def build_app(model: GetUsersResponse) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/validated", response_model=GetUsersResponse)
+    async def validated() -> GetUsersResponse:
+        return model
+
+    @bench_app.get("/fast", response_model=GetUsersResponse)
+    async def fast() -> GetUsersResponse | FastJSONResponse:
+        return FastJSONResponse(model)
+
+    return bench_app
+
+
+async def main(users: int, rounds: int) -> None:
+    model = build_response(users)
+    serializers = [
+        (
+            "jsonable_encoder + json.dumps",
+            lambda: json.dumps(jsonable_encoder(model)).encode(),
+        ),
+        ("model_dump_json", lambda: model.model_dump_json().encode()),
+        ("FastJSONResponse.render", lambda: FastJSONResponse(model).body),
+    ]
+    if orjson is not None:
+        serializers.append(
+            ("orjson.dumps(model_dump())", lambda: orjson.dumps(model.model_dump()))
+        )
+    for name, serialize in serializers:
+        time_serializer(name, serialize, rounds)
+
+    bench_app = build_app(model)
+    for name, path in (
+        ("route, response_model re-validation", "/validated"),
+        ("route, FastJSONResponse", "/fast"),
+    ):
+        print(await drive(name, route(bench_app, "GET", path), rounds, 1, 2))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    users, rounds = args + [10000, 50][len(args) :]
+    asyncio.run(main(users, rounds))
@@ -0,0 +1,72 @@
+"""
+Reports the memory footprint of the user index per 100k users, next to the same users held as cached UserProfileResponseModel objects (what `profile_loader` keeps per entry), and times lookups by id and email and 100-row keyset pages. Needs no database.
+
+    python -m benchmarks.bench_user_index [users]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import prisma.enums
+from project.getUserProfile_service import UserProfileResponseModel
+from project.user_index import UserProjection
+
+ROUNDS = 100_000
+
+
+def build(users: int) -> UserProjection:
+    projection = UserProjection()
+    for i in range(1, users + 1):
+        projection.put(i, f"user{i}@example.com", prisma.enums.Role.User, i % 7)
+    return projection
+
+
+def per_call_us(fn, rounds: int = ROUNDS) -> float:
+    start = time.perf_counter()
+    for i in range(rounds):
+        fn(i)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main(users: int) -> None:
+    scale = 100_000 / users
+    tracemalloc.start()
+    projection = build(users)
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    profiles = {
+        i: UserProfileResponseModel(
+            id=i, email=f"user{i}@example.com", role=prisma.enums.Role.User, version=0
+        )
+        for i in range(1, users + 1)
+    }
+    profile_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{users} users")
+    print(
+        f"user index           {index_bytes * scale / 1e6:8.1f} MB per 100k users"
+        f"  (footprint() says {projection.footprint() * scale / 1e6:.1f} MB)"
+    )
+    print(f"dict of profiles     {profile_bytes * scale / 1e6:8.1f} MB per 100k users")
+    print(
+        f"get by id            {per_call_us(lambda i: projection.get(i % users + 1)):8.2f} us"
+    )
+    print(
+        "owner of email       "
+        f"{per_call_us(lambda i: projection.by_email.get(f'user{i % users + 1}@example.com')):8.2f} us"
+    )
+    print(
+        "page of 100          "
+        f"{per_call_us(lambda i: projection.page((i * 7919) % users, 100), 10_000):8.2f} us"
+    )
+    del profiles
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    (users,) = args + [100_000][len(args) :]
+    main(users)
@@ -0,0 +1,42 @@
+"""
+Compares /version with a static route (/health/live, a constant pre-encoded body) and with a handler that builds and validates a VersionResponseModel per request.
+
+    python -m benchmarks.bench_version [requests] [concurrency]
+"""
+
+import asyncio
+import sys
+
+import project.get_version_service
+from benchmarks._harness import drive, route
+from fastapi import FastAPI
+from project.server import app
+
+
+def build_model_app() -> FastAPI:
+    model_app = FastAPI()
+
+    @model_app.get(
+        "/version", response_model=project.get_version_service.VersionResponseModel
+    )
+    async def version() -> project.get_version_service.VersionResponseModel:
+        return project.get_version_service.VersionResponseModel(
+            version=project.get_version_service.version_cache.model.version
+        )
+
+    return model_app
+
+
+async def main(requests: int, concurrency: int) -> None:
+    for name, target, path in (
+        ("static /health/live", app, "/health/live"),
+        ("/version", app, "/version"),
+        ("model + response_model", build_model_app(), "/version"),
+    ):
+        print(await drive(name, route(target, "GET", path), requests, concurrency))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    requests, concurrency = args + [20000, 32][len(args) :]
+    asyncio.run(main(requests, concurrency))
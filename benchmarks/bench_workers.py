@@ -0,0 +1,109 @@
+"""
+Measures requests/sec as the number of worker processes grows from 1 to N. For each count, `python -m project.serve` is started with WEB_CONCURRENCY set, then loaded over real keep-alive HTTP connections. Requires a local Postgres at DATABASE_URL.
+
+The default path, /health/ready, makes one database round-trip per request and bypasses the response cache. Pass /hello to measure the CPU-only path instead.
+
+    python -m benchmarks.bench_workers [max_workers] [path] [seconds] [connections]
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from typing import List
+
+from benchmarks._harness import percentile
+
+PORT = int(os.getenv("BENCH_PORT", "8765"))
+
+
+async def request_loop(path: str, until: float, samples: List[float]) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    request = f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode()
+    errors = 0
+    try:
+        while time.perf_counter() < until:
+            start = time.perf_counter()
+            writer.write(request)
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.partition(b":")
+                if name.lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            samples.append(time.perf_counter() - start)
+            if b" 200 " not in status_line:
+                errors += 1
+    finally:
+        writer.close()
+    return errors
+
+
+async def wait_ready(deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", PORT)
+            writer.close()
+            await asyncio.sleep(1.0)
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def measure(workers: int, path: str, seconds: float, connections: int) -> None:
+    env = {
+        **os.environ,
+        "APP_ENV": os.environ.get("APP_ENV", "development"),
+        "WEB_CONCURRENCY": str(workers),
+        "PORT": str(PORT),
+        "RESPONSE_CACHE_ENABLED": "0",
+        "ADMISSION_ENABLED": "0",
+        "METRICS_ENABLED": "0",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "project.serve"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_ready(time.perf_counter() + 60)
+        samples: List[float] = []
+        until = time.perf_counter() + seconds
+        start = time.perf_counter()
+        errors = sum(
+            await asyncio.gather(
+                *(request_loop(path, until, samples) for _ in range(connections))
+            )
+        )
+        elapsed = time.perf_counter() - start
+        samples.sort()
+        print(
+            f"{workers:>3} worker(s)  {len(samples) / elapsed:>10.1f} req/s"
+            f"  p50 {percentile(samples, 0.5) * 1000:>8.2f} ms"
+            f"  p99 {percentile(samples, 0.99) * 1000:>8.2f} ms  errors {errors}"
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+async def main(max_workers: int, path: str, seconds: float, connections: int) -> None:
+    print(f"GET {path}, {connections} connections, {seconds:g}s per run")
+    counts = sorted({2**i for i in range(max_workers.bit_length())} | {max_workers})
+    for workers in counts:
+        await measure(workers, path, seconds, connections)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:5]
+    max_workers, path, seconds, connections = (
+        args + [str(os.cpu_count() or 1), "/health/ready", "10", "64"][len(args) :]
+    )
+    asyncio.run(main(int(max_workers), path, float(seconds), int(connections)))
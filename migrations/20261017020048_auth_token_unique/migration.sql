@@ -0,0 +1,5 @@
+-- CreateIndex
+CREATE UNIQUE INDEX "Auth_token_key" ON "Auth"("token");
+
+-- CreateIndex
+CREATE INDEX "Auth_userId_idx" ON "Auth"("userId");
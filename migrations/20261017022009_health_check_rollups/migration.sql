@@ -0,0 +1,19 @@
+-- CreateTable
+CREATE TABLE "HealthCheckRollup" (
+    "id" SERIAL NOT NULL,
+    "granularity" TEXT NOT NULL,
+    "bucketStart" TIMESTAMP(3) NOT NULL,
+    "status" TEXT NOT NULL,
+    "checks" INTEGER NOT NULL,
+
+    CONSTRAINT "HealthCheckRollup_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE INDEX "HealthCheck_checkedAt_idx" ON "HealthCheck"("checkedAt");
+
+-- CreateIndex
+CREATE UNIQUE INDEX "HealthCheckRollup_granularity_bucketStart_status_key" ON "HealthCheckRollup"("granularity", "bucketStart", "status");
+
+-- CreateIndex
+CREATE INDEX "Auth_createdAt_idx" ON "Auth"("createdAt");
@@ -0,0 +1,2 @@
+# Imported before any other project module, so the startup profile covers them all.
+import project.startup_profile  # noqa: F401
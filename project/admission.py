@@ -0,0 +1,359 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from project.responses import error_response
+from project.route_labels import RouteResolver
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") not in ("0", "false", "False")
+
+# The defaults fit the deployment in .github/workflows/deploy.yml: one worker in a
+# 512M Cloud Run instance with one vCPU. The worker (~65M), its query engine (~80M),
+# one hashing process (~60M), the response cache (64M) and the other caches (~20M)
+# leave ~128M for requests once ~95M is kept free. 16 DB-bound requests each
+# holding a full 1000-row page (~2M) take 32M, and they keep the engine's 3
+# pooled connections busy. The other in-flight requests stay under 0.5M each, and
+# a queued one holds at most its 64K read buffer.
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", "128"))
+
+ADMISSION_STATIC_MAX_INFLIGHT = int(os.getenv("ADMISSION_STATIC_MAX_INFLIGHT", "128"))
+
+ADMISSION_DB_MAX_INFLIGHT = int(os.getenv("ADMISSION_DB_MAX_INFLIGHT", "16"))
+
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(
+    os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "1.0")
+)
+
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+ADMISSION_CLIENT_RATE = float(os.getenv("ADMISSION_CLIENT_RATE", "0"))
+
+ADMISSION_CLIENT_BURST = float(os.getenv("ADMISSION_CLIENT_BURST", "20"))
+
+ADMISSION_CLIENT_TRACKED = int(os.getenv("ADMISSION_CLIENT_TRACKED", "10000"))
+
+ADMISSION_TRUSTED_PROXIES = int(os.getenv("ADMISSION_TRUSTED_PROXIES", "0"))
+
+STATIC = "static"
+DB = "db"
+EXEMPT = "exempt"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def admission_class(name: str, release_on_stream: bool = False) -> Callable[[F], F]:
+    """
+    Puts a route in an admission class explicitly. Routes without one are classed by their `query_budget`: a budget of 0 makes them STATIC, anything else DB. EXEMPT routes, such as health probes, are never queued or shed. Apply it below the route decorator:
+
+        @app.get("/health/live")
+        @admission_class(EXEMPT)
+        async def api_get_check_liveness(): ...
+
+    With `release_on_stream`, the request gives its slots back once its response starts, instead of when the response completes. This suits long-lived streams that do their database work before the first byte and only relay data afterwards.
+    """
+
+    def decorate(endpoint: F) -> F:
+        endpoint.__admission_class__ = name
+        endpoint.__admission_release_on_stream__ = release_on_stream
+        return endpoint
+
+    return decorate
+
+
+def route_admission_class(endpoint: Any) -> str:
+    """
+    The admission class of a route's endpoint: its `admission_class`, or STATIC when it declares a query budget of 0 (or there is no route), and DB otherwise.
+    """
+    name = getattr(endpoint, "__admission_class__", None)
+    if name is None:
+        budget = getattr(endpoint, "__query_budget__", None)
+        name = STATIC if endpoint is None or budget == 0 else DB
+    return name
+
+
+class ConcurrencyLimiter:
+    """
+    Caps the requests running at once, with a bounded FIFO queue in front.
+
+    `acquire` returns False instead of waiting when the queue is full, or once the caller's deadline passes. A released slot is handed directly to the oldest waiter, so a newcomer can never overtake the queue.
+    """
+
+    def __init__(self, name: str, max_inflight: int, max_queue: int) -> None:
+        self.name = name
+        self.max_inflight = max(1, max_inflight)
+        self.max_queue = max(0, max_queue)
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, deadline: float) -> bool:
+        if self.in_flight < self.max_inflight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(future), max(0.0, deadline - time.monotonic())
+            )
+        except asyncio.TimeoutError:
+            if not self._abandon(future):
+                self.admitted += 1
+                return True
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            if not self._abandon(future):
+                self.release()
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                # The slot passes to the waiter; in_flight stays the same.
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _abandon(self, future: asyncio.Future) -> bool:
+        """
+        Withdraws a waiter. Returns False if it was granted a slot in the meantime, which the caller then owns.
+        """
+        if future.done():
+            return False
+        future.cancel()
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+        return True
+
+
+class ClientRateLimiter:
+    """
+    A token bucket per client: `rate` requests per second on average, with bursts of up to `burst`. Only the `max_clients` most recently seen clients are tracked.
+    """
+
+    def __init__(
+        self,
+        rate: float = ADMISSION_CLIENT_RATE,
+        burst: float = ADMISSION_CLIENT_BURST,
+        max_clients: int = ADMISSION_CLIENT_TRACKED,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_clients = max_clients
+        self.limited = 0
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+
+    def take(self, client: str) -> float:
+        """
+        Takes one token for `client`. Returns 0 if one was available, otherwise the seconds until one will be.
+        """
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= 1.0:
+            tokens -= 1.0
+        else:
+            wait = (1.0 - tokens) / self.rate
+            self.limited += 1
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def client_address(
+    scope: Scope, trusted_proxies: int = ADMISSION_TRUSTED_PROXIES
+) -> str:
+    """
+    Identifies the client for rate limiting.
+
+    Each proxy appends the address it received the request from to X-Forwarded-For, so only the last `trusted_proxies` entries were written by infrastructure we control. Everything to their left comes from the client and can be forged. With `trusted_proxies` > 0 (one for Cloud Run's front end), the client is the entry appended by the outermost trusted proxy, counted from the right. Otherwise, or when the header has fewer entries than that, the client is the peer address (`scope["client"]`, which uvicorn rewrites only for FORWARDED_ALLOW_IPS peers).
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if trusted_proxies <= 0:
+        return peer
+    hops = [
+        hop.strip()
+        for name, value in scope.get("headers", ())
+        if name == b"x-forwarded-for"
+        for hop in value.decode("latin-1").split(",")
+    ]
+    if len(hops) < trusted_proxies or not hops[-trusted_proxies]:
+        return peer
+    return hops[-trusted_proxies]
+
+
+class AdmissionController:
+    """
+    The limiters one worker admits requests through: one ConcurrencyLimiter per route class, a global one, and an optional ClientRateLimiter. Kept apart from the middleware so the counters can be exported.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        max_inflight: int = ADMISSION_MAX_INFLIGHT,
+        max_queue: int = ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        retry_after: int = ADMISSION_RETRY_AFTER_SECONDS,
+        rate_limiter: Optional[ClientRateLimiter] = None,
+    ) -> None:
+        if limits is None:
+            limits = {
+                STATIC: ADMISSION_STATIC_MAX_INFLIGHT,
+                DB: ADMISSION_DB_MAX_INFLIGHT,
+            }
+        self.limiters = {
+            name: ConcurrencyLimiter(name, limit, max_queue)
+            for name, limit in limits.items()
+        }
+        self.global_limiter = ConcurrencyLimiter("global", max_inflight, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.rate_limiter = rate_limiter
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            limiter.name: {
+                "in_flight": limiter.in_flight,
+                "queued": limiter.queued,
+                "admitted": limiter.admitted,
+                "rejected": limiter.rejected,
+                "timed_out": limiter.timed_out,
+            }
+            for limiter in (*self.limiters.values(), self.global_limiter)
+        }
+
+
+admission_controller = AdmissionController(
+    rate_limiter=ClientRateLimiter() if ADMISSION_CLIENT_RATE > 0 else None
+)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that bounds the work a worker accepts, so that a traffic spike gets fast 503s instead of an ever-growing queue in front of the Prisma connection.
+
+    - Every request holds a slot in its route class (STATIC or DB) and a global slot until its response is complete, or until it starts for routes declared with `release_on_stream`.
+    - When no slot is free, the request waits in that limiter's bounded queue, for at most `queue_timeout` seconds in total, then gets 503 with Retry-After.
+    - With a rate limiter, clients over their token bucket get 429 with Retry-After before taking any slot.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Sequence,
+        controller: AdmissionController = admission_controller,
+    ) -> None:
+        self.app = app
+        self.resolver = RouteResolver(routes)
+        self.controller = controller
+        self._classes: Dict[Any, Tuple[str, bool]] = {}
+
+    def route_class(self, scope: Scope) -> str:
+        return self._route_policy(scope)[0]
+
+    def _route_policy(self, scope: Scope) -> Tuple[str, bool]:
+        """
+        The route's admission class, and whether it releases its slots when the response starts.
+        """
+        route = self.resolver.resolve(scope)
+        endpoint = getattr(route, "endpoint", None)
+        policy = self._classes.get(endpoint)
+        if policy is None:
+            policy = self._classes[endpoint] = (
+                route_admission_class(endpoint),
+                getattr(endpoint, "__admission_release_on_stream__", False),
+            )
+        return policy
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        name, release_on_stream = self._route_policy(scope)
+        if name == EXEMPT:
+            await self.app(scope, receive, send)
+            return
+        controller = self.controller
+        if controller.rate_limiter is not None:
+            wait = controller.rate_limiter.take(client_address(scope))
+            if wait:
+                await error_response(
+                    "Too many requests.",
+                    429,
+                    {"Retry-After": str(max(1, math.ceil(wait)))},
+                )(scope, receive, send)
+                return
+        limiter = controller.limiters.get(name, controller.global_limiter)
+        deadline = time.monotonic() + controller.queue_timeout
+        if not await limiter.acquire(deadline):
+            await self._shed(scope, receive, send)
+            return
+        held = [limiter]
+        try:
+            if limiter is not controller.global_limiter:
+                if not await controller.global_limiter.acquire(deadline):
+                    await self._shed(scope, receive, send)
+                    return
+                held.append(controller.global_limiter)
+            if release_on_stream:
+                send = self._releasing(send, held)
+            await self.app(scope, receive, send)
+        finally:
+            for slot in held:
+                slot.release()
+
+    @staticmethod
+    def _releasing(send: Send, held: List[ConcurrencyLimiter]) -> Send:
+        """
+        Wraps `send` to release the slots in `held` when the response starts, emptying the list so they are not released again.
+        """
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                while held:
+                    held.pop().release()
+            await send(message)
+
+        return send_wrapper
+
+    async def _shed(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await error_response(
+            "Server is at capacity, retry shortly.",
+            503,
+            {"Retry-After": str(self.controller.retry_after)},
+        )(scope, receive, send)
@@ -0,0 +1,232 @@
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Annotated, Dict, Optional, Set, Tuple
+
+import prisma
+import prisma.enums
+import prisma.models
+from fastapi import Header, HTTPException
+from pydantic import BaseModel
+from starlette.requests import HTTPConnection
+
+logger = logging.getLogger(__name__)
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
+AUTH_TOKEN_TTL_SECONDS = float(os.getenv("AUTH_TOKEN_TTL_SECONDS", str(30 * 86400)))
+
+AUTH_TOKEN_SECRET = os.getenv("AUTH_TOKEN_SECRET", "")
+
+# "development" allows a missing or placeholder AUTH_TOKEN_SECRET; anything else
+# (including unset) refuses to start without a real one.
+APP_ENV = os.getenv("APP_ENV", "production")
+
+_PLACEHOLDER_SECRETS = ("", "change-me")
+
+_insecure_secret = AUTH_TOKEN_SECRET in _PLACEHOLDER_SECRETS
+
+if not AUTH_TOKEN_SECRET and APP_ENV == "development":
+    logger.warning(
+        "AUTH_TOKEN_SECRET is not set; using a random per-process secret, so issued"
+        " tokens will not survive a restart or be accepted by other workers"
+    )
+    AUTH_TOKEN_SECRET = secrets.token_hex(32)
+
+
+def check_token_secret() -> None:
+    """
+    Refuses to start outside local development (APP_ENV=development) when AUTH_TOKEN_SECRET is unset or still the placeholder from .env.example, since anyone could then mint tokens for any user.
+    """
+    if _insecure_secret and APP_ENV != "development":
+        raise RuntimeError(
+            "AUTH_TOKEN_SECRET is unset or the 'change-me' placeholder; set a random"
+            " secret shared by every worker and instance (or APP_ENV=development for"
+            " local use)"
+        )
+
+
+# Tokens older than AUTH_TOKEN_TTL_SECONDS (0 = never) are treated as unknown, and
+# purged by project.maintenance. "createdAt" is stored in UTC.
+_RESOLVE_TOKEN_SQL = (
+    'SELECT u."id", u."role"::text AS "role" FROM "Auth" a '
+    'JOIN "User" u ON u."id" = a."userId" WHERE a."token" = $1 '
+    'AND ($2::float8 <= 0 OR a."createdAt" > '
+    "(now() AT TIME ZONE 'UTC') - $2::float8 * interval '1 second')"
+)
+
+
+class AuthenticatedUser(BaseModel):
+    """
+    The identity behind a verified bearer token: the user's id and role, without any other user data.
+    """
+
+    id: int
+    role: prisma.enums.Role
+
+
+class TokenCache:
+    """
+    A bounded LRU cache of token -> AuthenticatedUser with a per-entry TTL. A reverse index by user id lets every token of a user be dropped at once when the user's 'Auth' rows are removed.
+
+    The cache is per process. Revocations made by another worker become visible here once the TTL expires.
+    """
+
+    def __init__(
+        self, max_size: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL_SECONDS
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Tuple[float, AuthenticatedUser]] = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+
+    def get(self, token: str) -> Optional[AuthenticatedUser]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self._discard(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def put(self, token: str, user: AuthenticatedUser) -> None:
+        if self.max_size <= 0:
+            return
+        self._discard(token)
+        self._entries[token] = (time.monotonic() + self.ttl, user)
+        self._by_user.setdefault(user.id, set()).add(token)
+        while len(self._entries) > self.max_size:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate_token(self, token: str) -> None:
+        self._discard(token)
+
+    def invalidate_user(self, user_id: int) -> None:
+        for token in self._by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_user.clear()
+
+    def _discard(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._by_user.get(entry[1].id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._by_user[entry[1].id]
+
+
+token_cache = TokenCache()
+
+
+def _sign(nonce: str) -> str:
+    mac = hmac.new(AUTH_TOKEN_SECRET.encode(), nonce.encode(), hashlib.sha256)
+    return base64.urlsafe_b64encode(mac.digest()).rstrip(b"=").decode("ascii")
+
+
+def token_signature_valid(token: str) -> bool:
+    """
+    Checks the HMAC on a token issued by `issueToken`. Forged or malformed tokens are rejected here, before any cache or database lookup.
+    """
+    nonce, _, signature = token.partition(".")
+    return bool(nonce and signature) and hmac.compare_digest(signature, _sign(nonce))
+
+
+async def issueToken(user: AuthenticatedUser) -> str:
+    """
+    Issues a signed bearer token for `user`, stores it as an 'Auth' row and primes `token_cache` with it.
+
+    Args:
+        user (AuthenticatedUser): The user the token is issued to.
+
+    Returns:
+        str: The token, formatted as '<nonce>.<signature>'.
+    """
+    nonce = secrets.token_urlsafe(24)
+    token = f"{nonce}.{_sign(nonce)}"
+    await prisma.models.Auth.prisma().create(data={"userId": user.id, "token": token})
+    token_cache.put(token, user)
+    return token
+
+
+async def verifyToken(token: str) -> Optional[AuthenticatedUser]:
+    """
+    Resolves a bearer token to the user it belongs to. Tokens with a bad signature are rejected without any lookup. Results are cached in `token_cache`. On a miss, one query joins 'Auth' to 'User' through the unique index on `Auth.token`. Tokens older than AUTH_TOKEN_TTL_SECONDS are rejected, although one already in `token_cache` stays valid until its cache entry expires.
+
+    Args:
+        token (str): The raw bearer token, without the 'Bearer ' prefix.
+
+    Returns:
+        Optional[AuthenticatedUser]: The token's owner, or None if the token is forged, unknown or expired.
+
+    Example:
+        user = await verifyToken('q3Jf...x9.tW2b...Qk')
+        > AuthenticatedUser(id=1, role=Role.Admin)
+    """
+    if not token_signature_valid(token):
+        return None
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    row = await prisma.get_client().query_first(
+        _RESOLVE_TOKEN_SQL, token, AUTH_TOKEN_TTL_SECONDS
+    )
+    if not row:
+        return None
+    user = AuthenticatedUser(id=row["id"], role=prisma.enums.Role(row["role"]))
+    token_cache.put(token, user)
+    return user
+
+
+async def require_user(
+    authorization: Annotated[Optional[str], Header()] = None,
+) -> AuthenticatedUser:
+    """
+    FastAPI dependency shared by every authenticated route. Reads the 'Authorization: Bearer <token>' header and resolves it through `verifyToken`, answering 401 when the header is missing or the token is unknown.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise HTTPException(
+            status_code=401,
+            detail="Missing bearer token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user = await verifyToken(token.strip())
+    if user is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid authentication token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+async def requester_role(connection: HTTPConnection) -> Optional[str]:
+    """
+    Returns the role of the bearer token's owner, or None when the request is unauthenticated. Used as a response cache vary resolver, so cached responses are only shared between callers with the same role.
+
+    The response cache runs outside admission control and the database gate, so this never queries: it checks the token's signature and reads `token_cache`. A token not cached yet returns None, and that request bypasses the cache. The route's `require_user` then resolves the token under admission control and caches it for the caller's next request.
+    """
+    scheme, _, token = (connection.headers.get("authorization") or "").partition(" ")
+    token = token.strip()
+    if scheme.lower() != "bearer" or not token or not token_signature_valid(token):
+        return None
+    user = token_cache.get(token)
+    return str(user.role) if user is not None else None
@@ -1,9 +1,27 @@
+import asyncio
 import datetime
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
 
 import prisma
 import prisma.models
+from prisma import Prisma
+from project.preencoded import PreencodedBody
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
+HEALTHCHECK_QUEUE_SIZE = int(os.getenv("HEALTHCHECK_QUEUE_SIZE", "1000"))
+
+HEALTHCHECK_FLUSH_SIZE = int(os.getenv("HEALTHCHECK_FLUSH_SIZE", "100"))
+
+HEALTHCHECK_FLUSH_SECONDS = float(os.getenv("HEALTHCHECK_FLUSH_SECONDS", "10"))
+
+HEALTHCHECK_COALESCE_SECONDS = int(os.getenv("HEALTHCHECK_COALESCE_SECONDS", "1"))
+
+READINESS_TIMEOUT_SECONDS = float(os.getenv("READINESS_TIMEOUT_SECONDS", "2"))
+
 
 class HealthCheckRequest(BaseModel):
     """
@@ -21,6 +39,110 @@ class HealthCheckResponse(BaseModel):
     status: str
 
 
+ProbeRecord = Tuple[str, datetime.datetime]
+
+
+class HealthCheckWriter:
+    """
+    Buffers health probe records in a bounded in-process queue and writes them to the 'HealthCheck' table in batches with `create_many`, flushing whenever `flush_size` records are pending or `flush_interval` seconds have passed since the first one arrived.
+
+    Probes with the same status that land in the same `coalesce_seconds` bucket are written as a single row. When the queue is full, new records are dropped and counted rather than slowing the probe down.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = HEALTHCHECK_QUEUE_SIZE,
+        flush_size: int = HEALTHCHECK_FLUSH_SIZE,
+        flush_interval: float = HEALTHCHECK_FLUSH_SECONDS,
+        coalesce_seconds: int = HEALTHCHECK_COALESCE_SECONDS,
+    ) -> None:
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.coalesce_seconds = max(coalesce_seconds, 1)
+        self.dropped = 0
+        self.written = 0
+        self._queue: asyncio.Queue[ProbeRecord] = asyncio.Queue(maxsize=max_queue)
+        self._pending: List[ProbeRecord] = []
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+
+    def record(self, status: str) -> None:
+        """
+        Enqueues a probe record without waiting. Never touches the database.
+        """
+        try:
+            self._queue.put_nowait(
+                (status, datetime.datetime.now(datetime.timezone.utc))
+            )
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the background loop and flushes everything still buffered. Called from the application lifespan on shutdown.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._inflight is not None and not self._inflight.done():
+            await asyncio.gather(self._inflight, return_exceptions=True)
+        batch, self._pending = self._pending, []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            await self._flush(batch)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._pending.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self._pending) < self.flush_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._pending.append(
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            batch, self._pending = self._pending, []
+            # Shield the write so a shutdown cancel cannot lose a batch mid-flight.
+            self._inflight = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._inflight)
+
+    def _coalesce(self, batch: List[ProbeRecord]) -> List[ProbeRecord]:
+        buckets: Dict[Tuple[str, int], ProbeRecord] = {}
+        for status, checked_at in batch:
+            key = (status, int(checked_at.timestamp()) // self.coalesce_seconds)
+            buckets.setdefault(key, (status, checked_at))
+        return list(buckets.values())
+
+    async def _flush(self, batch: List[ProbeRecord]) -> None:
+        rows = self._coalesce(batch)
+        try:
+            await prisma.models.HealthCheck.prisma().create_many(
+                data=[
+                    {"status": status, "checkedAt": checked_at}
+                    for status, checked_at in rows
+                ]
+            )
+            self.written += len(rows)
+        except Exception:
+            logger.exception("Failed to write %d health check records", len(rows))
+
+
+health_check_writer = HealthCheckWriter()
+
+liveness_body = PreencodedBody.from_json({"status": "UP"})
+
+
 async def check_health(request: HealthCheckRequest) -> HealthCheckResponse:
     """
     This endpoint is called to check if the API is running properly. It will return a JSON object with the status of the service.
@@ -30,7 +152,7 @@ async def check_health(request: HealthCheckRequest) -> HealthCheckResponse:
       "status": "UP"
     }
 
-    How it works: The '/health' endpoint does not interact with other internal endpoints or external APIs. It simply checks if the server is up and running. If the server is functioning correctly, it returns a response with the status 'UP'. This endpoint is useful for monitoring and automated checks.
+    How it works: The '/health' endpoint does not interact with other internal endpoints or external APIs. It simply checks if the server is up and running. If the server is functioning correctly, it returns a response with the status 'UP'. The probe is recorded through the buffered `health_check_writer` rather than with a per-call INSERT.
 
     Args:
     request (HealthCheckRequest): The request model for the health check endpoint. Since this endpoint does not accept any input parameters, the Fields list is empty.
@@ -43,8 +165,32 @@ async def check_health(request: HealthCheckRequest) -> HealthCheckResponse:
         response = await check_health(request)
         assert response.status == "UP"
     """
-    await prisma.models.HealthCheck.prisma().create(
-        data={"status": "UP", "checkedAt": datetime.datetime.now()}
-    )
+    health_check_writer.record("UP")
     response = HealthCheckResponse(status="UP")
     return response
+
+
+async def check_readiness(client: Prisma) -> HealthCheckResponse:
+    """
+    Reports whether this instance can serve database-backed traffic by running a trivial query on the shared Prisma client, bounded by READINESS_TIMEOUT_SECONDS.
+
+    Args:
+    client (Prisma): The application's shared Prisma client.
+
+    Returns:
+    HealthCheckResponse: 'UP' when the database answered in time, 'DOWN' otherwise.
+
+    Example:
+        response = await check_readiness(db_client)
+        assert response.status == "UP"
+    """
+    if not client.is_connected():
+        return HealthCheckResponse(status="DOWN")
+    try:
+        await asyncio.wait_for(
+            client.query_raw("SELECT 1"), timeout=READINESS_TIMEOUT_SECONDS
+        )
+    except Exception:
+        logger.warning("Readiness check failed", exc_info=True)
+        return HealthCheckResponse(status="DOWN")
+    return HealthCheckResponse(status="UP")
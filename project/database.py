@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from prisma import Prisma
+from project.admission import DB, route_admission_class
+from project.responses import error_response
+from project.route_labels import RouteResolver
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "0"))
+
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+
+DB_CONNECT_TIMEOUT_SECONDS = float(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "10"))
+
+DB_WARMUP_QUERIES = int(os.getenv("DB_WARMUP_QUERIES", "0"))
+
+DB_CONNECT_IN_BACKGROUND = os.getenv("DB_CONNECT_IN_BACKGROUND", "0") in (
+    "1",
+    "true",
+    "True",
+)
+
+DB_CONNECT_RETRY_SECONDS = float(os.getenv("DB_CONNECT_RETRY_SECONDS", "1"))
+
+
+def pooled_url(url: str, pool_size: int, pool_timeout: float) -> str:
+    """
+    Adds the query engine's pool settings (`connection_limit`, `pool_timeout`) to a Postgres URL. Settings already present in the URL are kept, and a `pool_size` of 0 leaves the engine default (2 x CPUs + 1).
+
+    Example:
+        pooled_url("postgresql://u:p@db:5432/app", 5, 10)
+        > 'postgresql://u:p@db:5432/app?connection_limit=5&pool_timeout=10'
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    if pool_size > 0:
+        query.setdefault("connection_limit", str(pool_size))
+    query.setdefault("pool_timeout", f"{pool_timeout:g}")
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def create_client(
+    pool_size: int = DB_POOL_SIZE,
+    pool_timeout: float = DB_POOL_TIMEOUT_SECONDS,
+    connect_timeout: float = DB_CONNECT_TIMEOUT_SECONDS,
+) -> Prisma:
+    """
+    Creates the process's Prisma client, registered as the default client for model queries. Every worker process imports `project.server` on its own, so each worker gets its own client and pool. A deployment opens up to workers x `pool_size` connections.
+    """
+    url = os.getenv("DATABASE_URL")
+    datasource = (
+        {"url": pooled_url(url, pool_size, pool_timeout)} if url is not None else None
+    )
+    return Prisma(
+        auto_register=True,
+        datasource=datasource,
+        connect_timeout=timedelta(seconds=connect_timeout),
+    )
+
+
+async def warm_up(client: Prisma, queries: Optional[int] = None) -> float:
+    """
+    Runs `queries` concurrent `SELECT 1`s right after connecting (by default DB_WARMUP_QUERIES, or the pool size, or 1), so the first requests do not pay for opening connections. Returns the seconds it took.
+    """
+    if queries is None:
+        queries = DB_WARMUP_QUERIES or DB_POOL_SIZE or 1
+    start = time.perf_counter()
+    await asyncio.gather(*(client.query_raw("SELECT 1") for _ in range(queries)))
+    elapsed = time.perf_counter() - start
+    logger.info("Warmed up %d database connections in %.3fs", queries, elapsed)
+    return elapsed
+
+
+class ConnectionGate:
+    """
+    Tracks whether the process's database connection is open, so the app can start serving before it is. `open` connects and warms up, typically from a background task. Until it succeeds, `wait` holds DB-bound requests back.
+    """
+
+    def __init__(self) -> None:
+        self._ready = asyncio.Event()
+        self.error: Optional[BaseException] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    async def open(self, client: Prisma) -> None:
+        try:
+            if not client.is_connected():
+                await client.connect()
+        except Exception as e:
+            self.error = e
+            raise
+        try:
+            await warm_up(client)
+        except Exception:
+            logger.exception("Database warm-up failed")
+        self.error = None
+        self._ready.set()
+
+    async def wait(self, timeout: float) -> bool:
+        if self._ready.is_set():
+            return True
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+connection_gate = ConnectionGate()
+
+
+class DatabaseGateMiddleware:
+    """
+    ASGI middleware for background-connect startup: requests to DB-bound routes (admission class DB) wait up to `timeout` seconds for `connection_gate`, and get 503 with Retry-After if the database is still not connected. Every other route is served straight away.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Sequence,
+        gate: ConnectionGate = connection_gate,
+        timeout: float = DB_CONNECT_TIMEOUT_SECONDS,
+    ) -> None:
+        self.app = app
+        self.resolver = RouteResolver(routes)
+        self.gate = gate
+        self.timeout = timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.gate.ready:
+            await self.app(scope, receive, send)
+            return
+        route = self.resolver.resolve(scope)
+        if route_admission_class(getattr(route, "endpoint", None)) != DB:
+            await self.app(scope, receive, send)
+            return
+        if not await self.gate.wait(self.timeout):
+            await error_response(
+                "Database is not connected yet, retry shortly.",
+                503,
+                {"Retry-After": "1"},
+            )(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,74 @@
+import functools
+import logging
+import time
+from typing import Any, Callable, List, Optional
+
+from prisma import Prisma
+
+logger = logging.getLogger(__name__)
+
+QueryListener = Callable[[str, str, Any, float, Optional[BaseException]], None]
+"""Called after every Prisma query with (model, action, arguments, seconds, error)."""
+
+_listeners: List[QueryListener] = []
+
+
+def add_query_listener(listener: QueryListener) -> None:
+    """
+    Registers a callback that is invoked synchronously after every query made through an instrumented client. Listeners must be cheap and must not raise.
+    """
+    _listeners.append(listener)
+
+
+def _model_name(model: Any) -> str:
+    if model is None:
+        return "raw"
+    return getattr(model, "__prisma_model__", None) or getattr(
+        model, "__name__", str(model)
+    )
+
+
+def instrument(client: Prisma) -> None:
+    """
+    Times every model action and raw query made through `client` and reports it to the registered listeners. Instrumenting a client twice has no effect.
+
+    Prisma Client Python has no query middleware API, so this hooks `Prisma._execute`, the single method all actions go through. The generated client declares `__slots__`, so the method cannot be replaced on the instance: instead the client's class is swapped for a subclass that overrides it, with the same slots. If `_execute` is missing in the installed version, instrumentation is skipped with a warning.
+    """
+    cls = type(client)
+    if getattr(cls, "_execute", None) is None:
+        logger.warning("Prisma client has no _execute hook; queries are not timed")
+        return
+    if "__instrumented__" in vars(cls):
+        return
+    client.__class__ = _instrumented_class(cls)
+
+
+@functools.lru_cache(maxsize=None)
+def _instrumented_class(base: type) -> type:
+    async def _execute(self: Any, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            return await super(instrumented, self)._execute(*args, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            model = _model_name(kwargs.get("model"))
+            action = kwargs.get("method", "unknown")
+            arguments = kwargs.get("arguments")
+            for listener in _listeners:
+                listener(model, action, arguments, elapsed, error)
+
+    instrumented = type(
+        f"Instrumented{base.__name__}",
+        (base,),
+        {
+            "__slots__": (),
+            "__module__": __name__,
+            "__instrumented__": True,
+            "_execute": _execute,
+        },
+    )
+    return instrumented
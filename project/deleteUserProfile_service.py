@@ -1,6 +1,11 @@
 import prisma
 import prisma.enums
 import prisma.models
+from project.auth_service import AuthenticatedUser, token_cache
+from project.getUserProfile_service import profile_loader
+from project.response_cache import response_cache
+from project.user_events import user_deleted
+from project.user_index import user_index
 from pydantic import BaseModel
 
 
@@ -13,40 +18,37 @@ class DeleteUserResponseModel(BaseModel):
     message: str
 
 
-async def deleteUserProfile(userId: int, Authorization: str) -> DeleteUserResponseModel:
+async def deleteUserProfile(
+    userId: int, requester: AuthenticatedUser
+) -> DeleteUserResponseModel:
     """
     Deletes the user profile identified by the provided userId. This action should ensure that all user data is removed. Requires authentication and can be performed by the user themselves or an admin.
 
+    The deletion is a single statement: the user's 'Auth' rows are removed by the cascading foreign key in the same transaction, so it takes one round-trip and leaves no window in which tokens outlive their user.
+
     Args:
         userId (int): The unique identifier of the user to be deleted.
-        Authorization (str): Bearer authentication token for verifying user identity and role.
+        requester (AuthenticatedUser): The caller, as resolved from their bearer token by `require_user`.
 
     Returns:
         DeleteUserResponseModel: Response model for the deletion of a user which returns a success message and status.
 
     Example:
-        result = await deleteUserProfile(1, 'Bearer some_valid_token')
+        result = await deleteUserProfile(1, AuthenticatedUser(id=1, role=Role.User))
         > DeleteUserResponseModel(status='success', message='User deleted successfully.')
     """
-    auth_token = Authorization.replace("Bearer ", "")
-    auth_record = await prisma.models.Auth.prisma().find_first(
-        where={"token": auth_token}
-    )
-    if not auth_record:
-        return DeleteUserResponseModel(
-            status="failure", message="Invalid authentication token."
-        )
-    requesting_user = await prisma.models.User.prisma().find_unique(
-        where={"id": auth_record.userId}
-    )
-    if not requesting_user:
-        return DeleteUserResponseModel(
-            status="failure", message="Requesting user not found."
-        )
-    if requesting_user.role != prisma.enums.Role.Admin and requesting_user.id != userId:
+    if requester.role != prisma.enums.Role.Admin and requester.id != userId:
         return DeleteUserResponseModel(status="failure", message="Unauthorized action.")
-    await prisma.models.Auth.prisma().delete_many(where={"userId": userId})
-    await prisma.models.User.prisma().delete(where={"id": userId})
+    try:
+        deleted = await prisma.models.User.prisma().delete_many(where={"id": userId})
+    finally:
+        token_cache.invalidate_user(userId)
+        profile_loader.invalidate(userId)
+        user_index.remove(userId)
+        response_cache.invalidate_tags("users", f"user:{userId}")
+    if not deleted:
+        return DeleteUserResponseModel(status="failure", message="User not found.")
+    user_deleted(userId)
     return DeleteUserResponseModel(
         status="success", message="User deleted successfully."
     )
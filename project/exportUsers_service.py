@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import os
+import zlib
+from typing import AsyncIterator, Awaitable, Callable, Literal, Optional
+
+from project.listUsers_service import fetch_user_page
+
+USERS_EXPORT_CHUNK_SIZE = int(os.getenv("USERS_EXPORT_CHUNK_SIZE", "1000"))
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _encode_ndjson(users) -> bytes:
+    return "".join(
+        json.dumps({"id": u.id, "email": u.email, "role": str(u.role)}) + "\n"
+        for u in users
+    ).encode("utf-8")
+
+
+def _encode_csv(users) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows((u.id, u.email, str(u.role)) for u in users)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def _stream(
+    fmt: ExportFormat,
+    compress: bool,
+    chunk_size: int,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]],
+) -> AsyncIterator[bytes]:
+    encode = _encode_ndjson if fmt == "ndjson" else _encode_csv
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "csv":
+        yield emit(b"id,email,role\r\n")
+    after = None
+    while True:
+        if is_disconnected is not None and await is_disconnected():
+            return
+        users = await fetch_user_page(after, chunk_size)
+        if not users:
+            break
+        chunk = emit(encode(users))
+        if chunk:
+            yield chunk
+        if len(users) < chunk_size:
+            break
+        after = users[-1].id
+    if compressor:
+        yield compressor.flush()
+
+
+def exportUsers(
+    role: str,
+    fmt: ExportFormat = "ndjson",
+    compress: bool = False,
+    chunk_size: int = USERS_EXPORT_CHUNK_SIZE,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Streams every user as NDJSON or CSV, optionally gzip-compressed on the fly. The 'User' table is read in keyset chunks of `chunk_size` rows, so memory stays constant however large the table is. Only id, email and role are read. This action is restricted to admin users.
+
+    The permission check runs eagerly, before the first byte is produced, so a refused export fails the request instead of truncating a stream. Between chunks, `is_disconnected` is polled and reading stops as soon as the client has gone away.
+
+    Args:
+    role (str): The role of the requesting user to validate permission. This should be 'admin'.
+    fmt (ExportFormat): 'ndjson' or 'csv'.
+    compress (bool): Whether to gzip the stream.
+    chunk_size (int): The number of rows fetched per database round-trip.
+    is_disconnected (Optional[Callable[[], Awaitable[bool]]]): Polled between chunks, typically `request.is_disconnected`.
+
+    Returns:
+    AsyncIterator[bytes]: The encoded export, chunk by chunk.
+
+    Example:
+        async for chunk in exportUsers('admin', 'csv'):
+            sink.write(chunk)
+    """
+    if role.lower() != "admin":
+        raise PermissionError("Access denied: Admin role required.")
+    return _stream(fmt, compress, max(1, chunk_size), is_disconnected)
@@ -1,10 +1,27 @@
+import asyncio
+import functools
+import gzip
+import importlib
+import logging
+import os
+import time
 from datetime import datetime
-from typing import Optional
+from types import ModuleType
+from typing import Dict, Optional
 
 import prisma
 import prisma.models
+import prisma.partials
+from fastapi.responses import Response
+from project.preencoded import PreencodedBody, choose_encoding
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
+DOCS_REVALIDATE_SECONDS = float(os.getenv("DOCS_REVALIDATE_SECONDS", "30"))
+
+DOCS_MIN_COMPRESS_BYTES = int(os.getenv("DOCS_MIN_COMPRESS_BYTES", "1024"))
+
 
 class GetDocsRequestModel(BaseModel):
     """
@@ -14,6 +31,17 @@ class GetDocsRequestModel(BaseModel):
     pass
 
 
+@functools.lru_cache(maxsize=None)
+def _optional_module(name: str) -> Optional[ModuleType]:
+    """
+    Imports `brotli` or `markdown` when the first snapshot is built rather than at startup. Both are project dependencies. None is returned only if one is missing, and that representation or coding is then skipped.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
 class GetDocsResponseModel(BaseModel):
     """
     This response model represents the structure of the response for the docs endpoint, which will be either in HTML or Markdown format, based on content stored in the 'Documentation' database model.
@@ -23,10 +51,143 @@ class GetDocsResponseModel(BaseModel):
     updatedAt: datetime
 
 
+def _encode_variants(
+    body: bytes, media_type: str, updated_at: datetime
+) -> Dict[str, PreencodedBody]:
+    vary = {"Vary": "Accept, Accept-Encoding"}
+    variants = {"identity": PreencodedBody(body, media_type, vary, updated_at)}
+    if len(body) < DOCS_MIN_COMPRESS_BYTES:
+        return variants
+    brotli = _optional_module("brotli")
+    if brotli is not None:
+        variants["br"] = PreencodedBody(
+            brotli.compress(body),
+            media_type,
+            {**vary, "Content-Encoding": "br"},
+            updated_at,
+        )
+    variants["gzip"] = PreencodedBody(
+        gzip.compress(body, compresslevel=9, mtime=0),
+        media_type,
+        {**vary, "Content-Encoding": "gzip"},
+        updated_at,
+    )
+    return variants
+
+
+class DocumentationSnapshot:
+    """
+    One revision of the documentation, with every representation (JSON, raw Markdown and rendered HTML) encoded once as identity, gzip and brotli bodies.
+    """
+
+    def __init__(self, revision_id: Optional[int], content: str, updated_at: datetime):
+        self.revision_id = revision_id
+        self.model = GetDocsResponseModel(content=content, updatedAt=updated_at)
+        self.representations: Dict[str, Dict[str, PreencodedBody]] = {
+            "application/json": _encode_variants(
+                self.model.model_dump_json().encode("utf-8"),
+                "application/json",
+                updated_at,
+            ),
+            "text/markdown": _encode_variants(
+                content.encode("utf-8"), "text/markdown; charset=utf-8", updated_at
+            ),
+        }
+        markdown = _optional_module("markdown")
+        if markdown is not None:
+            self.representations["text/html"] = _encode_variants(
+                markdown.markdown(content).encode("utf-8"),
+                "text/html; charset=utf-8",
+                updated_at,
+            )
+
+    def response(
+        self,
+        accept: Optional[str],
+        accept_encoding: Optional[str],
+        if_none_match: Optional[str],
+        if_modified_since: Optional[str],
+    ) -> Response:
+        """
+        Negotiates the representation from Accept (JSON unless HTML or Markdown is explicitly requested) and the coding from Accept-Encoding, then answers from the pre-encoded bodies.
+        """
+        variants = self.representations["application/json"]
+        if accept:
+            for media_type in ("text/html", "text/markdown"):
+                if media_type in accept and media_type in self.representations:
+                    variants = self.representations[media_type]
+                    break
+        body = variants[choose_encoding(accept_encoding, variants)]
+        return body.response(if_none_match, if_modified_since)
+
+
+class DocumentationCache:
+    """
+    Holds the latest documentation revision in memory. At most once every `revalidate_seconds` it runs a cheap query that reads only the id and updatedAt of the newest row, and it fetches and re-encodes the full content only when that revision has changed.
+    """
+
+    def __init__(self, revalidate_seconds: float = DOCS_REVALIDATE_SECONDS) -> None:
+        self.revalidate_seconds = revalidate_seconds
+        self._snapshot: Optional[DocumentationSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> DocumentationSnapshot:
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and time.monotonic() - self._checked_at < self.revalidate_seconds
+        ):
+            return snapshot
+        async with self._lock:
+            if (
+                self._snapshot is not None
+                and time.monotonic() - self._checked_at < self.revalidate_seconds
+            ):
+                return self._snapshot
+            self._snapshot = await self._revalidate(self._snapshot)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    async def _revalidate(
+        self, current: Optional[DocumentationSnapshot]
+    ) -> DocumentationSnapshot:
+        revision = await prisma.partials.DocumentationRevision.prisma().find_first(
+            order={"updatedAt": "desc"}
+        )
+        if revision is None:
+            if current is not None and current.revision_id is None:
+                return current
+            return DocumentationSnapshot(None, "", datetime.utcnow())
+        if (
+            current is not None
+            and current.revision_id == revision.id
+            and current.model.updatedAt == revision.updatedAt
+        ):
+            return current
+        documentation = await prisma.models.Documentation.prisma().find_unique(
+            where={"id": revision.id}
+        )
+        if documentation is None:
+            return await self._revalidate(current)
+        # Compression of a large blob is CPU-bound; keep it off the event loop.
+        return await asyncio.to_thread(
+            DocumentationSnapshot,
+            documentation.id,
+            documentation.content,
+            documentation.updatedAt,
+        )
+
+
+documentation_cache = DocumentationCache()
+
+
 async def getDocumentation(request: GetDocsRequestModel) -> GetDocsResponseModel:
     """
     This route serves the API documentation for the 'hello worlld' product. When a GET request is made to this endpoint, it should return a comprehensive guide on how to use the API, including endpoint definitions, request/response formats, and any other pertinent information. The response should be in HTML or Markdown format, allowing users to easily navigate and understand the API functionalities.
 
+    The content is served from `documentation_cache`, which only goes back to the database when the latest revision changes.
+
     Args:
     request (GetDocsRequestModel): This request model represents the GET request to the /docs endpoint. Since it's a simple GET request to retrieve documentation, there are no request parameters needed.
 
@@ -37,13 +198,5 @@ async def getDocumentation(request: GetDocsRequestModel) -> GetDocsResponseModel
     request = GetDocsRequestModel()
     response = await getDocumentation(request)
     """
-    documentation: Optional[
-        prisma.models.Documentation
-    ] = await prisma.models.Documentation.prisma().find_first(
-        order={"updatedAt": "desc"}
-    )
-    if not documentation:
-        return GetDocsResponseModel(content="", updatedAt=datetime.utcnow())
-    return GetDocsResponseModel(
-        content=documentation.content, updatedAt=documentation.updatedAt
-    )
+    snapshot = await documentation_cache.get()
+    return snapshot.model
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import prisma
+import prisma.models
+from project.preencoded import PreencodedBody
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MESSAGE = "Hello, World!"
+
+HELLO_REFRESH_SECONDS = float(os.getenv("HELLO_REFRESH_SECONDS", "60"))
+
+
+class HelloWorldRequest(BaseModel):
+    """
+    The request model for the hello endpoint. The endpoint does not accept any input parameters, so the Fields list is empty.
+    """
+
+    pass
+
+
+class HelloWorldResponse(BaseModel):
+    """
+    The response model for the hello endpoint, carrying the greeting message stored in the 'HelloWorld' database model.
+    """
+
+    message: str
+
+
+class HelloWorldCache:
+    """
+    Keeps the current greeting in memory as pre-encoded JSON and plain-text bodies, each with a strong ETag. The '/hello' route serves straight from here, so a request never touches Pydantic validation or Prisma.
+    """
+
+    def __init__(self, message: str = DEFAULT_MESSAGE) -> None:
+        self.message = ""
+        self.json: PreencodedBody
+        self.text: PreencodedBody
+        self.set_message(message)
+
+    def set_message(self, message: str) -> None:
+        """
+        Re-encodes both representations for a new message. The attributes are swapped one at a time, and each one is a complete body, so concurrent readers never see a torn value.
+        """
+        vary = {"Vary": "Accept"}
+        self.json = PreencodedBody.from_json({"message": message}, vary)
+        self.text = PreencodedBody(
+            message.encode("utf-8"), "text/plain; charset=utf-8", vary
+        )
+        self.message = message
+
+    def select(self, accept: Optional[str]) -> PreencodedBody:
+        """
+        Picks the plain-text body when the client explicitly prefers text/plain, and JSON otherwise.
+        """
+        if accept and "text/plain" in accept and "application/json" not in accept:
+            return self.text
+        return self.json
+
+    async def refresh(self) -> None:
+        """
+        Reloads the latest message from the 'HelloWorld' table, falling back to the default greeting when the table is empty.
+        """
+        record: Optional[
+            prisma.models.HelloWorld
+        ] = await prisma.models.HelloWorld.prisma().find_first(
+            order={"createdAt": "desc"}
+        )
+        message = record.message if record else DEFAULT_MESSAGE
+        if message != self.message:
+            self.set_message(message)
+
+    async def run_refresh_loop(self, interval: float = HELLO_REFRESH_SECONDS) -> None:
+        """
+        Refreshes the message every `interval` seconds until cancelled. Failures are logged and the previous message keeps being served.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh hello message")
+
+
+hello_cache = HelloWorldCache()
+
+
+async def getHelloWorld(request: HelloWorldRequest) -> HelloWorldResponse:
+    """
+    This endpoint returns a simple 'Hello, World!' message. The message is loaded from the 'HelloWorld' database model at startup and refreshed periodically, so this call does no database work.
+
+    Args:
+    request (HelloWorldRequest): The request model for the hello endpoint. The endpoint does not accept any input parameters, so the Fields list is empty.
+
+    Returns:
+    HelloWorldResponse: The response model for the hello endpoint, carrying the greeting message.
+
+    Example:
+        response = await getHelloWorld(HelloWorldRequest())
+        assert response.message == "Hello, World!"
+    """
+    return HelloWorldResponse(message=hello_cache.message)
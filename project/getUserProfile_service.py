@@ -0,0 +1,184 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import prisma
+import prisma.enums
+import prisma.partials
+from project.user_index import user_index
+from pydantic import BaseModel
+
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "30"))
+
+PROFILE_BATCH_WINDOW_SECONDS = float(os.getenv("PROFILE_BATCH_WINDOW_SECONDS", "0.002"))
+
+PROFILE_BATCH_MAX = int(os.getenv("PROFILE_BATCH_MAX", "100"))
+
+
+class UserProfileResponseModel(BaseModel):
+    """
+    The public profile of a user, excluding sensitive information like the password. `version` is the value to pass back when updating the profile.
+    """
+
+    id: int
+    email: str
+    role: prisma.enums.Role
+    version: int
+
+
+class ProfileLoader:
+    """
+    Loads user profiles with a read-through cache, single-flight and batching:
+
+    - cached profiles are returned directly until they are `ttl` seconds old,
+    - concurrent loads of the same id share one in-flight query,
+    - distinct ids requested within `window` seconds are fetched together with one `find_many(where={"id": {"in": [...]}})`, and a batch is sent early once it reaches `max_batch` ids.
+
+    `invalidate` drops a profile from the cache and detaches any in-flight load for it, so a write is never followed by a stale read from this process.
+    """
+
+    def __init__(
+        self,
+        max_size: int = PROFILE_CACHE_SIZE,
+        ttl: float = PROFILE_CACHE_TTL_SECONDS,
+        window: float = PROFILE_BATCH_WINDOW_SECONDS,
+        max_batch: int = PROFILE_BATCH_MAX,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.batches = 0
+        self._cache: OrderedDict[int, Tuple[float, UserProfileResponseModel]] = (
+            OrderedDict()
+        )
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self._pending: List[Tuple[int, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks.
+        self._fetching: Set[asyncio.Task] = set()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "cached": len(self._cache),
+        }
+
+    async def load(self, user_id: int) -> Optional[UserProfileResponseModel]:
+        entry = self._cache.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._cache.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+        future = self._inflight.get(user_id)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[user_id] = future
+            self._pending.append((user_id, future))
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._dispatch)
+        # Shielded so one cancelled caller cannot cancel the load for the others.
+        return await asyncio.shield(future)
+
+    def invalidate(self, user_id: int) -> None:
+        self._cache.pop(user_id, None)
+        self._inflight.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._inflight.clear()
+
+    def _dispatch(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self.batches += 1
+            task = asyncio.create_task(self._fetch(batch))
+            self._fetching.add(task)
+            task.add_done_callback(self._fetching.discard)
+
+    async def _fetch(self, batch: List[Tuple[int, asyncio.Future]]) -> None:
+        try:
+            users = await prisma.partials.UserSummary.prisma().find_many(
+                where={"id": {"in": [user_id for user_id, _ in batch]}}
+            )
+        except Exception as e:
+            for user_id, future in batch:
+                if self._inflight.get(user_id) is future:
+                    del self._inflight[user_id]
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark retrieved: every waiter may already have gone away.
+                    future.exception()
+            return
+        profiles = {
+            user.id: UserProfileResponseModel(
+                id=user.id, email=user.email, role=user.role, version=user.version
+            )
+            for user in users
+        }
+        expires_at = time.monotonic() + self.ttl
+        for user_id, future in batch:
+            profile = profiles.get(user_id)
+            if self._inflight.get(user_id) is future:
+                del self._inflight[user_id]
+                if profile is not None and self.max_size > 0:
+                    self._cache[user_id] = (expires_at, profile)
+                    self._cache.move_to_end(user_id)
+            if not future.done():
+                future.set_result(profile)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+
+profile_loader = ProfileLoader()
+
+
+async def getUserProfile(userId: int) -> UserProfileResponseModel:
+    """
+    Retrieves the profile of the user identified by the provided userId. Returns user details excluding sensitive information like password.
+
+    With the user index enabled and built, profiles are read from `user_index` without a query. Otherwise, and for ids the index does not hold, they are served through `profile_loader`, which caches them, merges concurrent requests for the same user, and batches lookups of different users that arrive together.
+
+    Args:
+        userId (int): The unique identifier of the user.
+
+    Returns:
+        UserProfileResponseModel: The public profile of the user.
+
+    Raises:
+        LookupError: If no user exists with this id.
+
+    Example:
+        response = await getUserProfile(1)
+        > UserProfileResponseModel(id=1, email='user1@example.com', role='User', version=0)
+    """
+    record = user_index.get(userId)
+    if record is not None:
+        return UserProfileResponseModel.model_construct(
+            id=record.id, email=record.email, role=record.role, version=record.version
+        )
+    profile = await profile_loader.load(userId)
+    if profile is not None and user_index.ready:
+        user_index.put(profile.id, profile.email, profile.role, profile.version)
+    if profile is None:
+        raise LookupError(f"No user found with ID {userId}")
+    return profile
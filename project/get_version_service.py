@@ -0,0 +1,84 @@
+import logging
+import os
+from typing import Optional
+
+import prisma
+import prisma.models
+from project.preencoded import PreencodedBody
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERSION = os.getenv("APP_VERSION", "0.1.0")
+
+
+class VersionRequestModel(BaseModel):
+    """
+    The request model for the version endpoint. The endpoint does not accept any input parameters, so the Fields list is empty.
+    """
+
+    pass
+
+
+class VersionResponseModel(BaseModel):
+    """
+    The response model for the version endpoint, carrying the version string of the latest release recorded in the 'Version' database model.
+    """
+
+    version: str
+
+
+class VersionCache:
+    """
+    Holds the current version as a model and as pre-serialized response bytes. It is loaded once at startup and replaced only by `reload`, so '/version' costs the same as a static route.
+    """
+
+    def __init__(self, version: str = DEFAULT_VERSION) -> None:
+        self.model: VersionResponseModel
+        self.body: PreencodedBody
+        self._set(version)
+
+    def _set(self, version: str) -> None:
+        model = VersionResponseModel(version=version)
+        self.body = PreencodedBody.from_model(model)
+        self.model = model
+
+    async def reload(self) -> str:
+        """
+        Reloads the release with the latest `releasedAt` from the 'Version' table. Falls back to APP_VERSION when the table is empty.
+
+        Returns:
+            str: The version now being served.
+        """
+        release: Optional[prisma.models.Version] = (
+            await prisma.models.Version.prisma().find_first(
+                order={"releasedAt": "desc"}
+            )
+        )
+        version = release.version if release else DEFAULT_VERSION
+        if version != self.model.version:
+            logger.info("Serving version %s", version)
+            self._set(version)
+        return version
+
+
+version_cache = VersionCache()
+
+
+async def get_version(request: VersionRequestModel) -> VersionResponseModel:
+    """
+    This endpoint retrieves the current API version. It should be publicly accessible as it provides basic information about the API. The endpoint responds with a JSON object containing the 'version' key with the version of the API as its value. For instance, a typical response would be { 'version': '1.0.0' }.
+
+    The version comes from `version_cache`, so this call does no database work.
+
+    Args:
+    request (VersionRequestModel): The request model for the version endpoint. The endpoint does not accept any input parameters, so the Fields list is empty.
+
+    Returns:
+    VersionResponseModel: The response model for the version endpoint, carrying the current version string.
+
+    Example:
+        response = await get_version(VersionRequestModel())
+        > VersionResponseModel(version='1.0.0')
+    """
+    return version_cache.model
@@ -1,10 +1,16 @@
-from typing import List
+import os
+from typing import List, Optional
 
 import prisma
 import prisma.enums
-import prisma.models
+import prisma.partials
+from project.user_index import user_index
 from pydantic import BaseModel
 
+USERS_PAGE_DEFAULT = int(os.getenv("USERS_PAGE_DEFAULT", "100"))
+
+USERS_PAGE_MAX = int(os.getenv("USERS_PAGE_MAX", "1000"))
+
 
 class UserDetail(BaseModel):
     """
@@ -18,30 +24,66 @@ class UserDetail(BaseModel):
 
 class GetUsersResponse(BaseModel):
     """
-    Response model for listing all users. Contains the list of users with basic details excluding sensitive information.
+    Response model for listing users. Contains one page of users with basic details excluding sensitive information, and the cursor to pass as `after` to fetch the next page, or None on the last page.
     """
 
     users: List[UserDetail]
+    next_cursor: Optional[int] = None
 
 
-async def listUsers(role: str) -> GetUsersResponse:
+async def fetch_user_page(
+    after: Optional[int], limit: int
+) -> List[prisma.partials.UserSummary]:
     """
-    Lists all users in the system. This route should return a list containing basic user details excluding sensitive information. This action is restricted to admin users.
+    Fetches up to `limit` users with an id greater than `after`, in id order, selecting only the id, email and role columns. This is an index range scan on the primary key, so the cost is the same whichever page is requested.
+
+    Args:
+    after (Optional[int]): The id of the last user on the previous page, or None to start from the beginning.
+    limit (int): The maximum number of users to return.
+
+    Returns:
+    List[prisma.partials.UserSummary]: The users on the page.
+    """
+    return await prisma.partials.UserSummary.prisma().find_many(
+        take=limit,
+        where={"id": {"gt": after}} if after is not None else {},
+        order={"id": "asc"},
+    )
+
+
+async def listUsers(
+    role: str, limit: int = USERS_PAGE_DEFAULT, after: Optional[int] = None
+) -> GetUsersResponse:
+    """
+    Lists users in the system one page at a time, using keyset pagination on `id`. This route should return a list containing basic user details excluding sensitive information. This action is restricted to admin users.
+
+    Pages are sliced from `user_index` when it is enabled and built, and read from the 'User' table otherwise.
 
     Args:
     role (str): The role of the requesting user to validate permission. This should be 'admin'.
+    limit (int): The page size, capped at USERS_PAGE_MAX.
+    after (Optional[int]): The `next_cursor` of the previous page, or None for the first page.
 
     Returns:
-    GetUsersResponse: Response model for listing all users. Contains the list of users with basic details excluding sensitive information.
+    GetUsersResponse: Response model for listing users. Contains one page of users with basic details excluding sensitive information, and the cursor for the next page.
 
     Example:
-        response = await listUsers('admin')
-        > GetUsersResponse(users=[UserDetail(id=1, email='user1@example.com', role='User'), ...])
+        response = await listUsers('admin', limit=2)
+        > GetUsersResponse(users=[UserDetail(id=1, email='user1@example.com', role='User'), UserDetail(id=2, ...)], next_cursor=2)
+        response = await listUsers('admin', limit=2, after=response.next_cursor)
     """
     if role.lower() != "admin":
         raise PermissionError("Access denied: Admin role required.")
-    users = await prisma.models.User.prisma().find_many()
+    limit = max(1, min(limit, USERS_PAGE_MAX))
+    if user_index.ready:
+        users = user_index.page(after, limit + 1)
+    else:
+        users = await fetch_user_page(after, limit + 1)
+    next_cursor = users[limit - 1].id if len(users) > limit else None
     user_details = [
-        UserDetail(id=user.id, email=user.email, role=user.role) for user in users
+        UserDetail.model_construct(
+            id=user.id, email=user.email, role=prisma.enums.Role(user.role)
+        )
+        for user in users[:limit]
     ]
-    return GetUsersResponse(users=user_details)
+    return GetUsersResponse(users=user_details, next_cursor=next_cursor)
@@ -0,0 +1,75 @@
+import logging
+from typing import Optional
+
+import prisma
+import prisma.models
+from project.auth_service import AuthenticatedUser, issueToken
+from project.password_service import needs_rehash, password_hasher
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Verified against when the user does not exist, so unknown and known emails take
+# the same time to reject. Computed on first use rather than at import, where it
+# would add a full scrypt run to every cold start.
+_dummy_hash: Optional[str] = None
+
+
+async def _get_dummy_hash() -> str:
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await password_hasher.hash("dummy-password")
+    return _dummy_hash
+
+
+class InvalidCredentialsError(PermissionError):
+    """
+    Raised when the email is unknown or the password does not match. The two cases are deliberately indistinguishable.
+    """
+
+
+class UserLoginResponseModel(BaseModel):
+    """
+    Response model after a successful login. Carries the signed bearer token to send as 'Authorization: Bearer <token>' and the id of the authenticated user.
+    """
+
+    token: str
+    user_id: int
+
+
+async def loginUser(username: str, password: str) -> UserLoginResponseModel:
+    """
+    Authenticates a user. Accepts username and password, verifies credentials, and returns a signed bearer token backed by a new 'Auth' row if successful. Users are identified by their email, so `username` is matched against the email column.
+
+    Password verification runs in the shared `password_hasher` pool, so it never blocks the event loop. Legacy plaintext or outdated hashes are upgraded after a successful login.
+
+    Args:
+        username (str): The email address of the user.
+        password (str): The user's password.
+
+    Returns:
+        UserLoginResponseModel: Response model after a successful login. Carries the signed bearer token and the user id.
+
+    Raises:
+        InvalidCredentialsError: If the credentials are invalid.
+
+    Example:
+        response = await loginUser('john_doe@example.com', 'securepassword')
+        > UserLoginResponseModel(token='q3Jf...x9.tW2b...Qk', user_id=1)
+    """
+    user = await prisma.models.User.prisma().find_unique(where={"email": username})
+    if user is None:
+        await password_hasher.verify(password, await _get_dummy_hash())
+        raise InvalidCredentialsError("Invalid credentials.")
+    if not await password_hasher.verify(password, user.password):
+        raise InvalidCredentialsError("Invalid credentials.")
+    if needs_rehash(user.password):
+        try:
+            await prisma.models.User.prisma().update(
+                where={"id": user.id},
+                data={"password": await password_hasher.hash(password)},
+            )
+        except Exception:
+            logger.exception("Failed to upgrade password hash for user %d", user.id)
+    token = await issueToken(AuthenticatedUser(id=user.id, role=user.role))
+    return UserLoginResponseModel(token=token, user_id=user.id)
@@ -0,0 +1,218 @@
+"""
+Background retention and compaction for tables that would otherwise grow forever:
+
+- 'Auth' rows older than AUTH_TOKEN_TTL_SECONDS are deleted,
+- 'HealthCheck' rows older than HEALTHCHECK_RAW_RETENTION_SECONDS are rolled up into per-minute 'HealthCheckRollup' rows, and per-minute rollups older than HEALTHCHECK_MINUTE_RETENTION_SECONDS into per-hour ones. A rollup's `checks` is the number of 'HealthCheck' rows it replaced, not the number of probes. The health check writer already collapses same-status probes within HEALTHCHECK_COALESCE_SECONDS into one row, so `checks` measures how many coalescing buckets had that status, not traffic.
+
+Every step works in bounded batches with a pause in between, and backs off while foreground requests are queueing. It runs inside the app lifespan (MAINTENANCE_ENABLED) or from the command line:
+
+    python -m project.maintenance          # one pass, then exit (for cron)
+    python -m project.maintenance loop     # keep running every MAINTENANCE_INTERVAL_SECONDS
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+import prisma
+import project.database
+from project.admission import DB, admission_controller
+from project.auth_service import AUTH_TOKEN_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "1") not in (
+    "0",
+    "false",
+    "False",
+)
+
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "300"))
+
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", "1000"))
+
+MAINTENANCE_BATCH_PAUSE_SECONDS = float(
+    os.getenv("MAINTENANCE_BATCH_PAUSE_SECONDS", "0.2")
+)
+
+MAINTENANCE_MAX_BATCHES = int(os.getenv("MAINTENANCE_MAX_BATCHES", "100"))
+
+HEALTHCHECK_RAW_RETENTION_SECONDS = float(
+    os.getenv("HEALTHCHECK_RAW_RETENTION_SECONDS", str(86400))
+)
+
+HEALTHCHECK_MINUTE_RETENTION_SECONDS = float(
+    os.getenv("HEALTHCHECK_MINUTE_RETENTION_SECONDS", str(7 * 86400))
+)
+
+# Every statement below is a single atomic command, so a batch is either fully
+# applied or not at all, and concurrent runs (one per worker) never count a row
+# twice: a row can only be deleted, and therefore rolled up, once.
+_UTC_CUTOFF = "(now() AT TIME ZONE 'UTC') - $1::float8 * interval '1 second'"
+
+_PURGE_TOKENS_SQL = (
+    'DELETE FROM "Auth" WHERE "id" IN ('
+    f'SELECT "id" FROM "Auth" WHERE "createdAt" < {_UTC_CUTOFF} '
+    'ORDER BY "id" LIMIT $2)'
+)
+
+_ROLLUP_RAW_SQL = (
+    'WITH batch AS (DELETE FROM "HealthCheck" WHERE "id" IN ('
+    f'SELECT "id" FROM "HealthCheck" WHERE "checkedAt" < {_UTC_CUTOFF} '
+    'ORDER BY "id" LIMIT $2) RETURNING "status", "checkedAt"), '
+    'rolled AS (INSERT INTO "HealthCheckRollup" '
+    '("granularity", "bucketStart", "status", "checks") '
+    "SELECT 'minute', date_trunc('minute', \"checkedAt\"), \"status\", count(*) "
+    "FROM batch GROUP BY 2, 3 "
+    'ON CONFLICT ("granularity", "bucketStart", "status") DO UPDATE '
+    'SET "checks" = "HealthCheckRollup"."checks" + EXCLUDED."checks" RETURNING 1) '
+    'SELECT count(*)::int AS "rows" FROM batch'
+)
+
+_ROLLUP_MINUTES_SQL = (
+    'WITH batch AS (DELETE FROM "HealthCheckRollup" WHERE "id" IN ('
+    'SELECT "id" FROM "HealthCheckRollup" WHERE "granularity" = \'minute\' '
+    f'AND "bucketStart" < {_UTC_CUTOFF} '
+    'ORDER BY "id" LIMIT $2) RETURNING "bucketStart", "status", "checks"), '
+    'rolled AS (INSERT INTO "HealthCheckRollup" '
+    '("granularity", "bucketStart", "status", "checks") '
+    "SELECT 'hour', date_trunc('hour', \"bucketStart\"), \"status\", "
+    'sum("checks")::int FROM batch GROUP BY 2, 3 '
+    'ON CONFLICT ("granularity", "bucketStart", "status") DO UPDATE '
+    'SET "checks" = "HealthCheckRollup"."checks" + EXCLUDED."checks" RETURNING 1) '
+    'SELECT count(*)::int AS "rows" FROM batch'
+)
+
+
+def foreground_busy() -> bool:
+    """
+    True while DB-bound requests are waiting for admission, i.e. the database is the bottleneck and maintenance should not add to it.
+    """
+    limiter = admission_controller.limiters.get(DB)
+    return limiter is not None and limiter.queued > 0
+
+
+class Maintenance:
+    """
+    Runs the retention and rollup steps in batches of `batch_size` rows, sleeping `pause` seconds between batches (and for as long as `busy()` reports foreground pressure), and stopping each step after `max_batches` so one pass never runs unbounded. Whatever is left is picked up by the next pass.
+    """
+
+    def __init__(
+        self,
+        interval: float = MAINTENANCE_INTERVAL_SECONDS,
+        batch_size: int = MAINTENANCE_BATCH_SIZE,
+        pause: float = MAINTENANCE_BATCH_PAUSE_SECONDS,
+        max_batches: int = MAINTENANCE_MAX_BATCHES,
+        busy: Callable[[], bool] = foreground_busy,
+    ) -> None:
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.pause = pause
+        self.max_batches = max(1, max_batches)
+        self.busy = busy
+        self.totals: Dict[str, int] = {
+            "tokens_purged": 0,
+            "healthchecks_rolled_up": 0,
+            "minute_rollups_compacted": 0,
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    async def _batches(self, name: str, run_batch) -> int:
+        total = 0
+        for _ in range(self.max_batches):
+            while self.busy():
+                await asyncio.sleep(max(self.pause, 0.05))
+            rows = await run_batch()
+            total += rows
+            if rows < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+        self.totals[name] += total
+        return total
+
+    async def purge_expired_tokens(self) -> int:
+        if AUTH_TOKEN_TTL_SECONDS <= 0:
+            return 0
+
+        async def batch() -> int:
+            return await prisma.get_client().execute_raw(
+                _PURGE_TOKENS_SQL, AUTH_TOKEN_TTL_SECONDS, self.batch_size
+            )
+
+        return await self._batches("tokens_purged", batch)
+
+    async def rollup_health_checks(self) -> int:
+        async def batch() -> int:
+            row = await prisma.get_client().query_first(
+                _ROLLUP_RAW_SQL, HEALTHCHECK_RAW_RETENTION_SECONDS, self.batch_size
+            )
+            return row["rows"] if row else 0
+
+        return await self._batches("healthchecks_rolled_up", batch)
+
+    async def compact_minute_rollups(self) -> int:
+        async def batch() -> int:
+            row = await prisma.get_client().query_first(
+                _ROLLUP_MINUTES_SQL,
+                HEALTHCHECK_MINUTE_RETENTION_SECONDS,
+                self.batch_size,
+            )
+            return row["rows"] if row else 0
+
+        return await self._batches("minute_rollups_compacted", batch)
+
+    async def run_once(self) -> Dict[str, int]:
+        """
+        Runs one pass of every step and returns the rows each one processed.
+        """
+        start = time.perf_counter()
+        result = {
+            "tokens_purged": await self.purge_expired_tokens(),
+            "healthchecks_rolled_up": await self.rollup_health_checks(),
+            "minute_rollups_compacted": await self.compact_minute_rollups(),
+        }
+        logger.info(
+            "Maintenance pass took %.1fs: %s", time.perf_counter() - start, result
+        )
+        return result
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Maintenance pass failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+maintenance = Maintenance()
+
+
+async def main(mode: str) -> None:
+    client = project.database.create_client()
+    await client.connect()
+    try:
+        if mode == "loop":
+            await maintenance.run_forever()
+        else:
+            print(await maintenance.run_once())
+    finally:
+        await client.disconnect()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "once"))
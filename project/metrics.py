@@ -0,0 +1,213 @@
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from project.route_labels import RouteResolver
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "False")
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    A fixed-bucket latency histogram. `observe` is a bisect and two additions. The counts are made cumulative only when rendered.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class MetricsRegistry:
+    """
+    In-process metric storage rendered in the Prometheus text exposition format. Counters, gauges and histograms are plain dicts keyed by label tuples, and collected series are evaluated only at scrape time.
+    """
+
+    def __init__(self) -> None:
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._callbacks: List[Tuple[str, Callable[[], Dict[Labels, float]]]] = []
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        series = self._counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0.0) + value
+
+    def add(self, name: str, labels: Labels, value: float) -> None:
+        series = self._gauges.setdefault(name, {})
+        series[labels] = series.get(labels, 0.0) + value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        series = self._histograms.setdefault(name, {})
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram()
+        histogram.observe(value)
+
+    def collect(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        callback: Callable[[], Dict[Labels, float]],
+    ) -> None:
+        """
+        Registers a series that is read from `callback` at scrape time, for components that already keep their own counters.
+        """
+        self.describe(name, kind, help_text)
+        self._callbacks.append((name, callback))
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        def header(name: str, default_kind: str) -> None:
+            kind, help_text = self._help.get(name, (default_kind, ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in self._counters.items():
+            header(name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for name, series in self._gauges.items():
+            header(name, "gauge")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for name, callback in self._callbacks:
+            header(name, "untyped")
+            for labels, value in callback().items():
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for name, series in self._histograms.items():
+            header(name, "histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    bucket = _format_labels(labels + (("le", f"{bound:g}"),))
+                    lines.append(f"{name}_bucket{bucket} {cumulative}")
+                bucket = _format_labels(labels + (("le", "+Inf"),))
+                lines.append(f"{name}_bucket{bucket} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:g}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+registry.describe(
+    "http_request_duration_seconds", "histogram", "HTTP request latency by route."
+)
+registry.describe(
+    "http_requests_total", "counter", "HTTP responses by route and status."
+)
+registry.describe(
+    "http_requests_in_flight", "gauge", "HTTP requests currently being handled."
+)
+registry.describe(
+    "db_query_duration_seconds",
+    "histogram",
+    "Prisma query latency by model and action.",
+)
+registry.describe(
+    "db_query_errors_total", "counter", "Failed Prisma queries by model and action."
+)
+
+
+def observe_query(
+    model: str,
+    action: str,
+    arguments: Any,
+    seconds: float,
+    error: Optional[BaseException],
+) -> None:
+    """
+    Query listener for `project.db_hooks` that records Prisma query latency and errors.
+    """
+    labels = (("model", model), ("action", action))
+    registry.observe("db_query_duration_seconds", labels, seconds)
+    if error is not None:
+        registry.inc("db_query_errors_total", labels)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that records, per route template (e.g. '/api/users/{userId}'), a latency histogram, an in-flight gauge and a status-code counter. Requests that match no route share one '<unmatched>' label, so label cardinality stays bounded.
+
+    The route is resolved before the request is handled so the in-flight gauge can be labelled.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence) -> None:
+        self.app = app
+        self.resolver = RouteResolver(routes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route = self.resolver.label(scope)
+        method = scope["method"]
+        in_flight = (("route", route),)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.add("http_requests_in_flight", in_flight, 1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.add("http_requests_in_flight", in_flight, -1)
+            labels = (("method", method), ("route", route))
+            registry.observe("http_request_duration_seconds", labels, elapsed)
+            registry.inc("http_requests_total", labels + (("status", str(status)),))
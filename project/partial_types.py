@@ -0,0 +1,13 @@
+"""
+Partial model definitions picked up by `prisma generate` (see `partial_type_generator` in schema.prisma). Querying through a partial model selects only its fields, which keeps large or sensitive columns out of hot read paths.
+"""
+
+import prisma.models
+
+prisma.models.Documentation.create_partial(
+    "DocumentationRevision", include=["id", "updatedAt"]
+)
+
+prisma.models.User.create_partial(
+    "UserSummary", include=["id", "email", "role", "version"]
+)
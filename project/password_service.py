@@ -0,0 +1,137 @@
+import asyncio
+import base64
+import concurrent.futures
+import hashlib
+import hmac
+import os
+from concurrent.futures import Executor
+from typing import Optional
+
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process")
+
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+PASSWORD_HASH_CONCURRENCY = int(
+    os.getenv("PASSWORD_HASH_CONCURRENCY", str(PASSWORD_HASH_WORKERS * 2))
+)
+
+SCRYPT_N = int(os.getenv("SCRYPT_N", str(2**14)))
+
+SCRYPT_R = 8
+
+SCRYPT_P = 1
+
+_SCHEME = "scrypt"
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def hash_password_sync(password: str) -> str:
+    """
+    Hashes a password with scrypt and a random salt. The result is encoded as 'scrypt$n$r$p$salt$hash' so the cost parameters travel with it. This is CPU-bound and meant to run inside the hasher's pool.
+    """
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=SCRYPT_N,
+        r=SCRYPT_R,
+        p=SCRYPT_P,
+        maxmem=256 * SCRYPT_N * SCRYPT_R,
+        dklen=32,
+    )
+    return f"{_SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password_sync(password: str, encoded: str) -> bool:
+    """
+    Checks a password against a value produced by `hash_password_sync`, in constant time. Stored values that are not scrypt hashes are legacy plaintext passwords and are compared directly.
+    """
+    if not encoded.startswith(_SCHEME + "$"):
+        return hmac.compare_digest(password.encode("utf-8"), encoded.encode("utf-8"))
+    try:
+        _, n, r, p, salt, digest = encoded.split("$")
+        n, r, p = int(n), int(r), int(p)
+        expected = base64.b64decode(digest)
+        actual = hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=base64.b64decode(salt),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r,
+            dklen=len(expected),
+        )
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(actual, expected)
+
+
+def needs_rehash(encoded: str) -> bool:
+    """
+    True when a stored password is plaintext or was hashed with different cost parameters.
+    """
+    return not encoded.startswith(f"{_SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification off the event loop, in a process pool (the default) or a thread pool (hashlib.scrypt releases the GIL). A semaphore caps the number of hashes queued or running at once, so a login burst waits its turn and other requests keep being served.
+
+    The 'inline' executor runs hashes on the event loop. It exists only so benchmarks can show the difference.
+    """
+
+    def __init__(
+        self,
+        executor: str = PASSWORD_HASH_EXECUTOR,
+        workers: int = PASSWORD_HASH_WORKERS,
+        concurrency: int = PASSWORD_HASH_CONCURRENCY,
+    ) -> None:
+        if executor not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown password hash executor: {executor}")
+        self.executor_kind = executor
+        self.workers = max(1, workers)
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        """
+        Creates the pool ahead of the first login, so the first user does not pay for spawning worker processes.
+        """
+        if self._executor is None and self.executor_kind == "process":
+            # Looked up here, not imported at the top: concurrent.futures loads
+            # its multiprocessing machinery on first access to the pool class.
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers
+            )
+        elif self._executor is None and self.executor_kind == "thread":
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        async with self._semaphore:
+            if self.executor_kind == "inline":
+                return fn(*args)
+            self.start()
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args
+            )
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password_sync, password)
+
+    async def verify(self, password: str, encoded: str) -> bool:
+        return await self._run(verify_password_sync, password, encoded)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,160 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Mapping, Optional
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluates an If-None-Match header against an entity tag using the weak comparison required by RFC 9110 for conditional GETs.
+
+    Args:
+        if_none_match (Optional[str]): The raw If-None-Match header value, if any.
+        etag (str): The quoted entity tag of the current representation.
+
+    Returns:
+        bool: True when the client already holds the current representation and a 304 can be sent.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified_since(
+    if_modified_since: Optional[str], last_modified: datetime
+) -> bool:
+    """
+    Evaluates an If-Modified-Since header against the last modification time of a representation, at the one-second resolution of HTTP dates.
+
+    Args:
+        if_modified_since (Optional[str]): The raw If-Modified-Since header value, if any.
+        last_modified (datetime): When the representation last changed.
+
+    Returns:
+        bool: True when the representation has not changed since the client's copy.
+    """
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return int(last_modified.timestamp()) <= int(since.timestamp())
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> str:
+    """
+    Picks the content coding to send from an Accept-Encoding header. Among the `available` codings that the client accepts with a non-zero q-value, the highest q wins, and ties go to the order of `available`. Falls back to 'identity'.
+
+    Args:
+        accept_encoding (Optional[str]): The raw Accept-Encoding header value, if any.
+        available (Iterable[str]): The codings the server has prepared, in order of preference.
+
+    Returns:
+        str: The chosen coding, e.g. 'br', 'gzip' or 'identity'.
+    """
+    if not accept_encoding:
+        return "identity"
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    best, best_q = "identity", 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class PreencodedBody:
+    """
+    A response body that has been serialized once up front, together with its media type and a strong ETag, so it can be served repeatedly without any per-request encoding work.
+    """
+
+    __slots__ = ("body", "media_type", "etag", "last_modified", "headers")
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str,
+        headers: Optional[Mapping[str, str]] = None,
+        last_modified: Optional[datetime] = None,
+    ) -> None:
+        self.body = body
+        self.media_type = media_type
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.last_modified = last_modified
+        self.headers = {"ETag": self.etag, **(headers or {})}
+        if last_modified is not None:
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            self.headers["Last-Modified"] = format_datetime(
+                last_modified.astimezone(timezone.utc), usegmt=True
+            )
+
+    @classmethod
+    def from_json(
+        cls, payload: Any, headers: Optional[Mapping[str, str]] = None
+    ) -> "PreencodedBody":
+        """
+        Builds a pre-encoded body from a JSON-serializable payload using compact separators.
+        """
+        body = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        return cls(body, "application/json", headers)
+
+    @classmethod
+    def from_model(
+        cls,
+        model: BaseModel,
+        headers: Optional[Mapping[str, str]] = None,
+        last_modified: Optional[datetime] = None,
+    ) -> "PreencodedBody":
+        """
+        Builds a pre-encoded body from a Pydantic model, producing exactly the JSON that FastAPI would have sent for it.
+        """
+        body = model.model_dump_json().encode("utf-8")
+        return cls(body, "application/json", headers, last_modified)
+
+    def response(
+        self,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[str] = None,
+    ) -> Response:
+        """
+        Returns a 304 when the client's validators match, and the pre-encoded body otherwise. If-Modified-Since is only consulted when If-None-Match is absent.
+        """
+        if if_none_match:
+            if etag_matches(if_none_match, self.etag):
+                return Response(status_code=304, headers=self.headers)
+        elif self.last_modified is not None and not_modified_since(
+            if_modified_since, self.last_modified
+        ):
+            return Response(status_code=304, headers=self.headers)
+        return Response(
+            content=self.body, media_type=self.media_type, headers=self.headers
+        )
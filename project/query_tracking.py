@@ -0,0 +1,222 @@
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from project.responses import error_response
+from project.route_labels import RouteResolver
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+DB_DEBUG_HEADERS = os.getenv("DB_DEBUG_HEADERS", "0") in ("1", "true", "True")
+
+DB_QUERY_BUDGET_ENFORCE = os.getenv("DB_QUERY_BUDGET_ENFORCE", "0") in (
+    "1",
+    "true",
+    "True",
+)
+
+DB_REPEATED_QUERY_THRESHOLD = int(os.getenv("DB_REPEATED_QUERY_THRESHOLD", "3"))
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a request or tracked block makes more Prisma queries than its declared budget.
+    """
+
+
+def query_shape(arguments: Any) -> Any:
+    """
+    Reduces query arguments to their structure, with every value replaced by '?' and lists collapsed to the shape of their first element, so `find_unique(id=1)` and `find_unique(id=2)` share a shape.
+    """
+    if isinstance(arguments, dict):
+        return tuple(sorted((k, query_shape(v)) for k, v in arguments.items()))
+    if isinstance(arguments, (list, tuple)):
+        return ("[]", query_shape(arguments[0]) if arguments else None)
+    return "?"
+
+
+class QueryStats:
+    """
+    The Prisma queries made within one request or tracked block: how many, how long they took in total, and how often each (model, action, shape) occurred.
+    """
+
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def repeated(
+        self, threshold: int = DB_REPEATED_QUERY_THRESHOLD
+    ) -> List[Tuple[str, str, int]]:
+        """
+        Returns (model, action, times) for every query shape seen at least `threshold` times, the typical signature of an N+1 loop.
+        """
+        return [
+            (model, action, times)
+            for (model, action, _), times in self.shapes.items()
+            if times >= threshold
+        ]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def record_query(
+    model: str,
+    action: str,
+    arguments: Any,
+    seconds: float,
+    error: Optional[BaseException],
+) -> None:
+    """
+    Query listener for `project.db_hooks` that attributes each query to the request (or `track_queries` block) it was made from.
+    """
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.count += 1
+    stats.seconds += seconds
+    stats.shapes[(model, action, query_shape(arguments))] += 1
+
+
+@contextmanager
+def track_queries(budget: Optional[int] = None) -> Iterator[QueryStats]:
+    """
+    Counts the Prisma queries made inside the block. When `budget` is given, exceeding it raises QueryBudgetExceeded, which makes this usable as a test assertion:
+
+        with track_queries(budget=2):
+            await deleteUserProfile(1, requester)
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+    if budget is not None and stats.count > budget:
+        raise QueryBudgetExceeded(
+            f"{stats.count} queries made, budget is {budget}: {dict(stats.shapes)}"
+        )
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    Declares the maximum number of Prisma queries a route may make per request. Apply it below the route decorator:
+
+        @app.get("/api/users/{userId}")
+        @query_budget(1)
+        async def api_get_getUserProfile(...): ...
+    """
+
+    def decorate(endpoint: F) -> F:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+
+    return decorate
+
+
+class QueryTrackingMiddleware:
+    """
+    ASGI middleware that counts and times the Prisma queries each request makes, using a context variable that `record_query` updates.
+
+    - With DB_DEBUG_HEADERS, 'X-DB-Queries' and 'X-DB-Time' (milliseconds) are added to the response. For a streamed response they cover the queries made before the first byte.
+    - Repeated identical query shapes are logged as possible N+1 patterns.
+    - When a route declared with `query_budget` goes over its budget, a warning is logged. With DB_QUERY_BUDGET_ENFORCE (meant for tests and CI), the response is held back until its first body chunk. If the budget is already exceeded at that point, the response is replaced with a 500 carrying the budget message. A streamed response that exceeds its budget only after its first chunk cannot be replaced, so QueryBudgetExceeded is raised once it has been sent.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: Sequence,
+        debug_headers: bool = DB_DEBUG_HEADERS,
+        enforce: bool = DB_QUERY_BUDGET_ENFORCE,
+    ) -> None:
+        self.app = app
+        self.resolver = RouteResolver(routes)
+        self.debug_headers = debug_headers
+        self.enforce = enforce
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = _current.set(stats)
+        held: Optional[List[Message]] = [] if self.enforce else None
+        replaced = False
+
+        async def forward(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.debug_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append(
+                    (b"x-db-time", f"{stats.seconds * 1000:.3f}".encode("ascii"))
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal held, replaced
+            if replaced:
+                return
+            if held is None:
+                await forward(message)
+                return
+            held.append(message)
+            if message["type"] != "http.response.body":
+                return
+            exceeded = self._over_budget(scope, stats)
+            if exceeded is not None:
+                replaced = True
+                logger.error(exceeded)
+                await error_response(exceeded, 500)(scope, receive, send)
+                return
+            messages, held = held, None
+            for pending in messages:
+                await forward(pending)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+        if not replaced:
+            self._check(scope, stats)
+
+    def _label(self, scope: Scope, route: Any) -> str:
+        return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+    def _over_budget(self, scope: Scope, stats: QueryStats) -> Optional[str]:
+        """
+        The budget message when the route has a `query_budget` and `stats` exceeds it, otherwise None.
+        """
+        route = self.resolver.resolve(scope)
+        budget = getattr(getattr(route, "endpoint", None), "__query_budget__", None)
+        if budget is None or stats.count <= budget:
+            return None
+        return f"{self._label(scope, route)} made {stats.count} queries, budget is {budget}"
+
+    def _check(self, scope: Scope, stats: QueryStats) -> None:
+        if not stats.count:
+            return
+        label = self._label(scope, self.resolver.resolve(scope))
+        for model, action, times in stats.repeated():
+            logger.warning(
+                "Possible N+1 in %s: %s.%s ran %d times with the same shape",
+                label,
+                model,
+                action,
+                times,
+            )
+        message = self._over_budget(scope, stats)
+        if message is not None:
+            if self.enforce:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
@@ -1,9 +1,20 @@
 import prisma
 import prisma.enums as enums
+import prisma.errors
 import prisma.models
+from project.password_service import password_hasher
+from project.response_cache import response_cache
+from project.user_events import user_created
+from project.user_index import user_index
 from pydantic import BaseModel
 
 
+class EmailAlreadyRegisteredError(Exception):
+    """
+    Raised when a registration names an email that already belongs to a user.
+    """
+
+
 class UserRegistrationResponse(BaseModel):
     """
     Model for the response after successfully registering a new user. It includes a success message and the user ID of the newly created user.
@@ -18,7 +29,9 @@ async def registerUser(
 ) -> UserRegistrationResponse:
     """
     Registers a new user. Accepts user details (username, password, email) in the request body and creates a new user.
-    Returns a success message along with the user ID.
+    Returns a success message along with the user ID. The password is stored as a scrypt hash computed in the shared `password_hasher` pool.
+
+    When `user_index` is built and already holds the email, the database is asked to confirm, and a confirmed duplicate is refused before the password is hashed. An email the database no longer has is dropped from the index. The unique constraint on `User.email` remains the final check.
 
     Args:
         username (str): The username of the new user.
@@ -28,14 +41,34 @@ async def registerUser(
     Returns:
         UserRegistrationResponse: Model for the response after successfully registering a new user. It includes a success message and the user ID of the newly created user.
 
+    Raises:
+        EmailAlreadyRegisteredError: If a user with this email already exists.
+
     Example:
         response = await registerUser('john_doe', 'securepassword', 'john_doe@example.com')
         print(response.message)  # Output: 'User registered successfully.'
         print(response.user_id)  # Output: 1
     """
-    new_user = await prisma.models.User.prisma().create(
-        data={"email": email, "password": password, "role": enums.Role.User}
-    )
+    owner = user_index.email_owner(email)
+    if owner is not None:
+        if await prisma.models.User.prisma().find_unique(where={"email": email}):
+            raise EmailAlreadyRegisteredError(f"Email {email} is already registered.")
+        user_index.remove(owner)
+    try:
+        new_user = await prisma.models.User.prisma().create(
+            data={
+                "email": email,
+                "password": await password_hasher.hash(password),
+                "role": enums.Role.User,
+            }
+        )
+    except prisma.errors.UniqueViolationError as e:
+        raise EmailAlreadyRegisteredError(
+            f"Email {email} is already registered."
+        ) from e
+    response_cache.invalidate_tags("users")
+    user_index.put(new_user.id, new_user.email, new_user.role, new_user.version)
+    user_created(new_user.id, new_user.email, str(new_user.role))
     return UserRegistrationResponse(
         message="User registered successfully.", user_id=new_user.id
     )
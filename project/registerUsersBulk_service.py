@@ -0,0 +1,264 @@
+import asyncio
+import json
+import os
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import prisma
+import prisma.enums as enums
+import prisma.partials
+from project.password_service import password_hasher
+from project.response_cache import response_cache
+from project.user_events import user_created
+from project.user_index import user_index
+from pydantic import BaseModel, ValidationError
+
+BULK_REGISTER_CHUNK_SIZE = int(os.getenv("BULK_REGISTER_CHUNK_SIZE", "1000"))
+
+BULK_REGISTER_MAX_ROWS = int(os.getenv("BULK_REGISTER_MAX_ROWS", "100000"))
+
+# Inserts a chunk given as one JSON array and returns only the rows it inserted:
+# an email taken meanwhile by a concurrent registration is skipped and left out.
+_INSERT_USERS_SQL = (
+    'INSERT INTO "User" ("email", "password", "role") '
+    'SELECT t."email", t."password", \'User\'::"Role" '
+    'FROM jsonb_to_recordset($1::jsonb) AS t("email" text, "password" text) '
+    'ON CONFLICT ("email") DO NOTHING RETURNING "id", "email"'
+)
+
+
+class InvalidBulkPayloadError(Exception):
+    """
+    Raised when a bulk registration body is not valid JSON or not a JSON array.
+    """
+
+
+class BulkRequestTooLargeError(Exception):
+    """
+    Raised when a bulk registration holds more than BULK_REGISTER_MAX_ROWS rows.
+    """
+
+
+class UserRegistrationItem(BaseModel):
+    """
+    One user to register in a bulk request, with the same fields as the single registration endpoint.
+    """
+
+    username: str
+    password: str
+    email: str
+
+
+class BulkRegistrationResult(BaseModel):
+    """
+    The outcome for one input row, identified by its zero-based position in the request. `user_id` is set for created rows and for duplicates that already exist in the database, and `error` explains invalid rows.
+    """
+
+    index: int
+    email: Optional[str] = None
+    status: Literal["created", "duplicate", "invalid"]
+    user_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkRegistrationResponse(BaseModel):
+    """
+    Response model for a bulk registration, with totals and a result for every input row.
+    """
+
+    created: int
+    duplicates: int
+    invalid: int
+    results: List[BulkRegistrationResult]
+
+
+async def iter_json_array(body: bytes) -> AsyncIterator[Any]:
+    """
+    Yields the elements of a JSON array body.
+    """
+    try:
+        rows = json.loads(body)
+    except ValueError as e:
+        raise InvalidBulkPayloadError(f"Invalid JSON body: {e}") from e
+    if not isinstance(rows, list):
+        raise InvalidBulkPayloadError("Expected a JSON array of users.")
+    for row in rows:
+        yield row
+
+
+async def iter_ndjson(stream: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """
+    Splits a streamed NDJSON body into lines as it arrives, skipping blank lines. Each line is yielded undecoded and parsed during validation.
+    """
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+def _validate(
+    index: int, row: Any
+) -> Union[UserRegistrationItem, BulkRegistrationResult]:
+    try:
+        if isinstance(row, (bytes, str)):
+            return UserRegistrationItem.model_validate_json(row)
+        return UserRegistrationItem.model_validate(row)
+    except ValidationError as e:
+        email = row.get("email") if isinstance(row, dict) else None
+        return BulkRegistrationResult(
+            index=index,
+            email=email if isinstance(email, str) else None,
+            status="invalid",
+            error="; ".join(err["msg"] for err in e.errors()),
+        )
+
+
+async def _write_chunk(
+    chunk: List[Tuple[int, UserRegistrationItem]], seen: Set[str]
+) -> List[BulkRegistrationResult]:
+    results: List[BulkRegistrationResult] = []
+    fresh: List[Tuple[int, UserRegistrationItem]] = []
+    for index, item in chunk:
+        if item.email in seen:
+            results.append(
+                BulkRegistrationResult(
+                    index=index,
+                    email=item.email,
+                    status="duplicate",
+                    error="Email repeated earlier in the request.",
+                )
+            )
+        else:
+            seen.add(item.email)
+            fresh.append((index, item))
+    if not fresh:
+        return results
+    if user_index.ready:
+        # Only emails the index holds need the database to confirm them.
+        candidates = [
+            item.email for _, item in fresh if user_index.email_owner(item.email)
+        ]
+    else:
+        candidates = [item.email for _, item in fresh]
+    existing: Dict[str, int] = {}
+    if candidates:
+        existing = {
+            user.email: user.id
+            for user in await prisma.partials.UserSummary.prisma().find_many(
+                where={"email": {"in": candidates}}
+            )
+        }
+    to_create = [(i, item) for i, item in fresh if item.email not in existing]
+    hashes = await asyncio.gather(
+        *(password_hasher.hash(item.password) for _, item in to_create)
+    )
+    created: Dict[str, int] = {}
+    if to_create:
+        rows = await prisma.get_client().query_raw(
+            _INSERT_USERS_SQL,
+            json.dumps(
+                [
+                    {"email": item.email, "password": hashed}
+                    for (_, item), hashed in zip(to_create, hashes)
+                ]
+            ),
+        )
+        created = {row["email"]: row["id"] for row in rows}
+    for index, item in fresh:
+        if item.email in existing:
+            results.append(
+                BulkRegistrationResult(
+                    index=index,
+                    email=item.email,
+                    status="duplicate",
+                    user_id=existing[item.email],
+                    error="Email already registered.",
+                )
+            )
+        elif item.email not in created:
+            results.append(
+                BulkRegistrationResult(
+                    index=index,
+                    email=item.email,
+                    status="duplicate",
+                    error="Email registered concurrently.",
+                )
+            )
+        else:
+            user_id = created[item.email]
+            results.append(
+                BulkRegistrationResult(
+                    index=index,
+                    email=item.email,
+                    status="created",
+                    user_id=user_id,
+                )
+            )
+            user_index.put(user_id, item.email, enums.Role.User, 0)
+            user_created(user_id, item.email, str(enums.Role.User))
+    return results
+
+
+async def registerUsersBulk(rows: AsyncIterable[Any]) -> BulkRegistrationResponse:
+    """
+    Registers many users in one call. Rows are validated as they arrive. Nothing is written until the whole request has been read and found to be within BULK_REGISTER_MAX_ROWS, so an oversized request leaves the database untouched. The rows are then written in chunks of BULK_REGISTER_CHUNK_SIZE. Each chunk needs one lookup of the emails that already exist and one `INSERT ... ON CONFLICT DO NOTHING RETURNING` that reports exactly the rows it inserted. Password hashes for a chunk are computed in parallel in the shared `password_hasher` pool.
+
+    Emails that already exist, repeat earlier in the request, or are registered concurrently between the lookup and the insert are reported as duplicates. They do not fail the batch. When `user_index` is built, only the emails it already holds are looked up in the database, to confirm them.
+
+    Args:
+        rows (AsyncIterable[Any]): The users to register, as decoded objects (JSON array) or raw NDJSON lines.
+
+    Returns:
+        BulkRegistrationResponse: Totals and a result for every input row, in input order.
+
+    Raises:
+        BulkRequestTooLargeError: If the request holds more than BULK_REGISTER_MAX_ROWS rows.
+
+    Example:
+        response = await registerUsersBulk(iter_json_array(b'[{"username": "a", "password": "p", "email": "a@example.com"}]'))
+        > BulkRegistrationResponse(created=1, duplicates=0, invalid=0, results=[BulkRegistrationResult(index=0, email='a@example.com', status='created', user_id=1)])
+    """
+    results: List[BulkRegistrationResult] = []
+    items: List[Tuple[int, UserRegistrationItem]] = []
+    index = 0
+    async for row in rows:
+        if index >= BULK_REGISTER_MAX_ROWS:
+            raise BulkRequestTooLargeError(
+                f"Bulk registration is limited to {BULK_REGISTER_MAX_ROWS} users per request."
+            )
+        item = _validate(index, row)
+        if isinstance(item, BulkRegistrationResult):
+            results.append(item)
+        else:
+            items.append((index, item))
+        index += 1
+    seen: Set[str] = set()
+    for start in range(0, len(items), BULK_REGISTER_CHUNK_SIZE):
+        chunk = items[start : start + BULK_REGISTER_CHUNK_SIZE]
+        results.extend(await _write_chunk(chunk, seen))
+    response_cache.invalidate_tags("users")
+    results.sort(key=lambda result: result.index)
+    counts = {"created": 0, "duplicate": 0, "invalid": 0}
+    for result in results:
+        counts[result.status] += 1
+    return BulkRegistrationResponse(
+        created=counts["created"],
+        duplicates=counts["duplicate"],
+        invalid=counts["invalid"],
+        results=results,
+    )
@@ -0,0 +1,457 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from project.preencoded import etag_matches, not_modified_since
+from project.route_labels import RouteResolver
+from starlette.requests import HTTPConnection
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") not in (
+    "0",
+    "false",
+    "False",
+)
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 << 20)))
+
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(
+    os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(4 << 20))
+)
+
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "5"))
+
+RESPONSE_CACHE_STALE_SECONDS = float(os.getenv("RESPONSE_CACHE_STALE_SECONDS", "30"))
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+VaryResolver = Callable[[HTTPConnection], Awaitable[Optional[str]]]
+"""Derives one part of the cache key from the request. Returning None bypasses the cache for that request. Resolvers run before admission control and must not query the database."""
+
+# Stripped from upstream requests so the cache always stores a full 200 body. The
+# cache answers conditional requests itself.
+_CONDITIONAL_HEADERS = {b"if-none-match", b"if-modified-since"}
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+class CachePolicy:
+    """
+    How one route's responses are cached:
+
+    - `ttl`: seconds an entry is served as fresh,
+    - `stale`: further seconds it is still served, while one background request refreshes it,
+    - `vary`: what the key is built from, besides the route. A string names its source and a name: 'path:userId', 'query:limit' or 'header:accept'. A VaryResolver computes the part itself,
+    - `tags`: labels for explicit invalidation, formatted with the path parameters, e.g. 'user:{userId}'.
+    """
+
+    __slots__ = ("ttl", "stale", "vary", "tags")
+
+    def __init__(
+        self,
+        ttl: float,
+        stale: float = 0.0,
+        vary: Sequence[Union[str, VaryResolver]] = (),
+        tags: Sequence[str] = (),
+    ) -> None:
+        self.ttl = ttl
+        self.stale = stale
+        self.vary = tuple(_vary_source(part) for part in vary)
+        self.tags = tuple(tags)
+
+
+_VARY_SOURCES = ("path", "query", "header")
+
+
+def _vary_source(
+    vary: Union[str, VaryResolver],
+) -> Union[Tuple[str, str], VaryResolver]:
+    if callable(vary):
+        return vary
+    source, _, name = vary.partition(":")
+    if source not in _VARY_SOURCES or not name:
+        raise ValueError(
+            f"Cache vary {vary!r} must be a resolver or one of "
+            f"'path:<name>', 'query:<name>', 'header:<name>'"
+        )
+    return source, name.lower() if source == "header" else name
+
+
+def cache_response(
+    ttl: float = RESPONSE_CACHE_TTL_SECONDS,
+    stale: float = RESPONSE_CACHE_STALE_SECONDS,
+    vary: Sequence[Union[str, VaryResolver]] = (),
+    tags: Sequence[str] = (),
+) -> Callable[[F], F]:
+    """
+    Declares that a GET route's successful responses may be cached by ResponseCacheMiddleware. Apply it below the route decorator:
+
+        @app.get("/api/users/{userId}")
+        @cache_response(ttl=30, stale=30, vary=("path:userId",), tags=("user:{userId}",))
+        async def api_get_getUserProfile(...): ...
+    """
+
+    def decorate(endpoint: F) -> F:
+        endpoint.__response_cache__ = CachePolicy(ttl, stale, vary, tags)
+        return endpoint
+
+    return decorate
+
+
+def _last_modified(headers: Headers) -> Optional[datetime]:
+    for name, value in headers:
+        if name == b"last-modified":
+            try:
+                return parsedate_to_datetime(value.decode("latin-1"))
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class CachedResponse:
+    __slots__ = (
+        "status",
+        "headers",
+        "body",
+        "etag",
+        "last_modified",
+        "fresh_until",
+        "stale_until",
+        "tags",
+    )
+
+    def __init__(
+        self,
+        status: int,
+        headers: Headers,
+        body: bytes,
+        policy: CachePolicy,
+        tags: Tuple[str, ...],
+    ) -> None:
+        now = time.monotonic()
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = next((v.decode() for k, v in headers if k == b"etag"), None)
+        self.last_modified = _last_modified(headers)
+        self.fresh_until = now + policy.ttl
+        self.stale_until = self.fresh_until + policy.stale
+        self.tags = tags
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+    def not_modified(
+        self, if_none_match: Optional[str], if_modified_since: Optional[str]
+    ) -> bool:
+        """
+        Whether the client's validators match this response. If-Modified-Since is only consulted when If-None-Match is absent.
+        """
+        if if_none_match:
+            return self.etag is not None and etag_matches(if_none_match, self.etag)
+        return self.last_modified is not None and not_modified_since(
+            if_modified_since, self.last_modified
+        )
+
+    async def send(
+        self,
+        send: Send,
+        state: str,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[str] = None,
+    ) -> None:
+        cache_header = (b"x-cache", state.encode())
+        if self.not_modified(if_none_match, if_modified_since):
+            headers = [
+                (k, v)
+                for k, v in self.headers
+                if k in (b"etag", b"cache-control", b"vary", b"last-modified")
+            ]
+            headers.append(cache_header)
+            await send(
+                {"type": "http.response.start", "status": 304, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status,
+                "headers": self.headers + [cache_header],
+            }
+        )
+        await send({"type": "http.response.body", "body": self.body})
+
+
+class ResponseCache:
+    """
+    An LRU store of complete responses, bounded by entry count and total bytes, with a tag index for invalidation.
+
+    Loads are single-flight: concurrent misses on one key share one upstream request, and an entry past its TTL is refreshed by one background request while the stale copy keeps being served. `invalidate_tags` drops the tagged entries and detaches loads in flight, so a response built before a write is never stored after it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        max_entry_bytes: int = RESPONSE_CACHE_MAX_ENTRY_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: OrderedDict[Tuple, CachedResponse] = OrderedDict()
+        self._by_tag: Dict[str, Set[Tuple]] = {}
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.stale_until <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple, entry: CachedResponse) -> None:
+        if entry.size > self.max_entry_bytes or self.max_entries <= 0:
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self.bytes += entry.size
+        for tag in entry.tags:
+            self._by_tag.setdefault(tag, set()).add(key)
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_tags(self, *tags: str) -> None:
+        for tag in tags:
+            for key in self._by_tag.pop(tag, ()):
+                self._remove(key)
+            for key in [k for k in self._inflight if tag in k[0]]:
+                del self._inflight[key]
+
+    def loading(self, key: Tuple) -> bool:
+        return key in self._inflight
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_tag.clear()
+        self._inflight.clear()
+        self.bytes = 0
+
+    async def load(
+        self, key: Tuple, fetch: Callable[[], Awaitable[Optional[CachedResponse]]]
+    ) -> Tuple[Optional[CachedResponse], bool]:
+        """
+        Returns (response, leader), running `fetch` only if no load for `key` is in flight. The leader's response is returned even when it is not cacheable; followers get None in that case and must make their own request.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            entry = await asyncio.shield(future)
+            return (entry if entry is not None and entry.status == 200 else None), False
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await fetch()
+        except BaseException:
+            self._finish(key, future, None)
+            raise
+        self._finish(key, future, entry)
+        return entry, True
+
+    def _finish(
+        self, key: Tuple, future: asyncio.Future, entry: Optional[CachedResponse]
+    ) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+            if entry is not None and entry.status == 200:
+                self.put(key, entry)
+        if not future.done():
+            future.set_result(entry)
+
+    def _remove(self, key: Tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+response_cache = ResponseCache()
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware that serves GET requests for routes declared with `cache_response` from `response_cache`.
+
+    Only complete 200 responses up to RESPONSE_CACHE_MAX_ENTRY_BYTES are stored. Every response carries 'X-Cache: HIT', 'STALE' or 'MISS'. Conditional requests are answered from the cached ETag and Last-Modified. Responses are cached per process.
+    """
+
+    def __init__(
+        self, app: ASGIApp, routes: Sequence, cache: ResponseCache = response_cache
+    ) -> None:
+        self.app = app
+        self.resolver = RouteResolver(routes)
+        self.cache = cache
+        self._refreshing: Set[asyncio.Task] = set()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        route = self.resolver.resolve(scope)
+        policy = getattr(getattr(route, "endpoint", None), "__response_cache__", None)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+        match, child_scope = route.matches(scope)
+        path_params = child_scope.get("path_params", {}) if match == Match.FULL else {}
+        key = await self._key(scope, route, policy, path_params)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        request_headers = HTTPConnection(scope).headers
+        validators = (
+            request_headers.get("if-none-match"),
+            request_headers.get("if-modified-since"),
+        )
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry.fresh_until > time.monotonic():
+                self.cache.hits += 1
+                await entry.send(send, "HIT", *validators)
+                return
+            self.cache.stale_hits += 1
+            if not self.cache.loading(key):
+                self._refresh(key, scope, policy, key[0])
+            await entry.send(send, "STALE", *validators)
+            return
+
+        entry, leader = await self.cache.load(
+            key, lambda: self._fetch(scope, policy, key[0])
+        )
+        if entry is None:
+            await self.app(scope, receive, send)
+            return
+        await entry.send(send, "MISS" if leader else "HIT", *validators)
+
+    async def _key(
+        self,
+        scope: Scope,
+        route: Any,
+        policy: CachePolicy,
+        path_params: Dict[str, Any],
+    ) -> Optional[Tuple]:
+        connection = HTTPConnection(scope)
+        parts: List[Optional[str]] = []
+        for vary in policy.vary:
+            if callable(vary):
+                value = await vary(connection)
+                if value is None:
+                    return None
+                parts.append(value)
+                continue
+            source, name = vary
+            if source == "path":
+                parts.append(str(path_params[name]) if name in path_params else None)
+            elif source == "query":
+                parts.append(connection.query_params.get(name))
+            else:
+                parts.append(connection.headers.get(name))
+        try:
+            tags = tuple(tag.format(**path_params) for tag in policy.tags)
+        except (KeyError, IndexError):
+            logger.warning("Cache tags %s do not match %s", policy.tags, route.path)
+            return None
+        # The tags lead the key so invalidate_tags can find loads in flight.
+        return (tags, route.path, tuple(parts))
+
+    def _refresh(
+        self, key: Tuple, scope: Scope, policy: CachePolicy, tags: Tuple[str, ...]
+    ) -> None:
+        async def refresh() -> None:
+            try:
+                await self.cache.load(key, lambda: self._fetch(scope, policy, tags))
+            except Exception:
+                logger.exception("Background refresh of %s failed", scope["path"])
+
+        task = asyncio.create_task(refresh())
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    async def _fetch(
+        self, scope: Scope, policy: CachePolicy, tags: Tuple[str, ...]
+    ) -> CachedResponse:
+        upstream_scope = {
+            **scope,
+            "headers": [
+                (k, v) for k, v in scope["headers"] if k not in _CONDITIONAL_HEADERS
+            ],
+        }
+        status = 0
+        headers: Headers = []
+        chunks: List[bytes] = []
+
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Message) -> None:
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(upstream_scope, receive, send)
+        return CachedResponse(status, headers, b"".join(chunks), policy, tags)
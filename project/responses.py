@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Type
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - a dependency; json is the fallback
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "0") in ("1", "true", "True")
+
+
+class FastJSONResponse(Response):
+    """
+    A JSON response that serializes its content in one step:
+
+    - Pydantic models are written by their compiled serializer (`model_dump_json`), without the `jsonable_encoder` round-trip through Python dicts,
+    - anything else is written with orjson, or with compact `json.dumps` if orjson cannot be imported.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def respond(model: BaseModel, status_code: int = 200) -> BaseModel | Response:
+    """
+    Returns a route's result on the fast path when FAST_JSON_RESPONSES is set.
+
+    FastAPI validates a returned model against the route's `response_model` and serializes it with `jsonable_encoder`. When the service already built exactly that model, the check is redundant, so with the flag set the model is wrapped in a FastJSONResponse, which FastAPI sends as-is. Without the flag the model is returned unchanged and takes the default path.
+
+    Example:
+        return respond(await listUsers(str(requester.role), limit, after))
+    """
+    if FAST_JSON_RESPONSES or status_code != 200:
+        return FastJSONResponse(model, status_code=status_code)
+    return model
+
+
+def error_response(
+    message: str, status_code: int, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    return FastJSONResponse(
+        {"error": message}, status_code=status_code, headers=headers
+    )
+
+
+class UnhandledErrorMiddleware:
+    """
+    ASGI middleware that turns any exception escaping a route into a 500 with an `{"error": ...}` body, after logging it.
+
+    Exceptions with a known meaning are mapped by the handlers `install_error_handlers` registers. This catches the rest. It sits inside the user middleware, so metrics and query tracking still see the 500, and Starlette's outer error middleware does not log the exception a second time. If the response has already started (a broken stream), the exception is re-raised, as there is nothing left to replace.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            logger.exception("Error processing request")
+            if started:
+                raise
+            await error_response(str(e), 500)(scope, receive, send)
+
+
+def install_error_handlers(
+    app: FastAPI, status_codes: Dict[Type[Exception], int]
+) -> None:
+    """
+    Registers one handler per exception type, answering with `{"error": str(e)}` and the mapped status code. Add UnhandledErrorMiddleware first, so every other exception becomes a 500.
+
+    A 401 also carries `WWW-Authenticate: Bearer`. More specific types win over their base classes, so PermissionError can map to 403 while a subclass maps to 401.
+
+    HTTPException, raised by dependencies such as `require_user` and by the router for unknown paths and methods, is answered in the same `{"error": ...}` shape instead of FastAPI's `{"detail": ...}`, keeping its status code and headers.
+
+    Example:
+        install_error_handlers(app, {LookupError: 404, PermissionError: 403})
+    """
+
+    def make_handler(status_code: int):
+        headers = {"WWW-Authenticate": "Bearer"} if status_code == 401 else None
+
+        async def handle(request: Request, exc: Exception) -> Response:
+            return error_response(str(exc), status_code, headers)
+
+        return handle
+
+    async def handle_http_exception(request: Request, exc: HTTPException) -> Response:
+        return error_response(str(exc.detail), exc.status_code, exc.headers)
+
+    app.add_exception_handler(HTTPException, handle_http_exception)
+    for exc_class, status_code in status_codes.items():
+        app.add_exception_handler(exc_class, make_handler(status_code))
@@ -0,0 +1,44 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+from starlette.types import Scope
+
+UNMATCHED = "<unmatched>"
+
+
+class RouteResolver:
+    """
+    Finds the route that will handle a request before the router runs, so middleware can label it by its path template (e.g. '/api/users/{userId}') and read per-endpoint settings. The route that fully matches wins, and a path-only match (wrong method) is the fallback. Results for paths without parameters are memoized.
+    """
+
+    def __init__(self, routes: Sequence, memo_size: int = 1024) -> None:
+        self.routes = routes
+        self.memo_size = memo_size
+        self._memo: Dict[Tuple[str, str], Optional[Any]] = {}
+
+    def resolve(self, scope: Scope) -> Optional[Any]:
+        key = (scope["method"], scope["path"])
+        if key in self._memo:
+            return self._memo[key]
+        partial = None
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                self._remember(key, route)
+                return route
+            if match == Match.PARTIAL and partial is None:
+                partial = route
+        self._remember(key, partial)
+        return partial
+
+    def label(self, scope: Scope) -> str:
+        route = self.resolve(scope)
+        return getattr(route, "path", UNMATCHED) if route is not None else UNMATCHED
+
+    def _remember(self, key: Tuple[str, str], route: Optional[Any]) -> None:
+        if (
+            route is not None
+            and "{" not in route.path
+            and len(self._memo) < self.memo_size
+        ):
+            self._memo[key] = route
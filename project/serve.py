@@ -0,0 +1,120 @@
+"""
+Production entry point: runs `project.server:app` under uvicorn.
+
+    python -m project.serve
+
+One worker process is started per available CPU (the cgroup quota rounded up, capped by SERVER_MAX_WORKERS), or WEB_CONCURRENCY workers when set. The Cloud Run deployment gets one vCPU, so it runs one worker. Several workers do not share state. Each worker has its own:
+
+- Prisma client and query engine process (see `project.database`), and its own pool of up to DB_POOL_SIZE connections.
+- Password hashing pool (PASSWORD_HASH_WORKERS processes, defaulting here to the available CPUs divided by the worker count).
+- /metrics counters: a scrape sees only the worker that answered.
+- Version, hello message, response cache, profile cache and token cache. A version reload (SIGHUP or POST /admin/version/reload) and every invalidation reach only the worker that handled them. Other workers catch up after their TTLs.
+- /api/users/events broker: subscribers see only changes made through their own worker.
+- User index (USER_INDEX_ENABLED, which is refused with more than one worker).
+
+Memory therefore grows with N x (app + query engine + hash pool). Size the container for that before giving it more CPUs or raising WEB_CONCURRENCY.
+
+On SIGTERM or SIGINT, uvicorn stops accepting connections, gives in-flight requests up to SERVER_GRACEFUL_SHUTDOWN_SECONDS to finish, then runs the app's lifespan shutdown, which flushes buffered writes and disconnects from the database.
+"""
+
+import logging
+import math
+import os
+from typing import Optional
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+
+SERVER_PORT = int(os.getenv("PORT", "8000"))
+
+SERVER_GRACEFUL_SHUTDOWN_SECONDS = float(
+    os.getenv("SERVER_GRACEFUL_SHUTDOWN_SECONDS", "8")
+)
+
+SERVER_MAX_WORKERS = int(os.getenv("SERVER_MAX_WORKERS", "8"))
+
+# Peers whose X-Forwarded-For / X-Forwarded-Proto uvicorn applies to the request
+# (comma-separated addresses). Never "*": any client could then pick its address.
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """
+    Returns the container's CPU quota in cores from cgroup v2 (`cpu.max`) or v1 (`cpu.cfs_quota_us` / `cpu.cfs_period_us`), or None when there is no quota.
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """
+    The CPUs this process may use: the CPU affinity mask, capped by the cgroup quota rounded up.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_limit()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def worker_count(max_workers: int = SERVER_MAX_WORKERS) -> int:
+    """
+    WEB_CONCURRENCY if set, otherwise the available CPUs capped by `max_workers`.
+    """
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    return max(1, min(available_cpus(), max_workers))
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    workers = worker_count()
+    # Workers inherit the environment: this tells each one how many workers run
+    # (see project.user_index) and sizes every worker's hash pool.
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    os.environ.setdefault(
+        "PASSWORD_HASH_WORKERS", str(max(1, available_cpus() // workers))
+    )
+    if workers > 1:
+        logger.warning(
+            "Starting %d workers: caches, metrics, version reloads and user events"
+            " are per worker (see project.serve)",
+            workers,
+        )
+    logger.info("Starting %d worker(s) on %s:%d", workers, SERVER_HOST, SERVER_PORT)
+    uvicorn.run(
+        "project.server:app",
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        workers=workers,
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,149 +1,470 @@
+import asyncio
 import logging
+import signal
 from contextlib import asynccontextmanager
 
+import prisma.enums
+import project.admission
+import project.auth_service
 import project.check_health_service
+import project.database
+import project.db_hooks
 import project.deleteUserProfile_service
+import project.exportUsers_service
 import project.get_version_service
 import project.getDocumentation_service
 import project.getHelloWorld_service
 import project.getUserProfile_service
 import project.listUsers_service
 import project.loginUser_service
+import project.maintenance
+import project.metrics
+import project.password_service
+import project.query_tracking
 import project.registerUser_service
+import project.registerUsersBulk_service
+import project.response_cache
+import project.responses
+import project.startup_profile
 import project.updateUserProfile_service
-from fastapi import FastAPI
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import Response
-from prisma import Prisma
+import project.user_events
+import project.user_index
+from fastapi import Depends, FastAPI, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
 logger = logging.getLogger(__name__)
 
-db_client = Prisma(auto_register=True)
+db_client = project.database.create_client()
+
+if project.metrics.METRICS_ENABLED:
+    project.db_hooks.add_query_listener(project.metrics.observe_query)
+project.db_hooks.add_query_listener(project.query_tracking.record_query)
+project.db_hooks.instrument(db_client)
+
+
+async def reload_version() -> None:
+    try:
+        await project.get_version_service.version_cache.reload()
+    except Exception:
+        logger.exception("Failed to reload version")
+
+
+async def finish_startup(background_tasks: list) -> None:
+    profiler = project.startup_profile.startup_profiler
+    with profiler.phase("db connect and warm-up"):
+        await project.database.connection_gate.open(db_client)
+    hello_cache = project.getHelloWorld_service.hello_cache
+    with profiler.phase("hello message"):
+        try:
+            await hello_cache.refresh()
+        except Exception:
+            logger.exception("Failed to load hello message, serving the default")
+    version_cache = project.get_version_service.version_cache
+    with profiler.phase("version"):
+        try:
+            await version_cache.reload()
+        except Exception:
+            logger.exception("Failed to load version, serving %s", version_cache.model)
+    with profiler.phase("background writers and pools"):
+        background_tasks.append(asyncio.create_task(hello_cache.run_refresh_loop()))
+        project.check_health_service.health_check_writer.start()
+        project.password_service.password_hasher.start()
+        if project.maintenance.MAINTENANCE_ENABLED:
+            project.maintenance.maintenance.start()
+        if project.user_index.USER_INDEX_ENABLED:
+            background_tasks.append(
+                asyncio.create_task(project.user_index.user_index.run())
+            )
+
+
+async def finish_startup_in_background(background_tasks: list) -> None:
+    while True:
+        try:
+            await finish_startup(background_tasks)
+            project.startup_profile.startup_profiler.finish()
+            return
+        except Exception:
+            logger.exception("Database connection failed, retrying")
+            await asyncio.sleep(project.database.DB_CONNECT_RETRY_SECONDS)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await db_client.connect()
+    project.auth_service.check_token_secret()
+    background_tasks = []
+    if project.database.DB_CONNECT_IN_BACKGROUND:
+        startup_task = asyncio.create_task(
+            finish_startup_in_background(background_tasks)
+        )
+    else:
+        startup_task = None
+        await finish_startup(background_tasks)
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(
+            signal.SIGHUP, lambda: asyncio.ensure_future(reload_version())
+        )
+        sighup_installed = True
+    except (NotImplementedError, RuntimeError):
+        logger.info("SIGHUP reload is not available on this platform")
+        sighup_installed = False
+    project.startup_profile.startup_profiler.mark("serving")
+    if startup_task is None:
+        project.startup_profile.startup_profiler.finish()
     yield
-    await db_client.disconnect()
+    if sighup_installed:
+        loop.remove_signal_handler(signal.SIGHUP)
+    if startup_task is not None:
+        startup_task.cancel()
+        await asyncio.gather(startup_task, return_exceptions=True)
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    project.user_events.user_events.close()
+    await project.maintenance.maintenance.stop()
+    await project.check_health_service.health_check_writer.stop()
+    project.password_service.password_hasher.shutdown()
+    if db_client.is_connected():
+        await db_client.disconnect()
 
 
 app = FastAPI(
-    title="hello worlld", lifespan=lifespan, description="create a hello world api"
+    title="hello worlld",
+    lifespan=lifespan,
+    description="create a hello world api",
+    docs_url="/swagger",
 )
 
 
+def register_component_metrics() -> None:
+    profile_loader = project.getUserProfile_service.profile_loader
+    token_cache = project.auth_service.token_cache
+    health_writer = project.check_health_service.health_check_writer
+    response_cache = project.response_cache.response_cache
+    admission = project.admission.admission_controller
+    project.metrics.registry.collect(
+        "profile_loader_events_total",
+        "counter",
+        "User profile loader cache hits, misses, coalesced loads and batches.",
+        lambda: {
+            (("event", event),): value
+            for event, value in profile_loader.stats().items()
+            if event != "cached"
+        },
+    )
+    project.metrics.registry.collect(
+        "auth_token_cache_events_total",
+        "counter",
+        "Bearer token cache hits and misses.",
+        lambda: {
+            (("event", "hit"),): token_cache.hits,
+            (("event", "miss"),): token_cache.misses,
+        },
+    )
+    project.metrics.registry.collect(
+        "healthcheck_records_total",
+        "counter",
+        "Health probe records written or dropped by the buffered writer.",
+        lambda: {
+            (("outcome", "written"),): health_writer.written,
+            (("outcome", "dropped"),): health_writer.dropped,
+        },
+    )
+    project.metrics.registry.collect(
+        "response_cache_events_total",
+        "counter",
+        "Response cache hits, stale hits, misses, coalesced misses and evictions.",
+        lambda: {
+            (("event", event),): value
+            for event, value in response_cache.stats().items()
+        },
+    )
+    project.metrics.registry.collect(
+        "admission_requests_total",
+        "counter",
+        "Requests admitted, rejected with a full queue, or timed out in the queue, per limiter.",
+        lambda: {
+            (("limiter", name), ("outcome", outcome)): stats[outcome]
+            for name, stats in admission.stats().items()
+            for outcome in ("admitted", "rejected", "timed_out")
+        },
+    )
+    project.metrics.registry.collect(
+        "admission_in_flight",
+        "gauge",
+        "Requests running or waiting, per limiter.",
+        lambda: {
+            (("limiter", name), ("state", state)): stats[state]
+            for name, stats in admission.stats().items()
+            for state in ("in_flight", "queued")
+        },
+    )
+    project.metrics.registry.collect(
+        "maintenance_rows_total",
+        "counter",
+        "Rows purged or rolled up by the maintenance task, per step.",
+        lambda: {
+            (("step", step),): value
+            for step, value in project.maintenance.maintenance.totals.items()
+        },
+    )
+    project.metrics.registry.collect(
+        "startup_phase_completed_seconds",
+        "gauge",
+        "Seconds from the project package import to the end of each startup phase.",
+        lambda: {
+            (("phase", phase["phase"]),): (phase["at_ms"] + phase["took_ms"]) / 1000
+            for phase in project.startup_profile.startup_profiler.as_dict()["phases"]
+        },
+    )
+    project.metrics.registry.collect(
+        "user_events_total",
+        "counter",
+        "User change events published, subscribers evicted or refused, and events replayed or reset on reconnect.",
+        lambda: {
+            (("event", event),): value
+            for event, value in project.user_events.user_events.stats().items()
+        },
+    )
+    project.metrics.registry.collect(
+        "user_events_subscribers",
+        "gauge",
+        "Open user change event streams.",
+        lambda: {(): len(project.user_events.user_events.subscribers)},
+    )
+    project.metrics.registry.collect(
+        "user_index_users",
+        "gauge",
+        "Users held by the in-memory user index.",
+        lambda: {(): project.user_index.user_index.users},
+    )
+    project.metrics.registry.collect(
+        "user_index_bytes",
+        "gauge",
+        "Memory held by the user index as of its last build, in total and per 100k users.",
+        lambda: {
+            (("scope", "total"),): project.user_index.user_index.bytes,
+            (("scope", "per_100k_users"),): (
+                project.user_index.user_index.bytes_per_100k_users
+            ),
+        },
+    )
+    project.metrics.registry.collect(
+        "response_cache_bytes",
+        "gauge",
+        "Bytes held by the response cache.",
+        lambda: {(): response_cache.bytes},
+    )
+
+
+project.responses.install_error_handlers(
+    app,
+    {
+        PermissionError: 403,
+        project.loginUser_service.InvalidCredentialsError: 401,
+        LookupError: 404,
+        ValueError: 400,
+        project.updateUserProfile_service.VersionConflictError: 409,
+        project.registerUser_service.EmailAlreadyRegisteredError: 409,
+        project.registerUsersBulk_service.InvalidBulkPayloadError: 400,
+        project.registerUsersBulk_service.BulkRequestTooLargeError: 413,
+    },
+)
+app.add_middleware(project.responses.UnhandledErrorMiddleware)
+if project.database.DB_CONNECT_IN_BACKGROUND:
+    app.add_middleware(
+        project.database.DatabaseGateMiddleware, routes=app.router.routes
+    )
+if project.admission.ADMISSION_ENABLED:
+    app.add_middleware(project.admission.AdmissionMiddleware, routes=app.router.routes)
+if project.response_cache.RESPONSE_CACHE_ENABLED:
+    app.add_middleware(
+        project.response_cache.ResponseCacheMiddleware, routes=app.router.routes
+    )
+app.add_middleware(
+    project.query_tracking.QueryTrackingMiddleware, routes=app.router.routes
+)
+if project.metrics.METRICS_ENABLED:
+    app.add_middleware(project.metrics.MetricsMiddleware, routes=app.router.routes)
+    register_component_metrics()
+
+
+@app.get("/metrics", include_in_schema=False)
+@project.query_tracking.query_budget(0)
+@project.admission.admission_class(project.admission.EXEMPT)
+async def api_get_metrics() -> Response:
+    """
+    Exposes request, query and component metrics in the Prometheus text format.
+    """
+    return Response(
+        content=project.metrics.registry.render(),
+        media_type=project.metrics.PROMETHEUS_CONTENT_TYPE,
+    )
+
+
+@app.get("/api/users/export")
+async def api_get_exportUsers(
+    request: Request,
+    format: project.exportUsers_service.ExportFormat = "ndjson",
+    gzip: bool = False,
+    requester: project.auth_service.AuthenticatedUser = Depends(
+        project.auth_service.require_user
+    ),
+) -> Response:
+    """
+    Streams every user as NDJSON or CSV, optionally gzip-compressed, reading the 'User' table in fixed-size chunks and stopping as soon as the client disconnects. This action is restricted to admin users.
+    """
+    stream = project.exportUsers_service.exportUsers(
+        str(requester.role),
+        format,
+        gzip,
+        is_disconnected=request.is_disconnected,
+    )
+    filename = f"users.{format}.gz" if gzip else f"users.{format}"
+    return StreamingResponse(
+        stream,
+        media_type=(
+            "application/gzip"
+            if gzip
+            else project.exportUsers_service.EXPORT_MEDIA_TYPES[format]
+        ),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.get("/api/users/events")
+@project.query_tracking.query_budget(1)
+@project.admission.admission_class(project.admission.DB, release_on_stream=True)
+async def api_get_userEvents(
+    request: Request,
+    last_event_id: str | None = Query(None, alias="lastEventId"),
+    requester: project.auth_service.AuthenticatedUser = Depends(
+        project.auth_service.require_user
+    ),
+) -> Response:
+    """
+    Streams user changes as server-sent events: `created`, `updated` and `deleted`, each carrying the user's id and, for the first two, their email and role (and the new version for updates). Reconnecting clients send Last-Event-ID (or `lastEventId`) to receive only the events they missed, or a `reset` event when those are no longer available. This action is restricted to admin users.
+
+    Resolving the bearer token may query the database, so the route is admitted as DB (and waits for the database gate). It gives its admission slots back once the stream starts: the stream itself holds no database connection, and open streams are capped by USER_EVENTS_MAX_SUBSCRIBERS instead.
+    """
+    if requester.role != prisma.enums.Role.Admin:
+        raise PermissionError("Access denied: Admin role required.")
+    subscription = project.user_events.user_events.subscribe(
+        request.headers.get("last-event-id") or last_event_id
+    )
+    if subscription is None:
+        return project.responses.error_response(
+            "Too many event stream subscribers, retry later.",
+            503,
+            {"Retry-After": "5"},
+        )
+    return project.user_events.EventStreamResponse(
+        subscription, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get(
     "/api/users/{userId}",
     response_model=project.getUserProfile_service.UserProfileResponseModel,
 )
+@project.query_tracking.query_budget(1)
+@project.response_cache.cache_response(
+    ttl=project.getUserProfile_service.PROFILE_CACHE_TTL_SECONDS,
+    vary=("path:userId",),
+    tags=("user:{userId}",),
+)
 async def api_get_getUserProfile(
     userId: int,
 ) -> project.getUserProfile_service.UserProfileResponseModel | Response:
     """
     Retrieves the profile of the user identified by the provided userId. Returns user details excluding sensitive information like password.
     """
-    try:
-        res = project.getUserProfile_service.getUserProfile(userId)
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    res = await project.getUserProfile_service.getUserProfile(userId)
+    return project.responses.respond(res)
 
 
 @app.get("/version", response_model=project.get_version_service.VersionResponseModel)
-async def api_get_get_version(
-    request: project.get_version_service.VersionRequestModel,
-) -> project.get_version_service.VersionResponseModel | Response:
+@project.query_tracking.query_budget(0)
+async def api_get_get_version(request: Request) -> Response:
     """
     This endpoint retrieves the current API version. It should be publicly accessible as it provides basic information about the API. The endpoint responds with a JSON object containing the 'version' key with the version of the API as its value. For instance, a typical response would be { 'version': '1.0.0' }.
+
+    The body is pre-serialized when the version is loaded at startup, or reloaded through SIGHUP or POST /admin/version/reload.
     """
-    try:
-        res = project.get_version_service.get_version(request)
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    return project.get_version_service.version_cache.body.response(
+        request.headers.get("if-none-match")
+    )
+
+
+@app.post(
+    "/admin/version/reload",
+    response_model=project.get_version_service.VersionResponseModel,
+)
+@project.query_tracking.query_budget(2)
+async def api_post_reloadVersion(
+    requester: project.auth_service.AuthenticatedUser = Depends(
+        project.auth_service.require_user
+    ),
+) -> project.get_version_service.VersionResponseModel | Response:
+    """
+    Reloads the served version from the 'Version' table without a restart. This action is restricted to admin users.
+    """
+    if requester.role != prisma.enums.Role.Admin:
+        raise PermissionError("Access denied: Admin role required.")
+    await project.get_version_service.version_cache.reload()
+    return project.responses.respond(project.get_version_service.version_cache.model)
 
 
 @app.post(
     "/api/users/login", response_model=project.loginUser_service.UserLoginResponseModel
 )
+@project.query_tracking.query_budget(3)
 async def api_post_loginUser(
     username: str, password: str
 ) -> project.loginUser_service.UserLoginResponseModel | Response:
     """
-    Authenticates a user. Accepts username and password in the request body, verifies credentials, and returns a JWT token if successful.
+    Authenticates a user. Accepts username and password in the request body, verifies credentials off the event loop, and returns a signed bearer token if successful.
     """
-    try:
-        res = project.loginUser_service.loginUser(username, password)
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    res = await project.loginUser_service.loginUser(username, password)
+    return project.responses.respond(res)
 
 
 @app.get("/hello", response_model=project.getHelloWorld_service.HelloWorldResponse)
-async def api_get_getHelloWorld(
-    request: project.getHelloWorld_service.HelloWorldRequest,
-) -> project.getHelloWorld_service.HelloWorldResponse | Response:
+@project.query_tracking.query_budget(0)
+async def api_get_getHelloWorld(request: Request) -> Response:
     """
-    This endpoint returns a simple 'Hello, World!' message. When a GET request is made to this endpoint, a plain text response with the content 'Hello, World!' will be returned.
+    This endpoint returns a simple 'Hello, World!' message. The body is served pre-encoded from memory as JSON, or as plain text when the client asks for text/plain, and conditional requests carrying a matching If-None-Match receive a 304.
     """
-    try:
-        res = project.getHelloWorld_service.getHelloWorld(request)
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    body = project.getHelloWorld_service.hello_cache.select(
+        request.headers.get("accept")
+    )
+    return body.response(request.headers.get("if-none-match"))
 
 
 @app.get("/docs", response_model=project.getDocumentation_service.GetDocsResponseModel)
-async def api_get_getDocumentation(
-    request: project.getDocumentation_service.GetDocsRequestModel,
-) -> project.getDocumentation_service.GetDocsResponseModel | Response:
+@project.query_tracking.query_budget(2)
+@project.response_cache.cache_response(
+    ttl=project.getDocumentation_service.DOCS_REVALIDATE_SECONDS,
+    vary=("header:accept", "header:accept-encoding"),
+    tags=("docs",),
+)
+async def api_get_getDocumentation(request: Request) -> Response:
     """
     This route serves the API documentation for the 'hello worlld' product. When a GET request is made to this endpoint, it should return a comprehensive guide on how to use the API, including endpoint definitions, request/response formats, and any other pertinent information. The response should be in HTML or Markdown format, allowing users to easily navigate and understand the API functionalities.
+
+    The content is negotiated through Accept (JSON by default, or text/html and text/markdown) and Accept-Encoding (br, gzip), and it honors If-None-Match and If-Modified-Since.
     """
-    try:
-        res = await project.getDocumentation_service.getDocumentation(request)
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    snapshot = await project.getDocumentation_service.documentation_cache.get()
+    return snapshot.response(
+        request.headers.get("accept"),
+        request.headers.get("accept-encoding"),
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+    )
 
 
 @app.get("/health", response_model=project.check_health_service.HealthCheckResponse)
+@project.query_tracking.query_budget(0)
 async def api_get_check_health(
     request: project.check_health_service.HealthCheckRequest,
 ) -> project.check_health_service.HealthCheckResponse | Response:
@@ -157,112 +478,141 @@ async def api_get_check_health(
 
     How it works: The '/health' endpoint does not interact with other internal endpoints or external APIs. It simply checks if the server is up and running. If the server is functioning correctly, it returns a response with the status 'UP'. This endpoint is useful for monitoring and automated checks.
     """
-    try:
-        res = await project.check_health_service.check_health(request)
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    res = await project.check_health_service.check_health(request)
+    return project.responses.respond(res)
+
+
+@app.get(
+    "/health/live", response_model=project.check_health_service.HealthCheckResponse
+)
+@project.query_tracking.query_budget(0)
+@project.admission.admission_class(project.admission.EXEMPT)
+async def api_get_check_liveness() -> Response:
+    """
+    Liveness probe. Answers from memory without touching the database, so it only fails when the process itself is unresponsive.
+    """
+    return project.check_health_service.liveness_body.response()
+
+
+@app.get(
+    "/health/ready", response_model=project.check_health_service.HealthCheckResponse
+)
+@project.query_tracking.query_budget(1)
+@project.admission.admission_class(project.admission.EXEMPT)
+async def api_get_check_readiness() -> (
+    project.check_health_service.HealthCheckResponse | Response
+):
+    """
+    Readiness probe. Runs a cheap connection check on the shared Prisma client and answers 503 while the database is unreachable.
+    """
+    res = await project.check_health_service.check_readiness(db_client)
+    if res.status != "UP":
+        return project.responses.respond(res, status_code=503)
+    return project.responses.respond(res)
 
 
 @app.post(
     "/api/users/register",
     response_model=project.registerUser_service.UserRegistrationResponse,
 )
+@project.query_tracking.query_budget(2)
 async def api_post_registerUser(
     password: str, username: str, email: str
 ) -> project.registerUser_service.UserRegistrationResponse | Response:
     """
     Registers a new user. Accepts user details (username, password, email) in the request body and creates a new user. Returns a success message along with the user ID.
     """
-    try:
-        res = await project.registerUser_service.registerUser(password, username, email)
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    res = await project.registerUser_service.registerUser(username, password, email)
+    return project.responses.respond(res)
+
+
+@app.post(
+    "/api/users/register/bulk",
+    response_model=project.registerUsersBulk_service.BulkRegistrationResponse,
+)
+async def api_post_registerUsersBulk(
+    request: Request,
+    requester: project.auth_service.AuthenticatedUser = Depends(
+        project.auth_service.require_user
+    ),
+) -> project.registerUsersBulk_service.BulkRegistrationResponse | Response:
+    """
+    Registers many users in one request. The body is either a JSON array of {username, password, email} objects or, with Content-Type application/x-ndjson, one such object per line, which is consumed as it streams in. Returns a result for every row, including duplicate-email conflicts. This action is restricted to admin users.
+    """
+    if requester.role != prisma.enums.Role.Admin:
+        raise PermissionError("Access denied: Admin role required.")
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        rows = project.registerUsersBulk_service.iter_ndjson(request.stream())
+    else:
+        rows = project.registerUsersBulk_service.iter_json_array(await request.body())
+    res = await project.registerUsersBulk_service.registerUsersBulk(rows)
+    return project.responses.respond(res)
 
 
 @app.delete(
     "/api/users/{userId}",
     response_model=project.deleteUserProfile_service.DeleteUserResponseModel,
 )
+@project.query_tracking.query_budget(2)
 async def api_delete_deleteUserProfile(
-    userId: int, Authorization: str
+    userId: int,
+    requester: project.auth_service.AuthenticatedUser = Depends(
+        project.auth_service.require_user
+    ),
 ) -> project.deleteUserProfile_service.DeleteUserResponseModel | Response:
     """
     Deletes the user profile identified by the provided userId. This action should ensure that all user data is removed. Requires authentication and can be performed by the user themselves or an admin.
     """
-    try:
-        res = await project.deleteUserProfile_service.deleteUserProfile(
-            userId, Authorization
-        )
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    res = await project.deleteUserProfile_service.deleteUserProfile(userId, requester)
+    return project.responses.respond(res)
 
 
 @app.get("/api/users", response_model=project.listUsers_service.GetUsersResponse)
+@project.query_tracking.query_budget(2)
+@project.response_cache.cache_response(
+    vary=(project.auth_service.requester_role, "query:limit", "query:after"),
+    tags=("users",),
+)
 async def api_get_listUsers(
-    role: str,
+    limit: int = Query(
+        project.listUsers_service.USERS_PAGE_DEFAULT,
+        ge=1,
+        le=project.listUsers_service.USERS_PAGE_MAX,
+    ),
+    after: int | None = None,
+    requester: project.auth_service.AuthenticatedUser = Depends(
+        project.auth_service.require_user
+    ),
 ) -> project.listUsers_service.GetUsersResponse | Response:
     """
-    Lists all users in the system. This route should return a list containing basic user details excluding sensitive information. This action is restricted to admin users.
+    Lists users in the system one page at a time. Pass the returned `next_cursor` as `after` to fetch the next page. This route should return a list containing basic user details excluding sensitive information. This action is restricted to admin users.
     """
-    try:
-        res = await project.listUsers_service.listUsers(role)
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    res = await project.listUsers_service.listUsers(str(requester.role), limit, after)
+    return project.responses.respond(res)
 
 
 @app.put(
     "/api/users/{userId}",
     response_model=project.updateUserProfile_service.UpdateUserProfileResponse,
 )
+@project.query_tracking.query_budget(3)
 async def api_put_updateUserProfile(
-    userId: int, username: str, email: str
+    userId: int,
+    username: str,
+    email: str,
+    version: int | None = None,
+    requester: project.auth_service.AuthenticatedUser = Depends(
+        project.auth_service.require_user
+    ),
 ) -> project.updateUserProfile_service.UpdateUserProfileResponse | Response:
     """
-    Updates user profile information. The user can update fields such as username, and email. Requires authentication and the user can only update their own profile.
+    Updates user profile information. The user can update fields such as username, and email. Requires authentication and the user can only update their own profile. Pass the profile's current `version` to have the update rejected with 409 if someone else changed it first.
     """
-    try:
-        res = await project.updateUserProfile_service.updateUserProfile(
-            userId, username, email
-        )
-        return res
-    except Exception as e:
-        logger.exception("Error processing request")
-        res = dict()
-        res["error"] = str(e)
-        return Response(
-            content=jsonable_encoder(res),
-            status_code=500,
-            media_type="application/json",
-        )
+    res = await project.updateUserProfile_service.updateUserProfile(
+        userId, username, email, requester, version
+    )
+    return project.responses.respond(res)
+
+
+project.startup_profile.startup_profiler.mark("import project.server")
@@ -0,0 +1,166 @@
+import importlib.abc
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "0") in ("1", "true", "True")
+
+STARTUP_PROFILE_TOP_IMPORTS = int(os.getenv("STARTUP_PROFILE_TOP_IMPORTS", "15"))
+
+
+class _TimedLoader:
+    """
+    Wraps a module loader so `exec_module` is timed. Every other attribute is delegated to the wrapped loader.
+    """
+
+    def __init__(self, loader: Any, timer: "ImportTimer") -> None:
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: Any) -> Any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        with self._timer.timing(module.__name__):
+            self._loader.exec_module(module)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    A meta path finder that records how long every module takes to import, both inclusive of and excluding the modules it imports in turn, in the manner of `python -X importtime`.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[Tuple[str, float, float]] = []
+        self._stack: List[List[float]] = []
+        self._finding = False
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Any:
+        if self._finding:
+            return None
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    @contextmanager
+    def timing(self, name: str) -> Iterator[None]:
+        frame = [0.0]
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += elapsed
+            self.records.append((name, elapsed, elapsed - frame[0]))
+
+    def install(self) -> None:
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+
+class StartupProfiler:
+    """
+    Records how long each startup phase takes, measured from when the `project` package was first imported: the imports of `project.server` and the init steps of the application lifespan. With STARTUP_PROFILE set, per-module import times are recorded too, and the report is logged once startup completes.
+    """
+
+    def __init__(self, profile_imports: bool = STARTUP_PROFILE) -> None:
+        self.started_at = time.perf_counter()
+        self.phases: List[Tuple[str, float, float]] = []
+        self.import_timer: Optional[ImportTimer] = None
+        if profile_imports:
+            self.import_timer = ImportTimer()
+            self.import_timer.install()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times a startup step:
+
+            with startup_profiler.phase("db connect"):
+                await db_client.connect()
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                (name, start - self.started_at, time.perf_counter() - start)
+            )
+
+    def mark(self, name: str) -> None:
+        """
+        Records a milestone, such as the end of the imports or the moment the app starts serving.
+        """
+        self.phases.append((name, time.perf_counter() - self.started_at, 0.0))
+
+    def as_dict(self) -> Dict[str, Any]:
+        imports = []
+        if self.import_timer is not None:
+            imports = [
+                {"module": name, "inclusive_ms": total * 1000, "self_ms": own * 1000}
+                for name, total, own in sorted(
+                    self.import_timer.records, key=lambda r: r[2], reverse=True
+                )[:STARTUP_PROFILE_TOP_IMPORTS]
+            ]
+        return {
+            "phases": [
+                {"phase": name, "at_ms": at * 1000, "took_ms": took * 1000}
+                for name, at, took in sorted(self.phases, key=lambda p: p[1])
+            ],
+            "slowest_imports": imports,
+        }
+
+    def report(self) -> str:
+        data = self.as_dict()
+        lines = ["Startup profile (ms since the project package was imported):"]
+        for phase in data["phases"]:
+            lines.append(
+                f"  {phase['phase']:<32} at {phase['at_ms']:9.1f}"
+                f"  took {phase['took_ms']:9.1f}"
+            )
+        if data["slowest_imports"]:
+            lines.append("Slowest imports (self / inclusive ms):")
+            for record in data["slowest_imports"]:
+                lines.append(
+                    f"  {record['module']:<48} {record['self_ms']:8.1f}"
+                    f" / {record['inclusive_ms']:8.1f}"
+                )
+        return "\n".join(lines)
+
+    def finish(self) -> None:
+        """
+        Stops recording imports and, with STARTUP_PROFILE set, logs the report.
+        """
+        if self.import_timer is not None:
+            self.import_timer.uninstall()
+            logger.info("%s", self.report())
+
+
+startup_profiler = StartupProfiler()
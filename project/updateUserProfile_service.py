@@ -1,49 +1,118 @@
+from typing import Optional
+
 import prisma
 import prisma.enums
-import prisma.models
+import prisma.errors
+import prisma.partials
+from project.auth_service import AuthenticatedUser
+from project.getUserProfile_service import profile_loader
+from project.registerUser_service import EmailAlreadyRegisteredError
+from project.response_cache import response_cache
+from project.user_events import user_updated
+from project.user_index import user_index
 from pydantic import BaseModel
 
+_UPDATE_USER_SQL = (
+    'UPDATE "User" SET "email" = $2, "version" = "version" + 1 '
+    'WHERE "id" = $1 AND ($3::int IS NULL OR "version" = $3::int) '
+    'RETURNING "id", "email", "role"::text AS "role", "version"'
+)
+
+
+# Postgres SQLSTATE for a unique constraint violation. A raw statement reports it as
+# RawQueryError with the code in its meta, not as UniqueViolationError.
+_UNIQUE_VIOLATION = "23505"
+
+
+def _is_unique_violation(error: prisma.errors.PrismaError) -> bool:
+    if isinstance(error, prisma.errors.UniqueViolationError):
+        return True
+    meta = getattr(error, "meta", None) or {}
+    return isinstance(meta, dict) and meta.get("code") == _UNIQUE_VIOLATION
+
+
+class VersionConflictError(Exception):
+    """
+    Raised when an update names an expected version that no longer matches the stored row, i.e. someone else updated the profile first.
+    """
+
 
 class UpdateUserProfileResponse(BaseModel):
     """
-    Response model after updating user profile information. Returns the updated user profile.
+    Response model after updating user profile information. Returns the updated user profile, including the new version to send with the next update.
     """
 
     id: int
     username: str
     email: str
     role: prisma.enums.Role
+    version: int
 
 
 async def updateUserProfile(
-    userId: int, username: str, email: str
+    userId: int,
+    username: str,
+    email: str,
+    requester: AuthenticatedUser,
+    expected_version: Optional[int] = None,
 ) -> UpdateUserProfileResponse:
     """
     Updates user profile information. The user can update fields such as username, and email. Requires authentication and the user can only update their own profile.
 
+    The update is a single conditional UPDATE ... RETURNING statement, not a read followed by a write. When `expected_version` is given, the row is only changed if its version still matches (optimistic concurrency). Without it, the last write wins. The User model has no username column, so the submitted username is echoed back but not stored.
+
     Args:
     userId (int): The ID of the user whose profile is being updated.
     username (str): The new username for the user.
     email (str): The new email for the user.
+    requester (AuthenticatedUser): The caller, as resolved from their bearer token by `require_user`.
+    expected_version (Optional[int]): The version the caller last read, or None to skip the concurrency check.
 
     Returns:
     UpdateUserProfileResponse: Response model after updating user profile information. Returns the updated user profile.
 
+    Raises:
+    PermissionError: If the requester is not the user being updated.
+    LookupError: If no user exists with this id.
+    VersionConflictError: If `expected_version` is stale.
+    EmailAlreadyRegisteredError: If another user already has `email`.
+
     Example:
-        response = await updateUserProfile(1, "new_username", "new_email@example.com")
-        > UpdateUserProfileResponse(id=1, username="new_username", email="new_email@example.com", role="User")
+        response = await updateUserProfile(1, "new_username", "new_email@example.com", requester, expected_version=3)
+        > UpdateUserProfileResponse(id=1, username="new_username", email="new_email@example.com", role="User", version=4)
     """
-    user = await prisma.models.User.prisma().find_unique(where={"id": userId})
-    if not user:
-        raise ValueError(f"No user found with ID {userId}")
-    updated_user = await prisma.models.User.prisma().update(
-        where={"id": userId}, data={"email": email, "username": username}
+    if requester.id != userId:
+        raise PermissionError("Access denied: users can only update their own profile.")
+    try:
+        row = await prisma.get_client().query_first(
+            _UPDATE_USER_SQL, userId, email, expected_version
+        )
+    except prisma.errors.DataError as e:
+        if _is_unique_violation(e):
+            raise EmailAlreadyRegisteredError(
+                f"Email {email} is already registered."
+            ) from e
+        raise
+    profile_loader.invalidate(userId)
+    response_cache.invalidate_tags("users", f"user:{userId}")
+    if not row:
+        # Only the failure path pays for a second query, to tell the two cases apart.
+        current = await prisma.partials.UserSummary.prisma().find_unique(
+            where={"id": userId}
+        )
+        if current is None:
+            user_index.remove(userId)
+            raise LookupError(f"No user found with ID {userId}")
+        user_index.put(current.id, current.email, current.role, current.version)
+        raise VersionConflictError(
+            f"User {userId} is at version {current.version}, not {expected_version}"
+        )
+    user_index.put(row["id"], row["email"], row["role"], row["version"])
+    user_updated(row["id"], row["email"], row["role"], row["version"])
+    return UpdateUserProfileResponse(
+        id=row["id"],
+        username=username,
+        email=row["email"],
+        role=prisma.enums.Role(row["role"]),
+        version=row["version"],
     )
-    response = UpdateUserProfileResponse(
-        id=updated_user.id,
-        username=updated_user.username,
-        email=updated_user.email,
-        role=updated_user.role.value,
-    )  # TODO(autogpt): Cannot access attribute "username" for class "User"
-    #     Attribute "username" is unknown. reportAttributeAccessIssue
-    return response
@@ -0,0 +1,239 @@
+"""
+In-process publish/subscribe of user changes, streamed to clients as server-sent events by GET /api/users/events.
+
+Every event gets an id of the form `<epoch>-<sequence>`. The epoch is drawn once per process, and the last USER_EVENTS_HISTORY events are kept, so a reconnecting client that sends its Last-Event-ID receives only the events it missed. When the id is from another process (a restart, or another worker) or older than the history, the client gets a `reset` event instead and should reload /api/users.
+
+Each subscriber has a bounded queue. A subscriber that falls USER_EVENTS_QUEUE_SIZE events behind is evicted: its stream ends, and the client's automatic reconnect resumes from the last event it received.
+
+Events are only seen by subscribers in the process that published them. With several workers, clients receive the changes made through the worker they are connected to.
+"""
+
+import asyncio
+import json
+import os
+import secrets
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Mapping, Optional, Set
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+USER_EVENTS_QUEUE_SIZE = int(os.getenv("USER_EVENTS_QUEUE_SIZE", "256"))
+
+USER_EVENTS_HISTORY = int(os.getenv("USER_EVENTS_HISTORY", "1000"))
+
+USER_EVENTS_MAX_SUBSCRIBERS = int(os.getenv("USER_EVENTS_MAX_SUBSCRIBERS", "1000"))
+
+USER_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("USER_EVENTS_KEEPALIVE_SECONDS", "15"))
+
+USER_EVENTS_RETRY_MS = int(os.getenv("USER_EVENTS_RETRY_MS", "2000"))
+
+CREATED = "created"
+
+UPDATED = "updated"
+
+DELETED = "deleted"
+
+RESET = "reset"
+
+_KEEPALIVE = b": keepalive\n\n"
+
+
+class UserEvent:
+    """
+    One change, encoded as an SSE frame once at publish time and shared by every subscriber.
+    """
+
+    __slots__ = ("seq", "id", "frame")
+
+    def __init__(self, seq: int, id: str, type: str, data: Dict[str, Any]) -> None:
+        self.seq = seq
+        self.id = id
+        payload = json.dumps(data, separators=(",", ":"))
+        self.frame = f"id: {id}\nevent: {type}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Subscription:
+    """
+    A subscriber's view of the broker: the events to replay on connect, then a bounded queue of live events. A None in the queue means the subscription was closed, by eviction or by the broker shutting down.
+    """
+
+    def __init__(self, broker: "UserEventBroker", replay: List[bytes]) -> None:
+        self.broker = broker
+        self.replay = replay
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=broker.queue_size)
+        self.closed = False
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def stream(
+        self,
+        keepalive: float = USER_EVENTS_KEEPALIVE_SECONDS,
+        retry_ms: int = USER_EVENTS_RETRY_MS,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields the SSE body: the reconnect delay, the replayed events, then live events, with a comment line every `keepalive` seconds of silence so proxies keep the connection open. The subscription is removed from the broker when the stream ends or is cancelled.
+        """
+        try:
+            yield f"retry: {retry_ms}\n\n".encode("utf-8") + b"".join(self.replay)
+            self.replay = []
+            while True:
+                try:
+                    frame = await asyncio.wait_for(self.queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield _KEEPALIVE
+                    continue
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self.broker.unsubscribe(self)
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    Streams a subscription as server-sent events, and removes it from the broker when the response ends. This also covers a client that disconnects before the stream starts, when `stream()` never runs and so never cleans up.
+    """
+
+    def __init__(
+        self, subscription: Subscription, headers: Optional[Mapping[str, str]] = None
+    ) -> None:
+        super().__init__(
+            subscription.stream(), media_type="text/event-stream", headers=headers
+        )
+        self.subscription = subscription
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.subscription.broker.unsubscribe(self.subscription)
+
+
+class UserEventBroker:
+    """
+    Fans user changes out to subscribers without ever blocking the publisher: `publish` is synchronous, encodes the event once and puts it on every subscriber's queue, evicting any subscriber whose queue is full.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = USER_EVENTS_QUEUE_SIZE,
+        history: int = USER_EVENTS_HISTORY,
+        max_subscribers: int = USER_EVENTS_MAX_SUBSCRIBERS,
+    ) -> None:
+        self.queue_size = max(1, queue_size)
+        self.max_subscribers = max_subscribers
+        self.epoch = secrets.token_hex(4)
+        self.history: Deque[UserEvent] = deque(maxlen=max(1, history))
+        self.subscribers: Set[Subscription] = set()
+        self._seq = 0
+        self.published = 0
+        self.evicted = 0
+        self.replayed = 0
+        self.resets = 0
+        self.refused = 0
+
+    @property
+    def last_event_id(self) -> str:
+        return f"{self.epoch}-{self._seq}"
+
+    def publish(self, type: str, data: Dict[str, Any]) -> UserEvent:
+        self._seq += 1
+        event = UserEvent(self._seq, f"{self.epoch}-{self._seq}", type, data)
+        self.history.append(event)
+        self.published += 1
+        for subscription in list(self.subscribers):
+            try:
+                subscription.queue.put_nowait(event.frame)
+            except asyncio.QueueFull:
+                self.evicted += 1
+                self.subscribers.discard(subscription)
+                subscription.close()
+        return event
+
+    def _replay(self, last_event_id: Optional[str]) -> List[bytes]:
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition("-")
+        try:
+            after = int(seq)
+        except ValueError:
+            after = -1
+        oldest = self.history[0].seq if self.history else self._seq + 1
+        if epoch != self.epoch or after < oldest - 1 or after > self._seq:
+            self.resets += 1
+            return [
+                UserEvent(
+                    self._seq,
+                    self.last_event_id,
+                    RESET,
+                    {"reason": "Missed events are no longer available."},
+                ).frame
+            ]
+        frames = [event.frame for event in self.history if event.seq > after]
+        self.replayed += len(frames)
+        return frames
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Optional[Subscription]:
+        """
+        Registers a subscriber, or returns None when USER_EVENTS_MAX_SUBSCRIBERS are already connected. The replay is taken from the history in the same step, so no event can fall between the replay and the live queue.
+
+        Args:
+            last_event_id (Optional[str]): The id of the last event the client received, from the Last-Event-ID header.
+
+        Returns:
+            Optional[Subscription]: The subscription, to be sent as an EventStreamResponse.
+
+        Example:
+            subscription = user_events.subscribe(request.headers.get("last-event-id"))
+            return EventStreamResponse(subscription)
+        """
+        if len(self.subscribers) >= self.max_subscribers:
+            self.refused += 1
+            return None
+        subscription = Subscription(self, self._replay(last_event_id))
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    def close(self) -> None:
+        """
+        Ends every open stream, e.g. at shutdown.
+        """
+        for subscription in list(self.subscribers):
+            subscription.close()
+        self.subscribers.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "published": self.published,
+            "evicted": self.evicted,
+            "replayed": self.replayed,
+            "reset": self.resets,
+            "refused": self.refused,
+        }
+
+
+user_events = UserEventBroker()
+
+
+def user_created(user_id: int, email: str, role: str) -> None:
+    user_events.publish(CREATED, {"id": user_id, "email": email, "role": role})
+
+
+def user_updated(user_id: int, email: str, role: str, version: int) -> None:
+    user_events.publish(
+        UPDATED, {"id": user_id, "email": email, "role": role, "version": version}
+    )
+
+
+def user_deleted(user_id: int) -> None:
+    user_events.publish(DELETED, {"id": user_id})
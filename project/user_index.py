@@ -0,0 +1,247 @@
+import asyncio
+import bisect
+import logging
+import os
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import prisma
+import prisma.enums
+import prisma.partials
+
+logger = logging.getLogger(__name__)
+
+USER_INDEX_ENABLED = os.getenv("USER_INDEX_ENABLED", "0") in ("1", "true", "True")
+
+# The index only sees writes made through its own process, so with several
+# workers each would serve the others' changes late. It is refused there.
+if USER_INDEX_ENABLED and int(os.getenv("WEB_CONCURRENCY") or "1") > 1:
+    logger.warning(
+        "USER_INDEX_ENABLED is ignored with WEB_CONCURRENCY > 1: workers would serve"
+        " each other's writes up to USER_INDEX_REFRESH_SECONDS late"
+    )
+    USER_INDEX_ENABLED = False
+
+USER_INDEX_REFRESH_SECONDS = float(os.getenv("USER_INDEX_REFRESH_SECONDS", "300"))
+
+USER_INDEX_BUILD_CHUNK = int(os.getenv("USER_INDEX_BUILD_CHUNK", "5000"))
+
+_ROLES: List[prisma.enums.Role] = list(prisma.enums.Role)
+
+_ROLE_CODES: Dict[str, int] = {str(role): code for code, role in enumerate(_ROLES)}
+
+
+class UserRecord:
+    """
+    A user's public fields, as read from `UserIndex`. Records are built on demand and not stored.
+    """
+
+    __slots__ = ("id", "email", "role", "version")
+
+    def __init__(
+        self, id: int, email: str, role: prisma.enums.Role, version: int
+    ) -> None:
+        self.id = id
+        self.email = email
+        self.role = role
+        self.version = version
+
+
+class UserProjection:
+    """
+    The id, email, role and version of every user, held column-wise: ids and versions in `array('q')`s sorted by id, roles as one byte each, emails in a list, and a dict from email to id. No password data is held.
+
+    Lookups by id are a binary search, lookups by email a dict lookup, and a keyset page is a slice. New users have the highest id, so registering one is an append.
+    """
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.versions = array("q")
+        self.roles = array("B")
+        self.emails: List[str] = []
+        self.by_email: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _position(self, user_id: int) -> int:
+        position = bisect.bisect_left(self.ids, user_id)
+        if position < len(self.ids) and self.ids[position] == user_id:
+            return position
+        return -1
+
+    def _record(self, position: int) -> UserRecord:
+        return UserRecord(
+            self.ids[position],
+            self.emails[position],
+            _ROLES[self.roles[position]],
+            self.versions[position],
+        )
+
+    def put(self, user_id: int, email: str, role: str, version: int) -> None:
+        code = _ROLE_CODES[str(role)]
+        position = self._position(user_id)
+        if position >= 0:
+            previous = self.emails[position]
+            if previous != email and self.by_email.get(previous) == user_id:
+                del self.by_email[previous]
+            self.emails[position] = email
+            self.roles[position] = code
+            self.versions[position] = version
+        else:
+            position = bisect.bisect_left(self.ids, user_id)
+            self.ids.insert(position, user_id)
+            self.versions.insert(position, version)
+            self.roles.insert(position, code)
+            self.emails.insert(position, email)
+        self.by_email[email] = user_id
+
+    def remove(self, user_id: int) -> None:
+        position = self._position(user_id)
+        if position < 0:
+            return
+        email = self.emails[position]
+        if self.by_email.get(email) == user_id:
+            del self.by_email[email]
+        del self.ids[position]
+        del self.versions[position]
+        del self.roles[position]
+        del self.emails[position]
+
+    def get(self, user_id: int) -> Optional[UserRecord]:
+        position = self._position(user_id)
+        return self._record(position) if position >= 0 else None
+
+    def page(self, after: Optional[int], limit: int) -> List[UserRecord]:
+        start = 0 if after is None else bisect.bisect_right(self.ids, after)
+        return [
+            self._record(position)
+            for position in range(start, min(start + limit, len(self.ids)))
+        ]
+
+    def footprint(self) -> int:
+        """
+        The bytes held by the projection: its arrays, the email list and strings, the email dict and the id objects it maps to.
+        """
+        size = sum(
+            sys.getsizeof(column)
+            for column in (self.ids, self.versions, self.roles, self.emails)
+        )
+        size += sum(sys.getsizeof(email) for email in self.emails)
+        size += sys.getsizeof(self.by_email)
+        size += sum(sys.getsizeof(user_id) for user_id in self.by_email.values())
+        return size
+
+
+class UserIndex:
+    """
+    An optional in-process projection of the 'User' table (USER_INDEX_ENABLED) that serves profile reads, admin listings and email-uniqueness checks without a query.
+
+    The projection is built in the background at startup with a keyset scan and rebuilt every USER_INDEX_REFRESH_SECONDS. Until the first build completes, `ready` is False and callers query the database as before. Writes made through this process update it immediately with `put` and `remove`. Writes made during a rebuild are journaled and replayed onto the new projection before it is swapped in, so none are lost.
+
+    It is only enabled with a single worker: every write through the app then updates it immediately, and only changes made outside the app (such as manual SQL) wait for the next rebuild. Lookups by id that miss fall back to the database, and an email found here is confirmed against the database before a registration is refused.
+    """
+
+    def __init__(self) -> None:
+        self._projection: Optional[UserProjection] = None
+        self._journal: Optional[List[Tuple[str, tuple]]] = None
+        self.bytes = 0
+        self.built_at: Optional[float] = None
+        self.builds = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._projection is not None
+
+    @property
+    def users(self) -> int:
+        return len(self._projection) if self._projection is not None else 0
+
+    @property
+    def bytes_per_100k_users(self) -> float:
+        return self.bytes / self.users * 100_000 if self.users else 0.0
+
+    def put(self, user_id: int, email: str, role: str, version: int) -> None:
+        args = (user_id, email, role, version)
+        if self._journal is not None:
+            self._journal.append(("put", args))
+        if self._projection is not None:
+            self._projection.put(*args)
+
+    def remove(self, user_id: int) -> None:
+        if self._journal is not None:
+            self._journal.append(("remove", (user_id,)))
+        if self._projection is not None:
+            self._projection.remove(user_id)
+
+    def get(self, user_id: int) -> Optional[UserRecord]:
+        return self._projection.get(user_id) if self._projection is not None else None
+
+    def page(self, after: Optional[int], limit: int) -> List[UserRecord]:
+        if self._projection is None:
+            return []
+        return self._projection.page(after, limit)
+
+    def email_owner(self, email: str) -> Optional[int]:
+        """
+        The id of the user registered with `email`, or None if there is none or the index is not built yet.
+        """
+        if self._projection is None:
+            return None
+        return self._projection.by_email.get(email)
+
+    async def build(self, chunk_size: int = USER_INDEX_BUILD_CHUNK) -> None:
+        """
+        Reads every user's id, email, role and version in keyset chunks of `chunk_size` and swaps the result in.
+        """
+        start = time.perf_counter()
+        projection = UserProjection()
+        self._journal = []
+        try:
+            after = None
+            while True:
+                users = await prisma.partials.UserSummary.prisma().find_many(
+                    take=chunk_size,
+                    where={"id": {"gt": after}} if after is not None else {},
+                    order={"id": "asc"},
+                )
+                for user in users:
+                    projection.put(user.id, user.email, user.role, user.version)
+                if len(users) < chunk_size:
+                    break
+                after = users[-1].id
+            for operation, args in self._journal:
+                getattr(projection, operation)(*args)
+        finally:
+            self._journal = None
+        self._projection = projection
+        self.bytes = projection.footprint()
+        self.built_at = time.time()
+        self.builds += 1
+        logger.info(
+            "Built the user index: %d users in %.2fs, %.1f MB (%.1f MB per 100k users)",
+            len(projection),
+            time.perf_counter() - start,
+            self.bytes / 1e6,
+            self.bytes_per_100k_users / 1e6,
+        )
+
+    async def run(self, interval: float = USER_INDEX_REFRESH_SECONDS) -> None:
+        """
+        Builds the index, then rebuilds it every `interval` seconds until cancelled. Failures are logged, and the previous projection keeps being served.
+        """
+        while True:
+            try:
+                await self.build()
+            except Exception:
+                logger.exception("Failed to build the user index")
+            await asyncio.sleep(interval)
+
+    def clear(self) -> None:
+        self._projection = None
+        self.bytes = 0
+
+
+user_index = UserIndex()
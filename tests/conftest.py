@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import pytest
+
+# Read by the app at import time: a fixed token secret, no background maintenance,
+# query budgets enforced, and password hashing cheap enough to run in threads.
+os.environ.setdefault("APP_ENV", "development")
+os.environ.setdefault("AUTH_TOKEN_SECRET", "test-secret")
+os.environ.setdefault("MAINTENANCE_ENABLED", "0")
+os.environ.setdefault("DB_QUERY_BUDGET_ENFORCE", "1")
+os.environ.setdefault("PASSWORD_HASH_EXECUTOR", "thread")
+os.environ.setdefault("SCRYPT_N", "1024")
+
+
+class App:
+    """
+    The application on an in-memory fake database, and the event loop it runs on. Requests go through the full middleware stack in-process.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, database: Any) -> None:
+        import project.server
+
+        self.loop = loop
+        self.db = database
+        self.asgi = project.server.app
+
+    def run(self, awaitable: Any) -> Any:
+        return self.loop.run_until_complete(awaitable)
+
+    def call(
+        self,
+        method: str,
+        path: str,
+        token: Optional[str] = None,
+        body: bytes = b"",
+        headers: Iterable[Tuple[str, str]] = (),
+    ) -> Tuple[int, Dict[bytes, bytes], bytes]:
+        """
+        Sends one request, with a bearer token if given, and returns (status, headers, body).
+        """
+        from benchmarks._harness import asgi_call
+
+        headers = list(headers)
+        if token:
+            headers.append(("authorization", f"Bearer {token}"))
+        status, response_headers, content = self.run(
+            asgi_call(self.asgi, method, path, headers, body)
+        )
+        return status, dict(response_headers), content
+
+    def json(self, method: str, path: str, token: Optional[str] = None, **kwargs):
+        """
+        Like `call`, with the body decoded as JSON.
+        """
+        status, headers, content = self.call(method, path, token, **kwargs)
+        return status, headers, json.loads(content) if content else None
+
+    def add_user(
+        self, email: str, role: str = "User", password: str = "not-a-hash"
+    ) -> Tuple[int, str]:
+        """
+        Creates a user and issues them a token. Returns (user id, token).
+        """
+        import prisma.enums
+        import prisma.models
+        from project.auth_service import AuthenticatedUser, issueToken
+
+        async def create() -> Tuple[int, str]:
+            user = await prisma.models.User.prisma().create(
+                data={"email": email, "password": password, "role": role}
+            )
+            requester = AuthenticatedUser(id=user.id, role=prisma.enums.Role(role))
+            return user.id, await issueToken(requester)
+
+        return self.run(create())
+
+
+@pytest.fixture(scope="session")
+def app_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """
+    One event loop and one application lifespan for every route test: the app's shared components bind their locks and queues to the loop they first run on.
+    """
+    pytest.importorskip("prisma.models")
+    import project.server
+    from benchmarks._fake_db import FakeDatabase
+
+    loop = asyncio.new_event_loop()
+    FakeDatabase().install(project.server.db_client)
+    lifespan = project.server.app.router.lifespan_context(project.server.app)
+    loop.run_until_complete(lifespan.__aenter__())
+    yield loop
+    loop.run_until_complete(lifespan.__aexit__(None, None, None))
+    loop.close()
+
+
+@pytest.fixture
+def app(app_loop: asyncio.AbstractEventLoop) -> App:
+    """
+    The application on a fresh, empty fake database, with every in-process cache emptied.
+    """
+    import project.server
+    from benchmarks._fake_db import FakeDatabase
+    from project.auth_service import token_cache
+    from project.getUserProfile_service import profile_loader
+    from project.response_cache import response_cache
+    from project.user_index import user_index
+
+    database = FakeDatabase()
+    database.install(project.server.db_client)
+    app_loop.run_until_complete(project.server.db_client.connect())
+    token_cache.clear()
+    response_cache.clear()
+    profile_loader.clear()
+    user_index.clear()
+    return App(app_loop, database)
@@ -0,0 +1,182 @@
+import asyncio
+from typing import AsyncIterator, Dict, Tuple
+
+from benchmarks._harness import asgi_call, http_scope
+from project.admission import (
+    DB,
+    EXEMPT,
+    STATIC,
+    AdmissionController,
+    AdmissionMiddleware,
+    ClientRateLimiter,
+    admission_class,
+    client_address,
+)
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+
+def make_app(controller: AdmissionController) -> Tuple[AdmissionMiddleware, Dict]:
+    """
+    An app with a DB route that blocks until `gates["db"]` is set, an EXEMPT route, and a streaming route that releases its slots on stream start and ends once `gates["stream"]` is set.
+    """
+    gates = {"db": asyncio.Event(), "stream": asyncio.Event()}
+
+    async def slow(request: Request) -> PlainTextResponse:
+        await gates["db"].wait()
+        return PlainTextResponse("done")
+
+    @admission_class(EXEMPT)
+    async def probe(request: Request) -> PlainTextResponse:
+        return PlainTextResponse("up")
+
+    @admission_class(DB, release_on_stream=True)
+    async def events(request: Request) -> StreamingResponse:
+        async def body() -> AsyncIterator[bytes]:
+            yield b"first"
+            await gates["stream"].wait()
+
+        return StreamingResponse(body())
+
+    routes = [
+        Route("/slow", slow),
+        Route("/probe", probe),
+        Route("/events", events),
+    ]
+    return AdmissionMiddleware(Starlette(routes=routes), routes, controller), gates
+
+
+def controller(**kwargs) -> AdmissionController:
+    kwargs.setdefault("limits", {STATIC: 1, DB: 1})
+    kwargs.setdefault("max_inflight", 10)
+    kwargs.setdefault("max_queue", 0)
+    return AdmissionController(**kwargs)
+
+
+def test_client_over_its_rate_gets_429():
+    async def scenario() -> None:
+        app, gates = make_app(
+            controller(rate_limiter=ClientRateLimiter(rate=1, burst=1))
+        )
+        gates["db"].set()
+
+        assert (await asgi_call(app, "GET", "/slow"))[0] == 200
+        status, headers, body = await asgi_call(app, "GET", "/slow")
+
+        assert status == 429
+        assert (b"retry-after", b"1") in headers
+        assert body == b'{"error":"Too many requests."}'
+
+    asyncio.run(scenario())
+
+
+def test_request_beyond_a_full_queue_is_shed_with_503():
+    async def scenario() -> None:
+        limits = controller(retry_after=7)
+        app, gates = make_app(limits)
+        first = asyncio.create_task(asgi_call(app, "GET", "/slow"))
+        await asyncio.sleep(0.01)
+
+        status, headers, _ = await asgi_call(app, "GET", "/slow")
+
+        assert status == 503
+        assert (b"retry-after", b"7") in headers
+        assert limits.stats()[DB]["rejected"] == 1
+        gates["db"].set()
+        assert (await first)[0] == 200
+        assert limits.stats()[DB]["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_past_its_deadline_gets_503():
+    async def scenario() -> None:
+        limits = controller(max_queue=1, queue_timeout=0.05)
+        app, gates = make_app(limits)
+        first = asyncio.create_task(asgi_call(app, "GET", "/slow"))
+        await asyncio.sleep(0.01)
+
+        assert (await asgi_call(app, "GET", "/slow"))[0] == 503
+        assert limits.stats()[DB]["timed_out"] == 1
+        gates["db"].set()
+        await first
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_takes_the_released_slot():
+    async def scenario() -> None:
+        limits = controller(max_queue=1, queue_timeout=5)
+        app, gates = make_app(limits)
+        first = asyncio.create_task(asgi_call(app, "GET", "/slow"))
+        second = asyncio.create_task(asgi_call(app, "GET", "/slow"))
+        await asyncio.sleep(0.01)
+        assert limits.stats()[DB]["queued"] == 1
+
+        gates["db"].set()
+
+        assert [(await task)[0] for task in (first, second)] == [200, 200]
+        assert limits.stats()[DB] == {
+            "in_flight": 0,
+            "queued": 0,
+            "admitted": 2,
+            "rejected": 0,
+            "timed_out": 0,
+        }
+
+    asyncio.run(scenario())
+
+
+def test_exempt_route_is_served_when_limiters_are_full():
+    async def scenario() -> None:
+        app, gates = make_app(controller(max_inflight=1))
+        first = asyncio.create_task(asgi_call(app, "GET", "/slow"))
+        await asyncio.sleep(0.01)
+
+        assert (await asgi_call(app, "GET", "/probe"))[0] == 200
+        gates["db"].set()
+        await first
+
+    asyncio.run(scenario())
+
+
+def test_streaming_route_releases_its_slots_once_the_response_starts():
+    async def scenario() -> None:
+        limits = controller()
+        app, gates = make_app(limits)
+        stream = asyncio.create_task(asgi_call(app, "GET", "/events"))
+        await asyncio.sleep(0.01)
+
+        assert not stream.done()
+        assert limits.stats()[DB]["in_flight"] == 0
+        assert limits.stats()["global"]["in_flight"] == 0
+        gates["db"].set()
+        assert (await asgi_call(app, "GET", "/slow"))[0] == 200
+        gates["stream"].set()
+        status, _, body = await stream
+        assert (status, body) == (200, b"first")
+        assert limits.stats()[DB]["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def forwarded(*hops: str) -> dict:
+    return http_scope("GET", "/", [("x-forwarded-for", ", ".join(hops))])
+
+
+def test_client_address_is_the_peer_without_trusted_proxies():
+    assert client_address(forwarded("203.0.113.9"), trusted_proxies=0) == "127.0.0.1"
+
+
+def test_client_address_is_the_hop_added_by_the_trusted_proxy():
+    scope = forwarded("198.51.100.1", "203.0.113.9")
+
+    assert client_address(scope, trusted_proxies=1) == "203.0.113.9"
+    assert client_address(scope, trusted_proxies=2) == "198.51.100.1"
+
+
+def test_client_address_falls_back_to_the_peer_when_hops_are_missing():
+    assert client_address(forwarded("203.0.113.9"), trusted_proxies=2) == "127.0.0.1"
+    assert client_address(http_scope("GET", "/"), trusted_proxies=1) == "127.0.0.1"
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+
+def test_token_older_than_its_ttl_is_rejected(app):
+    from project.auth_service import AUTH_TOKEN_TTL_SECONDS, token_cache
+
+    _, token = app.add_user("admin@example.com", "Admin")
+    assert app.call("GET", "/api/users", token)[0] == 200
+
+    for auth in app.db.tables["Auth"].rows.values():
+        auth["createdAt"] -= timedelta(seconds=AUTH_TOKEN_TTL_SECONDS + 1)
+    token_cache.clear()
+    status, headers, body = app.json("GET", "/api/users", token)
+
+    assert status == 401
+    assert headers[b"www-authenticate"] == b"Bearer"
+    assert body == {"error": "Invalid authentication token."}
+
+
+def test_verified_token_is_served_from_the_cache(app):
+    from project.auth_service import token_cache
+
+    _, token = app.add_user("admin@example.com", "Admin")
+    token_cache.clear()
+
+    app.call("GET", "/api/users", token)
+    queries = app.db.queries
+    app.call("GET", "/api/users?limit=1", token)
+
+    # Only the page itself is read: the token comes from the cache.
+    assert app.db.queries == queries + 1
+    assert token_cache.hits >= 1
+
+
+def test_forged_or_missing_token_is_rejected_without_a_query(app):
+    _, token = app.add_user("admin@example.com", "Admin")
+    nonce, _, _ = token.partition(".")
+    queries = app.db.queries
+
+    forged = app.json("GET", "/api/users", f"{nonce}.not-the-signature")
+    missing = app.json("GET", "/api/users")
+
+    assert forged[0] == 401
+    assert forged[2] == {"error": "Invalid authentication token."}
+    assert missing[0] == 401
+    assert missing[2] == {"error": "Missing bearer token."}
+    assert app.db.queries == queries
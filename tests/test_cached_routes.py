@@ -0,0 +1,27 @@
+def test_writes_invalidate_the_cached_list_and_profile(app):
+    user_id, token = app.add_user("admin@example.com", "Admin")
+
+    def cache_state(path: str, **kwargs):
+        return app.call("GET", path, token, **kwargs)[1].get(b"x-cache")
+
+    assert [cache_state("/api/users") for _ in range(2)] == [b"MISS", b"HIT"]
+    assert cache_state("/api/users", headers=[("limit", "1")]) == b"HIT"
+    assert [cache_state(f"/api/users/{user_id}") for _ in range(2)] == [
+        b"MISS",
+        b"HIT",
+    ]
+
+    status, _, _ = app.call(
+        "POST", "/api/users/register?username=new&password=secret&email=new@example.com"
+    )
+    assert status == 200
+    _, headers, body = app.json("GET", "/api/users", token)
+    assert headers.get(b"x-cache") == b"MISS"
+    assert [user["email"] for user in body["users"]][-1] == "new@example.com"
+    assert cache_state(f"/api/users/{user_id}") == b"HIT"
+
+    path = f"/api/users/{user_id}?username=admin&email=renamed@example.com"
+    assert app.call("PUT", path, token)[0] == 200
+    _, headers, body = app.json("GET", f"/api/users/{user_id}", token)
+    assert headers.get(b"x-cache") == b"MISS"
+    assert body["email"] == "renamed@example.com"
@@ -0,0 +1,56 @@
+import gzip
+import json
+
+import pytest
+
+
+@pytest.fixture
+def docs(app, monkeypatch):
+    import project.getDocumentation_service
+
+    monkeypatch.setattr(
+        project.getDocumentation_service,
+        "documentation_cache",
+        project.getDocumentation_service.DocumentationCache(),
+    )
+    content = "# Hello API\n\n" + "GET /hello returns a greeting.\n" * 100
+    app.db.tables["Documentation"].insert({"content": content})
+    return content
+
+
+def test_docs_are_compressed_when_the_client_accepts_it(app, docs):
+    status, headers, body = app.call(
+        "GET", "/docs", headers=[("accept-encoding", "gzip")]
+    )
+
+    assert status == 200
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept, Accept-Encoding"
+    assert json.loads(gzip.decompress(body))["content"] == docs
+
+    status, headers, body = app.call(
+        "GET", "/docs", headers=[("accept", "text/markdown")]
+    )
+    assert status == 200
+    assert b"content-encoding" not in headers
+    assert headers[b"content-type"].startswith(b"text/markdown")
+    assert body.decode() == docs
+
+
+def test_unchanged_docs_answer_conditional_requests_with_304(app, docs):
+    _, headers, _ = app.call("GET", "/docs")
+    etag = headers[b"etag"].decode()
+    last_modified = headers[b"last-modified"].decode()
+
+    by_etag = app.call("GET", "/docs", headers=[("if-none-match", etag)])
+    by_date = app.call("GET", "/docs", headers=[("if-modified-since", last_modified)])
+    gzipped = app.call(
+        "GET",
+        "/docs",
+        headers=[("if-none-match", etag), ("accept-encoding", "gzip")],
+    )
+
+    assert (by_etag[0], by_etag[2]) == (304, b"")
+    assert (by_date[0], by_date[2]) == (304, b"")
+    # The gzip body has its own ETag, so the identity one does not match it.
+    assert gzipped[0] == 200
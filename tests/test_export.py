@@ -0,0 +1,66 @@
+import csv
+import gzip
+import io
+import json
+from typing import List
+
+import pytest
+
+
+def collect(app, fmt: str, compress: bool = False) -> List[bytes]:
+    from project.exportUsers_service import exportUsers
+
+    async def chunks() -> List[bytes]:
+        return [chunk async for chunk in exportUsers("Admin", fmt, compress, 2)]
+
+    return app.run(chunks())
+
+
+def add_users(app, count: int) -> List[int]:
+    return [app.add_user(f"u{i}@example.com")[0] for i in range(count)]
+
+
+def test_ndjson_export_streams_every_user_across_chunks(app):
+    ids = add_users(app, 5)
+    queries = app.db.queries
+
+    chunks = collect(app, "ndjson")
+
+    assert len(chunks) == 3
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [row["id"] for row in rows] == ids
+    assert rows[0] == {"id": ids[0], "email": "u0@example.com", "role": "User"}
+    assert app.db.queries == queries + 3
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_csv_export_streams_a_header_then_every_user(app, compress):
+    ids = add_users(app, 4)
+    queries = app.db.queries
+
+    chunks = collect(app, "csv", compress)
+    body = b"".join(chunks)
+    if compress:
+        body = gzip.decompress(body)
+
+    rows = list(csv.reader(io.StringIO(body.decode())))
+    assert rows[0] == ["id", "email", "role"]
+    assert [int(row[0]) for row in rows[1:]] == ids
+    # Two full pages, then an empty one that ends the export.
+    assert app.db.queries == queries + 3
+
+
+def test_export_route_is_admin_only_and_names_the_file(app):
+    _, admin = app.add_user("admin@example.com", "Admin")
+    _, user = app.add_user("user@example.com")
+
+    status, headers, body = app.call("GET", "/api/users/export?format=csv", admin)
+
+    assert status == 200
+    assert headers[b"content-type"].startswith(b"text/csv")
+    assert b"attachment" in headers[b"content-disposition"]
+    assert body.decode().splitlines()[1:] == [
+        f"{row['id']},{row['email']},{row['role']}"
+        for row in app.db.tables["User"].rows.values()
+    ]
+    assert app.call("GET", "/api/users/export", user)[0] == 403
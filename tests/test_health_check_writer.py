@@ -0,0 +1,52 @@
+import asyncio
+
+
+def test_stop_drains_and_coalesces_the_queue(app):
+    from project.check_health_service import HealthCheckWriter
+
+    # One bucket spanning decades, so the records cannot straddle two.
+    writer = HealthCheckWriter(
+        max_queue=10, flush_size=100, flush_interval=60, coalesce_seconds=10**9
+    )
+    for status in ("UP", "UP", "DOWN", "UP"):
+        writer.record(status)
+    app.run(writer.stop())
+
+    rows = list(app.db.tables["HealthCheck"].rows.values())
+    assert sorted(row["status"] for row in rows) == ["DOWN", "UP"]
+    assert writer.written == 2
+    assert all(row["checkedAt"].utcoffset() is not None for row in rows)
+
+
+def test_writer_flushes_by_size_and_by_interval(app):
+    from project.check_health_service import HealthCheckWriter
+
+    async def written_after(writer: HealthCheckWriter, statuses) -> int:
+        writer.start()
+        for status in statuses:
+            writer.record(status)
+        for _ in range(100):
+            if writer.written:
+                break
+            await asyncio.sleep(0.01)
+        written = writer.written
+        await writer.stop()
+        return written
+
+    by_size = HealthCheckWriter(flush_size=2, flush_interval=60)
+    by_interval = HealthCheckWriter(flush_size=100, flush_interval=0.05)
+
+    assert app.run(written_after(by_size, ["UP", "DOWN"])) == 2
+    assert app.run(written_after(by_interval, ["UP"])) == 1
+
+
+def test_records_beyond_the_queue_are_dropped(app):
+    from project.check_health_service import HealthCheckWriter
+
+    writer = HealthCheckWriter(max_queue=2)
+    for status in ("UP", "DOWN", "UP", "UP", "DOWN"):
+        writer.record(status)
+    app.run(writer.stop())
+
+    assert writer.dropped == 3
+    assert len(app.db.tables["HealthCheck"].rows) == 2
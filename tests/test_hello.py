@@ -0,0 +1,27 @@
+def test_hello_is_revalidated_by_its_etag(app):
+    status, headers, body = app.json("GET", "/hello")
+    etag = headers[b"etag"].decode()
+
+    assert status == 200
+    assert body == {"message": "Hello, World!"}
+
+    status, headers, content = app.call(
+        "GET", "/hello", headers=[("if-none-match", etag)]
+    )
+    assert (status, content) == (304, b"")
+    assert headers[b"etag"].decode() == etag
+
+    assert app.call("GET", "/hello", headers=[("if-none-match", '"other"')])[0] == 200
+
+
+def test_hello_as_plain_text_has_its_own_etag(app):
+    _, json_headers, _ = app.call("GET", "/hello")
+    status, headers, content = app.call(
+        "GET", "/hello", headers=[("accept", "text/plain")]
+    )
+
+    assert status == 200
+    assert headers[b"content-type"].startswith(b"text/plain")
+    assert content == b"Hello, World!"
+    assert headers[b"etag"] != json_headers[b"etag"]
+    assert app.db.queries == 0
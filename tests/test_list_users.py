@@ -0,0 +1,40 @@
+from typing import List
+
+import pytest
+
+
+@pytest.mark.parametrize("indexed", [False, True], ids=["database", "user_index"])
+@pytest.mark.filterwarnings("error::UserWarning")
+def test_keyset_pages_list_every_user_once(app, indexed):
+    from project.user_index import user_index
+
+    admin_id, token = app.add_user("admin@example.com", "Admin")
+    ids = [admin_id] + [app.add_user(f"u{i}@example.com")[0] for i in range(6)]
+    if indexed:
+        app.run(user_index.build())
+
+    seen: List[int] = []
+    pages = 0
+    after = ""
+    while True:
+        status, _, body = app.json("GET", f"/api/users?limit=3{after}", token)
+        assert status == 200
+        seen += [user["id"] for user in body["users"]]
+        pages += 1
+        if body["next_cursor"] is None:
+            break
+        after = f"&after={body['next_cursor']}"
+
+    assert seen == ids
+    assert pages == 3
+    assert body["users"] == [{"id": ids[-1], "email": "u5@example.com", "role": "User"}]
+
+
+def test_listing_is_restricted_to_admins(app):
+    _, token = app.add_user("user@example.com")
+
+    status, _, body = app.json("GET", "/api/users", token)
+
+    assert status == 403
+    assert body == {"error": "Access denied: Admin role required."}
+    assert app.call("GET", "/api/users")[0] == 401
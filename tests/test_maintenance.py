@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+def maintenance(**kwargs):
+    from project.maintenance import Maintenance
+
+    kwargs.setdefault("pause", 0)
+    return Maintenance(busy=lambda: False, **kwargs)
+
+
+@pytest.fixture
+def long_ago() -> datetime:
+    # Well past every retention window, at the start of an hour.
+    now = datetime.now(timezone.utc) - timedelta(days=30)
+    return now.replace(minute=0, second=0, microsecond=0)
+
+
+def test_expired_tokens_are_purged_in_batches(app, long_ago):
+    auth = app.db.tables["Auth"]
+    for _ in range(3):
+        auth.insert({"userId": 1, "createdAt": long_ago})
+    user_id, token = app.add_user("user@example.com")
+    queries = app.db.queries
+
+    purged = app.run(maintenance(batch_size=2).purge_expired_tokens())
+
+    assert purged == 3
+    assert app.db.queries == queries + 2
+    # The fresh token survives the purge.
+    assert app.call("GET", f"/api/users/{user_id}", token)[0] == 200
+
+
+def test_a_pass_stops_after_max_batches(app, long_ago):
+    for _ in range(3):
+        app.db.tables["Auth"].insert({"userId": 1, "createdAt": long_ago})
+    runner = maintenance(batch_size=1, max_batches=2)
+
+    assert app.run(runner.purge_expired_tokens()) == 2
+    assert runner.totals["tokens_purged"] == 2
+    assert len(app.db.tables["Auth"].rows) == 1
+
+
+def test_health_checks_are_rolled_up_by_minute_then_by_hour(app, long_ago):
+    checks, rollups = app.db.tables["HealthCheck"], app.db.tables["HealthCheckRollup"]
+    for offset, status in [(1, "UP"), (2, "UP"), (3, "DOWN"), (61, "UP"), (62, "UP")]:
+        checks.insert(
+            {"status": status, "checkedAt": long_ago + timedelta(seconds=offset)}
+        )
+    checks.insert({"status": "UP"})
+    runner = maintenance(batch_size=2)
+
+    assert app.run(runner.rollup_health_checks()) == 5
+    assert len(checks.rows) == 1
+    assert sorted(
+        (row["bucketStart"].minute, row["status"], row["checks"])
+        for row in rollups.rows.values()
+    ) == [(0, "DOWN", 1), (0, "UP", 2), (1, "UP", 2)]
+
+    assert app.run(runner.compact_minute_rollups()) == 3
+    assert sorted(
+        (row["granularity"], row["bucketStart"], row["status"], row["checks"])
+        for row in rollups.rows.values()
+    ) == [("hour", long_ago, "DOWN", 1), ("hour", long_ago, "UP", 4)]
+    assert runner.totals == {
+        "tokens_purged": 0,
+        "healthchecks_rolled_up": 5,
+        "minute_rollups_compacted": 3,
+    }
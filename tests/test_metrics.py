@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("prisma.models")
+
+import project.db_hooks
+from benchmarks._fake_db import FakeDatabase
+from prisma import Prisma
+
+
+def test_instrumented_client_reports_every_query_once(monkeypatch):
+    monkeypatch.setattr(project.db_hooks, "_listeners", [])
+    seen = []
+    project.db_hooks.add_query_listener(
+        lambda model, action, arguments, seconds, error: seen.append(
+            (model, action, error)
+        )
+    )
+    client = Prisma()
+    FakeDatabase().install(client)
+    project.db_hooks.instrument(client)
+
+    async def scenario() -> None:
+        await client.connect()
+        await client.user.find_many(where={"id": {"gt": 0}})
+        with pytest.raises(NotImplementedError):
+            await client.query_raw("SELECT now()")
+
+    asyncio.run(scenario())
+
+    assert isinstance(client, Prisma) and not hasattr(client, "__dict__")
+    assert [(model, action) for model, action, _ in seen] == [
+        ("User", "find_many"),
+        ("raw", "query_raw"),
+    ]
+    assert seen[0][2] is None
+    assert isinstance(seen[1][2], NotImplementedError)
+
+
+def test_metrics_expose_route_latency_and_query_timing(app):
+    app.call("GET", "/health/ready")
+
+    status, headers, body = app.call("GET", "/metrics")
+    text = body.decode()
+
+    assert status == 200
+    assert headers[b"content-type"].startswith(b"text/plain")
+    assert (
+        'http_requests_total{method="GET",route="/health/ready",status="200"}' in text
+    )
+    assert 'db_query_duration_seconds_count{model="raw",action="query_raw"}' in text
@@ -0,0 +1,61 @@
+from project.password_service import (
+    SCRYPT_N,
+    hash_password_sync,
+    needs_rehash,
+    verify_password_sync,
+)
+
+
+def test_hashes_are_salted_and_verified():
+    first, second = hash_password_sync("secret"), hash_password_sync("secret")
+
+    assert first != second
+    assert first.startswith(f"scrypt${SCRYPT_N}$8$1$")
+    assert verify_password_sync("secret", first)
+    assert not verify_password_sync("wrong", first)
+    assert not verify_password_sync("secret", "scrypt$1024$8$1$not-base64$")
+    assert not needs_rehash(first)
+
+
+def test_plaintext_and_outdated_hashes_need_a_rehash():
+    outdated = hash_password_sync("secret").replace(f"${SCRYPT_N}$", "$2$", 1)
+
+    assert verify_password_sync("secret", "secret")
+    assert needs_rehash("secret")
+    assert needs_rehash(outdated)
+
+
+def login(app, email: str, password: str):
+    return app.json("POST", f"/api/users/login?username={email}&password={password}")
+
+
+def test_login_upgrades_a_legacy_plaintext_password(app):
+    user_id, _ = app.add_user("legacy@example.com", password="secret")
+
+    assert login(app, "legacy@example.com", "wrong")[0] == 401
+    assert app.db.tables["User"].rows[user_id]["password"] == "secret"
+
+    status, _, body = login(app, "legacy@example.com", "secret")
+    stored = app.db.tables["User"].rows[user_id]["password"]
+
+    assert (status, body["user_id"]) == (200, user_id)
+    assert stored.startswith("scrypt$") and verify_password_sync("secret", stored)
+    assert login(app, "legacy@example.com", "secret")[0] == 200
+    assert app.db.tables["User"].rows[user_id]["password"] == stored
+
+
+def test_unknown_email_still_verifies_a_hash(app, monkeypatch):
+    from project.password_service import password_hasher
+
+    verified = []
+    verify = password_hasher.verify
+
+    async def recording_verify(password: str, encoded: str) -> bool:
+        verified.append(encoded)
+        return await verify(password, encoded)
+
+    monkeypatch.setattr(password_hasher, "verify", recording_verify)
+    status, _, body = login(app, "nobody@example.com", "secret")
+
+    assert (status, body) == (401, {"error": "Invalid credentials."})
+    assert len(verified) == 1 and verified[0].startswith("scrypt$")
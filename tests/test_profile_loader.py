@@ -0,0 +1,99 @@
+import asyncio
+
+
+def loader(**kwargs):
+    from project.getUserProfile_service import ProfileLoader
+
+    kwargs.setdefault("window", 0.01)
+    return ProfileLoader(**kwargs)
+
+
+async def gather(*loads, **kwargs):
+    return await asyncio.gather(*loads, **kwargs)
+
+
+def test_concurrent_loads_are_coalesced_and_batched(app):
+    first, _ = app.add_user("a@example.com")
+    second, _ = app.add_user("b@example.com")
+    profiles = loader()
+    queries = app.db.queries
+
+    results = app.run(
+        gather(
+            profiles.load(first),
+            profiles.load(first),
+            profiles.load(second),
+            profiles.load(second + 100),
+        )
+    )
+
+    assert [r.email if r else None for r in results] == [
+        "a@example.com",
+        "a@example.com",
+        "b@example.com",
+        None,
+    ]
+    assert results[0] is results[1]
+    assert app.db.queries == queries + 1
+    assert profiles.stats() == {
+        "hits": 0,
+        "misses": 3,
+        "coalesced": 1,
+        "batches": 1,
+        "cached": 2,
+    }
+
+
+def test_cached_profiles_are_hits_until_they_expire(app):
+    user_id, _ = app.add_user("a@example.com")
+    cached, expiring = loader(), loader(ttl=0)
+
+    for profiles in (cached, expiring):
+        app.run(profiles.load(user_id))
+    queries = app.db.queries
+    for profiles in (cached, expiring):
+        app.run(profiles.load(user_id))
+
+    assert (cached.hits, cached.misses) == (1, 1)
+    assert (expiring.hits, expiring.misses) == (0, 2)
+    assert app.db.queries == queries + 1
+
+    cached.invalidate(user_id)
+    app.run(cached.load(user_id))
+    assert cached.misses == 2
+
+
+def test_a_full_batch_is_sent_before_the_window_ends(app):
+    ids = [app.add_user(f"{i}@example.com")[0] for i in range(5)]
+    profiles = loader(window=60, max_batch=2)
+
+    results = app.run(gather(*(profiles.load(i) for i in ids[:4])))
+
+    assert [r.id for r in results] == ids[:4]
+    assert profiles.batches == 2
+
+
+def test_a_failed_batch_fails_every_waiter(app, monkeypatch):
+    first, _ = app.add_user("a@example.com")
+    second, _ = app.add_user("b@example.com")
+    profiles = loader()
+    error = RuntimeError("database unavailable")
+
+    async def failing_execute(**kwargs):
+        raise error
+
+    with monkeypatch.context() as patch:
+        patch.setattr(app.db, "execute", failing_execute)
+        results = app.run(
+            gather(
+                profiles.load(first),
+                profiles.load(first),
+                profiles.load(second),
+                return_exceptions=True,
+            )
+        )
+
+    assert all(result is error for result in results)
+    assert profiles.stats()["cached"] == 0
+    # Nothing is left in flight: the next load queries again.
+    assert app.run(profiles.load(first)).id == first
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from typing import AsyncIterator
+
+import pytest
+from benchmarks._harness import asgi_call
+from project.query_tracking import (
+    QueryBudgetExceeded,
+    QueryTrackingMiddleware,
+    query_budget,
+    record_query,
+    track_queries,
+)
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+
+def query(times: int = 1) -> None:
+    for user_id in range(times):
+        record_query("User", "find_unique", {"where": {"id": user_id}}, 0.001, None)
+
+
+def make_app(enforce: bool, debug_headers: bool = False) -> QueryTrackingMiddleware:
+    @query_budget(1)
+    async def within(request: Request) -> PlainTextResponse:
+        query()
+        return PlainTextResponse("ok")
+
+    @query_budget(1)
+    async def over(request: Request) -> PlainTextResponse:
+        query(3)
+        return PlainTextResponse("ok")
+
+    @query_budget(1)
+    async def stream(request: Request) -> StreamingResponse:
+        async def body() -> AsyncIterator[bytes]:
+            yield b"first"
+            query(2)
+            yield b"second"
+
+        return StreamingResponse(body())
+
+    routes = [
+        Route("/within", within),
+        Route("/over", over),
+        Route("/stream", stream),
+    ]
+    return QueryTrackingMiddleware(
+        Starlette(routes=routes), routes, debug_headers, enforce
+    )
+
+
+def test_track_queries_raises_over_budget():
+    with pytest.raises(QueryBudgetExceeded):
+        with track_queries(budget=2):
+            query(3)
+    with track_queries(budget=3) as stats:
+        query(3)
+    assert stats.count == 3
+    assert stats.repeated() == [("User", "find_unique", 3)]
+
+
+def test_debug_headers_report_the_queries_made():
+    _, headers, _ = asyncio.run(
+        asgi_call(make_app(enforce=False, debug_headers=True), "GET", "/within")
+    )
+
+    assert (b"x-db-queries", b"1") in headers
+
+
+def test_over_budget_response_is_replaced_with_500_when_enforced():
+    status, _, body = asyncio.run(asgi_call(make_app(enforce=True), "GET", "/over"))
+
+    assert status == 500
+    assert body == b'{"error":"GET /over made 3 queries, budget is 1"}'
+
+
+def test_within_budget_response_passes_when_enforced():
+    status, _, body = asyncio.run(asgi_call(make_app(enforce=True), "GET", "/within"))
+
+    assert (status, body) == (200, b"ok")
+
+
+def test_over_budget_response_is_only_logged_when_not_enforced(caplog):
+    with caplog.at_level(logging.WARNING, logger="project.query_tracking"):
+        status, _, body = asyncio.run(
+            asgi_call(make_app(enforce=False), "GET", "/over")
+        )
+
+    assert (status, body) == (200, b"ok")
+    assert "GET /over made 3 queries, budget is 1" in caplog.text
+
+
+def test_stream_over_budget_after_its_first_chunk_raises_when_enforced():
+    with pytest.raises(QueryBudgetExceeded):
+        asyncio.run(asgi_call(make_app(enforce=True), "GET", "/stream"))
@@ -0,0 +1,117 @@
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+
+def rows(count: int) -> List[Dict[str, Any]]:
+    return [
+        {"username": str(i), "password": "p", "email": f"{i}@example.com"}
+        for i in range(count)
+    ]
+
+
+def test_bulk_registration_reports_every_kind_of_duplicate(app):
+    from project.registerUsersBulk_service import _INSERT_USERS_SQL
+
+    _, token = app.add_user("admin@example.com", "Admin")
+    taken_id, _ = app.add_user("taken@example.com")
+    insert_users = app.db._raw[_INSERT_USERS_SQL]
+
+    def insert_after_a_concurrent_registration(payload: str):
+        app.db.tables["User"].insert(
+            {"email": "racing@example.com", "password": "x", "role": "User"}
+        )
+        return insert_users(payload)
+
+    app.db._raw[_INSERT_USERS_SQL] = insert_after_a_concurrent_registration
+    body = [
+        {"username": "a", "password": "p", "email": "new@example.com"},
+        {"username": "b", "password": "p", "email": "taken@example.com"},
+        {"username": "c", "password": "p", "email": "new@example.com"},
+        {"username": "d", "email": "invalid@example.com"},
+        {"username": "e", "password": "p", "email": "racing@example.com"},
+    ]
+    status, _, response = app.json(
+        "POST", "/api/users/register/bulk", token, body=json.dumps(body).encode()
+    )
+
+    assert status == 200
+    assert (response["created"], response["duplicates"], response["invalid"]) == (
+        1,
+        3,
+        1,
+    )
+    results = response["results"]
+    assert [result["status"] for result in results] == [
+        "created",
+        "duplicate",
+        "duplicate",
+        "invalid",
+        "duplicate",
+    ]
+    assert results[1]["user_id"] == taken_id
+    assert results[2]["error"] == "Email repeated earlier in the request."
+    assert results[4]["error"] == "Email registered concurrently."
+    assert results[0]["user_id"] in app.db.tables["User"].rows
+
+
+def test_ndjson_body_is_registered_in_chunks(app, monkeypatch):
+    import project.registerUsersBulk_service
+
+    monkeypatch.setattr(
+        project.registerUsersBulk_service, "BULK_REGISTER_CHUNK_SIZE", 2
+    )
+    _, token = app.add_user("admin@example.com", "Admin")
+    body = b"\n".join(json.dumps(row).encode() for row in rows(5)) + b"\n\n"
+
+    status, _, response = app.json(
+        "POST",
+        "/api/users/register/bulk",
+        token,
+        body=body,
+        headers=[("content-type", "application/x-ndjson")],
+    )
+
+    assert status == 200
+    assert response["created"] == 5
+    assert [result["index"] for result in response["results"]] == list(range(5))
+    assert len(app.db.tables["User"].rows) == 6
+
+
+def test_bulk_registration_rejects_a_body_that_is_not_an_array(app):
+    _, token = app.add_user("admin@example.com", "Admin")
+
+    status, _, body = app.json(
+        "POST", "/api/users/register/bulk", token, body=b'{"a": 1}'
+    )
+
+    assert status == 400
+    assert body == {"error": "Expected a JSON array of users."}
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "application/x-ndjson"])
+def test_oversized_request_writes_nothing(app, monkeypatch, content_type):
+    import project.registerUsersBulk_service
+
+    monkeypatch.setattr(
+        project.registerUsersBulk_service, "BULK_REGISTER_CHUNK_SIZE", 2
+    )
+    monkeypatch.setattr(project.registerUsersBulk_service, "BULK_REGISTER_MAX_ROWS", 5)
+    _, token = app.add_user("admin@example.com", "Admin")
+    if content_type == "application/json":
+        body = json.dumps(rows(6)).encode()
+    else:
+        body = b"\n".join(json.dumps(row).encode() for row in rows(6))
+
+    status, _, response = app.json(
+        "POST",
+        "/api/users/register/bulk",
+        token,
+        body=body,
+        headers=[("content-type", content_type)],
+    )
+
+    assert status == 413
+    assert response == {"error": "Bulk registration is limited to 5 users per request."}
+    assert len(app.db.tables["User"].rows) == 1
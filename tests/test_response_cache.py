@@ -0,0 +1,167 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+from benchmarks._harness import asgi_call
+from project.response_cache import (
+    CachedResponse,
+    CachePolicy,
+    ResponseCache,
+    ResponseCacheMiddleware,
+    cache_response,
+)
+from starlette.applications import Starlette
+from starlette.requests import HTTPConnection, Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def entry(body: bytes, tags: Tuple[str, ...]) -> CachedResponse:
+    return CachedResponse(200, [], body, CachePolicy(ttl=30), tags)
+
+
+def test_invalidate_tags_drops_only_tagged_entries():
+    cache = ResponseCache()
+    cache.put(("a",), entry(b"1", ("user:1", "users")))
+    cache.put(("b",), entry(b"2", ("user:2", "users")))
+    cache.put(("c",), entry(b"3", ("docs",)))
+
+    cache.invalidate_tags("user:1")
+    assert [cache.get((key,)) is not None for key in ("a", "b", "c")] == [
+        False,
+        True,
+        True,
+    ]
+
+    cache.invalidate_tags("users")
+    assert cache.get(("b",)) is None
+    assert cache.get(("c",)) is not None
+    assert cache.bytes == cache.get(("c",)).size
+
+
+def test_load_finishing_after_an_invalidation_is_not_stored():
+    async def scenario() -> None:
+        cache = ResponseCache()
+        key = (("users",), "/users", ())
+        started, finish = asyncio.Event(), asyncio.Event()
+
+        async def fetch() -> CachedResponse:
+            started.set()
+            await finish.wait()
+            return entry(b"before the write", ("users",))
+
+        load = asyncio.create_task(cache.load(key, fetch))
+        await started.wait()
+        cache.invalidate_tags("users")
+        finish.set()
+        response, leader = await load
+
+        assert leader and response.body == b"before the write"
+        assert cache.get(key) is None
+
+    asyncio.run(scenario())
+
+
+def make_app(cache: ResponseCache) -> Tuple[ResponseCacheMiddleware, List[int]]:
+    calls: List[int] = []
+
+    async def role_header(connection: HTTPConnection) -> Optional[str]:
+        return connection.headers.get("x-role")
+
+    @cache_response(ttl=30, vary=("path:userId",), tags=("user:{userId}",))
+    async def profile(request: Request) -> JSONResponse:
+        user_id = int(request.path_params["userId"])
+        calls.append(user_id)
+        return JSONResponse({"id": user_id, "calls": len(calls)})
+
+    @cache_response(ttl=30, vary=(role_header,), tags=("users",))
+    async def users(request: Request) -> JSONResponse:
+        calls.append(0)
+        return JSONResponse({"calls": len(calls)})
+
+    routes = [Route("/users/{userId:int}", profile), Route("/users", users)]
+    return ResponseCacheMiddleware(Starlette(routes=routes), routes, cache), calls
+
+
+def x_cache(headers: List[Tuple[bytes, bytes]]) -> Optional[str]:
+    values: Dict[bytes, bytes] = dict(headers)
+    value = values.get(b"x-cache")
+    return value.decode() if value is not None else None
+
+
+def test_route_is_served_from_cache_until_its_tag_is_invalidated():
+    async def scenario() -> None:
+        cache = ResponseCache()
+        app, calls = make_app(cache)
+
+        states = []
+        for _ in range(2):
+            _, headers, _ = await asgi_call(app, "GET", "/users/1")
+            states.append(x_cache(headers))
+        await asgi_call(app, "GET", "/users/2")
+        cache.invalidate_tags("user:1")
+        _, headers, body = await asgi_call(app, "GET", "/users/1")
+        states.append(x_cache(headers))
+        _, other, _ = await asgi_call(app, "GET", "/users/2")
+
+        assert states == ["MISS", "HIT", "MISS"]
+        assert body == b'{"id":1,"calls":3}'
+        assert x_cache(other) == "HIT"
+        assert calls == [1, 2, 1]
+
+    asyncio.run(scenario())
+
+
+def test_vary_resolver_returning_none_bypasses_the_cache():
+    async def scenario() -> None:
+        app, calls = make_app(ResponseCache())
+        role = [("x-role", "Admin")]
+
+        _, anonymous, _ = await asgi_call(app, "GET", "/users")
+        await asgi_call(app, "GET", "/users")
+        await asgi_call(app, "GET", "/users", role)
+        _, admin, _ = await asgi_call(app, "GET", "/users", role)
+
+        assert x_cache(anonymous) is None
+        assert x_cache(admin) == "HIT"
+        assert calls == [0, 0, 0]
+
+    asyncio.run(scenario())
+
+
+def test_vary_names_its_source():
+    async def scenario() -> None:
+        @cache_response(ttl=30, vary=("query:page",), tags=("pages",))
+        async def pages(request: Request) -> JSONResponse:
+            return JSONResponse({"page": request.query_params.get("page")})
+
+        routes = [Route("/pages", pages)]
+        app = ResponseCacheMiddleware(Starlette(routes=routes), routes, ResponseCache())
+
+        await asgi_call(app, "GET", "/pages?page=1")
+        _, header_only, body = await asgi_call(app, "GET", "/pages", [("page", "1")])
+        _, query, _ = await asgi_call(app, "GET", "/pages?page=1", [("page", "2")])
+
+        assert (x_cache(header_only), body) == ("MISS", b'{"page":null}')
+        assert x_cache(query) == "HIT"
+
+    asyncio.run(scenario())
+
+
+def test_vary_without_a_source_is_rejected():
+    with pytest.raises(ValueError):
+        CachePolicy(ttl=30, vary=("userId",))
+
+
+def test_cached_response_answers_if_modified_since():
+    headers = [
+        (b"etag", b'"v1"'),
+        (b"last-modified", b"Sat, 17 Oct 2026 10:00:00 GMT"),
+    ]
+    cached = CachedResponse(200, headers, b"{}", CachePolicy(ttl=30), ())
+
+    assert cached.not_modified(None, "Sat, 17 Oct 2026 10:00:00 GMT")
+    assert not cached.not_modified(None, "Sat, 17 Oct 2026 09:59:59 GMT")
+    # If-None-Match takes precedence when both are sent.
+    assert not cached.not_modified('"v0"', "Sat, 17 Oct 2026 10:00:00 GMT")
+    assert cached.not_modified('"v1"', None)
@@ -0,0 +1,28 @@
+import os
+
+import project.serve
+
+
+def test_worker_count_follows_the_cpus_unless_web_concurrency_is_set(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(project.serve, "available_cpus", lambda: 4)
+
+    assert project.serve.worker_count() == 4
+    assert project.serve.worker_count(max_workers=2) == 2
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert project.serve.worker_count() == 3
+
+
+def test_cpu_quota_caps_the_available_cpus(monkeypatch):
+    monkeypatch.setattr(
+        os, "sched_getaffinity", lambda pid: {0, 1, 2, 3}, raising=False
+    )
+    monkeypatch.setattr(project.serve, "cgroup_cpu_limit", lambda: None)
+    assert project.serve.available_cpus() == 4
+
+    monkeypatch.setattr(project.serve, "cgroup_cpu_limit", lambda: 1.5)
+    assert project.serve.available_cpus() == 2
+
+    monkeypatch.setattr(project.serve, "cgroup_cpu_limit", lambda: 0.25)
+    assert project.serve.available_cpus() == 1
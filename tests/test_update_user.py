@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+
+@pytest.mark.filterwarnings("error::UserWarning")
+def test_update_with_a_stale_version_or_a_taken_email_conflicts(app):
+    from project.user_events import user_events
+
+    user_id, token = app.add_user("user@example.com")
+    app.add_user("other@example.com")
+    path = f"/api/users/{user_id}?username=user"
+
+    status, _, body = app.json("PUT", f"{path}&email=a@example.com&version=0", token)
+    assert status == 200
+    assert (body["role"], body["version"]) == ("User", 1)
+    assert json.loads(user_events.history[-1].frame.split(b"data: ")[1]) == {
+        "id": user_id,
+        "email": "a@example.com",
+        "role": "User",
+        "version": 1,
+    }
+
+    stale = app.json("PUT", f"{path}&email=b@example.com&version=0", token)
+    taken = app.json("PUT", f"{path}&email=other@example.com", token)
+
+    assert stale[0] == 409
+    assert stale[2] == {"error": f"User {user_id} is at version 1, not 0"}
+    assert taken[0] == 409
+    assert taken[2] == {"error": "Email other@example.com is already registered."}
+    assert app.db.tables["User"].rows[user_id]["email"] == "a@example.com"
+
+
+def test_update_of_another_users_profile_is_refused(app):
+    user_id, _ = app.add_user("user@example.com")
+    _, token = app.add_user("other@example.com")
+
+    status, _, _ = app.json(
+        "PUT", f"/api/users/{user_id}?username=x&email=x@example.com", token
+    )
+
+    assert status == 403
+    assert app.db.tables["User"].rows[user_id]["version"] == 0
+
+
+def test_deleting_a_user_revokes_their_tokens(app):
+    _, admin = app.add_user("admin@example.com", "Admin")
+    user_id, token = app.add_user("user@example.com")
+    assert app.call("GET", "/api/users", token)[0] == 403
+
+    status, _, body = app.json("DELETE", f"/api/users/{user_id}", admin)
+
+    assert (status, body["status"]) == (200, "success")
+    assert not app.db.tables["Auth"].lookup("userId", user_id)
+    assert app.call("GET", "/api/users", token)[0] == 401
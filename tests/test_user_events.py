@@ -0,0 +1,163 @@
+import asyncio
+from typing import List
+
+import pytest
+from project.user_events import CREATED, DELETED, RESET, UserEventBroker
+
+
+def frame_ids(frames: List[bytes]) -> List[str]:
+    return [frame.split(b"\n", 1)[0].decode()[len("id: ") :] for frame in frames]
+
+
+def frame_type(frame: bytes) -> str:
+    return frame.split(b"\n")[1].decode()[len("event: ") :]
+
+
+def test_reconnect_replays_only_missed_events():
+    broker = UserEventBroker()
+    first = broker.publish(CREATED, {"id": 1, "email": "a@example.com", "role": "User"})
+    second = broker.publish(
+        CREATED, {"id": 2, "email": "b@example.com", "role": "User"}
+    )
+    third = broker.publish(DELETED, {"id": 1})
+
+    subscription = broker.subscribe(first.id)
+
+    assert frame_ids(subscription.replay) == [second.id, third.id]
+    assert broker.stats()["replayed"] == 2
+
+
+def test_reconnect_at_latest_event_replays_nothing():
+    broker = UserEventBroker()
+    broker.publish(DELETED, {"id": 1})
+
+    subscription = broker.subscribe(broker.last_event_id)
+
+    assert subscription.replay == []
+    assert broker.stats()["reset"] == 0
+
+
+def test_id_from_another_process_gets_a_reset():
+    broker = UserEventBroker()
+    broker.publish(DELETED, {"id": 1})
+    other = UserEventBroker()
+    other.publish(DELETED, {"id": 1})
+
+    subscription = broker.subscribe(other.last_event_id)
+
+    assert [frame_type(frame) for frame in subscription.replay] == [RESET]
+    assert frame_ids(subscription.replay) == [broker.last_event_id]
+    assert broker.stats()["reset"] == 1
+
+
+def test_id_older_than_history_gets_a_reset():
+    broker = UserEventBroker(history=2)
+    first = broker.publish(DELETED, {"id": 1})
+    for user_id in range(2, 5):
+        broker.publish(DELETED, {"id": user_id})
+
+    subscription = broker.subscribe(first.id)
+
+    assert [frame_type(frame) for frame in subscription.replay] == [RESET]
+
+
+def test_malformed_id_gets_a_reset():
+    broker = UserEventBroker()
+    broker.publish(DELETED, {"id": 1})
+
+    subscription = broker.subscribe("not-an-id")
+
+    assert [frame_type(frame) for frame in subscription.replay] == [RESET]
+
+
+def test_stream_sends_replay_then_live_events():
+    async def scenario() -> List[bytes]:
+        broker = UserEventBroker()
+        first = broker.publish(DELETED, {"id": 1})
+        broker.publish(DELETED, {"id": 2})
+        subscription = broker.subscribe(first.id)
+        stream = subscription.stream(keepalive=5, retry_ms=1000)
+        chunks = [await stream.__anext__()]
+        broker.publish(DELETED, {"id": 3})
+        chunks.append(await stream.__anext__())
+        await stream.aclose()
+        assert not broker.subscribers
+        return chunks
+
+    head, live = asyncio.run(scenario())
+
+    assert head.startswith(b"retry: 1000\n\n")
+    assert b'data: {"id":2}' in head
+    assert b'data: {"id":3}' in live
+
+
+def test_slow_subscriber_is_evicted_without_blocking_publish():
+    async def scenario() -> None:
+        broker = UserEventBroker(queue_size=2)
+        slow = broker.subscribe()
+        for user_id in range(3):
+            broker.publish(DELETED, {"id": user_id})
+
+        assert slow.closed
+        assert slow not in broker.subscribers
+        assert broker.stats()["evicted"] == 1
+        frames = [frame async for frame in slow.stream(keepalive=5)]
+        assert frames == [b"retry: 2000\n\n"]
+
+    asyncio.run(scenario())
+
+
+def test_subscribers_over_the_cap_are_refused():
+    broker = UserEventBroker(max_subscribers=1)
+
+    assert broker.subscribe() is not None
+    assert broker.subscribe() is None
+    assert broker.stats()["refused"] == 1
+
+
+@pytest.mark.filterwarnings("error::UserWarning")
+def test_event_stream_resets_a_client_from_another_process(app):
+    from benchmarks._harness import asgi_first_chunk
+    from project.user_events import user_events
+
+    _, token = app.add_user("admin@example.com", "Admin")
+
+    status, chunk = app.run(
+        asgi_first_chunk(
+            app.asgi,
+            "/api/users/events?lastEventId=other-process-7",
+            [("authorization", f"Bearer {token}")],
+        )
+    )
+
+    assert status == 200
+    assert b"\nevent: reset\n" in chunk
+    assert user_events.stats()["reset"] >= 1
+    assert not user_events.subscribers
+
+
+def test_client_gone_before_the_stream_starts_releases_its_subscription(app):
+    from benchmarks._harness import http_scope
+    from project.user_events import user_events
+
+    _, token = app.add_user("admin@example.com", "Admin")
+    scope = http_scope(
+        "GET", "/api/users/events", [("authorization", f"Bearer {token}")]
+    )
+    received: List[bool] = []
+
+    async def receive() -> dict:
+        if not received:
+            received.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            raise OSError("Connection reset by peer")
+
+    with pytest.raises(OSError):
+        app.run(app.asgi(scope, receive, send))
+
+    assert not user_events.subscribers
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("prisma.models")
+
+import prisma.enums
+import prisma.models
+import project.server
+from benchmarks._fake_db import FakeDatabase
+from project.user_index import UserIndex, UserProjection
+
+
+def test_projection_accepts_roles_as_members_or_strings():
+    projection = UserProjection()
+    projection.put(2, "b@example.com", "Admin", 0)
+    projection.put(1, "a@example.com", prisma.enums.Role.User, 3)
+
+    users = projection.page(None, 10)
+
+    assert [(user.id, user.role, user.version) for user in users] == [
+        (1, prisma.enums.Role.User, 3),
+        (2, prisma.enums.Role.Admin, 0),
+    ]
+    assert projection.by_email == {"a@example.com": 1, "b@example.com": 2}
+
+
+def test_projection_put_moves_a_changed_email():
+    projection = UserProjection()
+    projection.put(1, "a@example.com", "User", 0)
+    projection.put(1, "b@example.com", "User", 1)
+    projection.remove(2)
+
+    assert projection.by_email == {"b@example.com": 1}
+    assert projection.get(1).email == "b@example.com"
+
+
+def test_writes_made_during_a_build_are_kept(app):
+    async def scenario() -> None:
+        database = FakeDatabase(latency=0.01)
+        database.install(project.server.db_client)
+        await project.server.db_client.connect()
+        for i in range(1, 6):
+            await prisma.models.User.prisma().create(
+                data={"email": f"u{i}@example.com", "password": "x", "role": "User"}
+            )
+        index = UserIndex()
+
+        scanned = database.queries
+        build = asyncio.create_task(index.build(chunk_size=2))
+        while database.queries == scanned:
+            await asyncio.sleep(0)
+        assert not index.ready
+        # Made after the scan has read ids 1 and 2, before it reaches 4 and 5.
+        index.put(1, "renamed@example.com", "User", 1)
+        index.remove(5)
+        index.put(6, "new@example.com", prisma.enums.Role.Admin, 0)
+        await build
+
+        assert [user.id for user in index.page(None, 10)] == [1, 2, 3, 4, 6]
+        assert index.get(1).email == "renamed@example.com"
+        assert index.email_owner("u1@example.com") is None
+        assert index.get(6).role == prisma.enums.Role.Admin
+
+    app.run(scenario())
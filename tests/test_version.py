@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+
+
+def test_admin_reload_serves_the_latest_release(app, monkeypatch):
+    import project.get_version_service
+    from project.get_version_service import DEFAULT_VERSION, VersionCache
+
+    monkeypatch.setattr(project.get_version_service, "version_cache", VersionCache())
+    _, admin = app.add_user("admin@example.com", "Admin")
+    _, user = app.add_user("user@example.com")
+    released = datetime.now(timezone.utc)
+    versions = app.db.tables["Version"]
+    versions.insert({"version": "1.1.0", "releasedAt": released})
+    versions.insert({"version": "1.0.0", "releasedAt": released - timedelta(days=1)})
+
+    queries = app.db.queries
+    _, headers, before = app.json("GET", "/version")
+    assert before == {"version": DEFAULT_VERSION}
+    assert app.db.queries == queries
+
+    assert app.call("POST", "/admin/version/reload")[0] == 401
+    assert app.call("POST", "/admin/version/reload", user)[0] == 403
+    status, _, reloaded = app.json("POST", "/admin/version/reload", admin)
+
+    assert (status, reloaded) == (200, {"version": "1.1.0"})
+    status, _, after = app.json(
+        "GET", "/version", headers=[("if-none-match", headers[b"etag"].decode())]
+    )
+    assert (status, after) == (200, {"version": "1.1.0"})